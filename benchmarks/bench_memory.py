@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+"""
+The Memory Benchmark
+
+Measures the memory held per stored object after a reload, for eager
+instances, lazy columnar records (the default) and lazy dictionary
+records.
+
+To run the benchmark, use the following command from the repository root:
+    python3 -m benchmarks.bench_memory [count]
+
+Every representation is measured in a fresh interpreter, and the results
+are printed as JSON.
+"""
+
+# import the json, os, subprocess, sys and tempfile modules for running
+# every measurement in its own interpreter
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# import the datasets module for generating synthetic stores
+from benchmarks import datasets
+
+# the representations to compare, with the storage options they need
+MODES = {
+    "eager": {},
+    "lazy": {"lazy": True, "columnar": True},
+    "lazy_dicts": {"lazy": True, "columnar": False},
+}
+
+# the code run in the child interpreter, which prints its measurement
+CHILD = """
+import json, resource, sys, tracemalloc
+from models import storage
+options = json.loads(sys.argv[2])
+storage.lazy = options.get("lazy", False)
+storage.columnar = options.get("columnar", True)
+storage.file_path = sys.argv[1]
+tracemalloc.start()
+storage.reload()
+current = tracemalloc.get_traced_memory()[0]
+tracemalloc.stop()
+print(json.dumps({
+    "objects": storage.count(),
+    "bytes": current,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}))
+"""
+
+
+def measure(path, options):
+    """Reloads path in a fresh interpreter and returns its measurement."""
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root)
+    # run from the dataset's directory so no file.json is loaded on import
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, path, json.dumps(options)],
+        cwd=os.path.dirname(path),
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def main(count=100000):
+    """Runs the benchmark for every representation."""
+
+    results = {"count": count, "modes": {}}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "dataset.json")
+        datasets.generate(path, count)
+        for mode, options in MODES.items():
+            result = measure(path, options)
+            result["bytes_per_object"] = round(result["bytes"] / count, 1)
+            results["modes"][mode] = result
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,95 @@
+#!/usr/bin/python3
+"""
+The Reload Benchmark
+
+Compares the cost of parsing timestamps with datetime.strptime and with
+the timestamps module, and the time FileStorage.reload() takes on stores
+written with ISO and with epoch timestamps.
+
+To run the benchmark, use the following command from the repository root:
+    python3 -m benchmarks.bench_reload [count]
+
+The results are printed as JSON.
+"""
+
+# import the json, os, sys, tempfile and time modules for timing runs
+import json
+import os
+import sys
+import tempfile
+import time
+
+# import the datetime class for the strptime baseline
+from datetime import datetime
+
+# import the storage instance from the models package
+from models import storage
+
+# import the timestamps module whose parser is measured
+from models.engine import timestamps
+
+# import the datasets module for generating synthetic stores
+from benchmarks import datasets
+
+
+def time_parsers(count):
+    """Returns the seconds strptime and timestamps.parse take per call."""
+
+    values = [
+        f"2024-01-01T00:{minute % 60:02d}:{second:02d}.{number:06d}"
+        for number, (minute, second) in enumerate(
+            divmod(n, 60) for n in range(count)
+        )
+    ]
+
+    start = time.perf_counter()
+    for value in values:
+        datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f")
+    strptime = time.perf_counter() - start
+
+    timestamps.parse.cache_clear()
+    start = time.perf_counter()
+    for value in values:
+        timestamps.parse(value)
+    parse = time.perf_counter() - start
+
+    return {
+        "strptime_us": round(strptime / count * 1e6, 3),
+        "parse_us": round(parse / count * 1e6, 3),
+    }
+
+
+def time_reload(path):
+    """Returns the seconds a reload of path takes."""
+
+    storage.file_path = path
+    for obj in list(storage.all().values()):
+        storage.delete(obj)
+    timestamps.parse.cache_clear()
+
+    start = time.perf_counter()
+    storage.reload()
+    return round(time.perf_counter() - start, 4)
+
+
+def main(count=100000):
+    """Runs the benchmark."""
+
+    results = {"count": count, "parsers": time_parsers(count), "reload": {}}
+    saved_path = storage.file_path
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for timestamp_format in ("iso", "epoch"):
+                path = os.path.join(tmp_dir, f"{timestamp_format}.json")
+                datasets.generate(path, count, timestamp_format)
+                results["reload"][timestamp_format] = {
+                    "seconds": time_reload(path),
+                    "file_bytes": os.path.getsize(path),
+                }
+    finally:
+        storage.file_path = saved_path
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
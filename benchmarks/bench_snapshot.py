@@ -0,0 +1,119 @@
+#!/usr/bin/python3
+"""
+The Snapshot Benchmark
+
+Compares the JSON, binary and record file formats of FileStorage: the
+size of the file, the time a full save takes (encoding every instance),
+the time a reload takes and the time the first lookup of an instance
+takes after it, as for a show command. Also times the raw decoding of
+each file, without building instances (only the index of a record
+file is read), and the converters between JSON and binary snapshots.
+
+To run the benchmark, use the following command from the repository root:
+    python3 -m benchmarks.bench_snapshot [count]
+
+The results are printed as JSON.
+"""
+
+# import the json, os, sys, tempfile and time modules for timing runs
+import json
+import os
+import sys
+import tempfile
+import time
+
+# import the storage instance from the models package
+from models import storage
+
+# import the modules reading and writing the formats
+from models.engine import binary_snapshot
+from models.engine import json_stream
+from models.engine import record_file
+from models.engine import timestamps
+
+# import the datasets module for generating synthetic stores
+from benchmarks import datasets
+
+
+def timed(function, *args):
+    """Returns the seconds function(*args) takes, rounded."""
+
+    start = time.perf_counter()
+    function(*args)
+    return round(time.perf_counter() - start, 4)
+
+
+def clear():
+    """Forgets every stored instance."""
+
+    for obj in list(storage.all().values()):
+        storage.delete(obj)
+
+
+def decode(path):
+    """Decodes every record of the snapshot at path."""
+
+    if os.path.isfile(path + ".idx"):
+        record_file.RecordFile(path, path + ".idx").close()
+        return
+    with open(path, "rb") as file:
+        if binary_snapshot.is_binary(file):
+            for _ in binary_snapshot.iter_records(file):
+                pass
+            return
+    with open(path, "r", encoding="utf-8") as file:
+        for _ in json_stream.iter_items(file):
+            pass
+
+
+def measure(path, snapshot_format):
+    """Returns the measurements of the store at path in a format."""
+
+    storage.snapshot_format = snapshot_format
+    storage.file_path = path
+    clear()
+    storage.reload()
+    # a full save, which encodes every instance
+    results = {"save": timed(storage.save)}
+    results["file_bytes"] = os.path.getsize(path)
+    results["decode"] = timed(decode, path)
+
+    class_name, obj_id = next(iter(storage.all())).split(".", 1)
+    clear()
+    timestamps.parse.cache_clear()
+    results["reload"] = timed(storage.reload)
+    results["get"] = timed(storage.get, class_name, obj_id)
+    return results
+
+
+def main(count=100000):
+    """Runs the benchmark."""
+
+    results = {"count": count}
+    saved_path = storage.file_path
+    saved_format = storage.snapshot_format
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for snapshot_format in ("json", "binary", "records"):
+                # the generated JSON is rewritten in the format by the save
+                path = os.path.join(tmp_dir, f"{snapshot_format}.snapshot")
+                datasets.generate(path, count)
+                results[snapshot_format] = measure(path, snapshot_format)
+
+            binary = os.path.join(tmp_dir, "binary.snapshot")
+            converted = os.path.join(tmp_dir, "converted.json")
+            results["binary_to_json"] = timed(
+                binary_snapshot.binary_to_json, binary, converted
+            )
+            results["json_to_binary"] = timed(
+                binary_snapshot.json_to_binary, converted, binary
+            )
+            clear()
+    finally:
+        storage.snapshot_format = saved_format
+        storage.file_path = saved_path
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
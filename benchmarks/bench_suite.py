@@ -0,0 +1,223 @@
+#!/usr/bin/python3
+"""
+The Benchmark Suite
+
+Times the hot paths of the models, the storage and the console on
+synthetic stores of several sizes:
+- reload: FileStorage.reload() of the store.
+- to_dict: to_dict() of every stored instance.
+- save: FileStorage.save() after the reload, encoding every instance.
+- save_unchanged: a second save, reusing the cached JSON text.
+- create, show, update, destroy, all: one console command, on average.
+- construct: BaseModel() construction across every model class.
+- max_rss_kb: the peak resident set size of the process.
+
+To run the suite, use the following command from the repository root:
+    python3 -m benchmarks.bench_suite [--sizes 1000,10000,100000]
+        [--commands 20] [--output results.json] [--compare base.json]
+
+Every size runs in a fresh interpreter, so its peak RSS is its own. The
+results are written as JSON, and --compare prints the ratio of every
+timing to the same timing in a previous results file, so two commits
+can be compared by running the suite on each.
+"""
+
+# import the argparse module for parsing the command line
+import argparse
+
+# import the io, json, os, platform, subprocess, sys, tempfile and time
+# modules for running and timing every size in its own interpreter
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+# import the resource module for the peak RSS, which only exists on
+# POSIX systems
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# import the datasets module for generating synthetic stores
+from benchmarks import datasets
+
+
+def timed(function, *args):
+    """Returns the seconds function(*args) takes."""
+
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def run_commands(count):
+    """Returns the average seconds of every console command."""
+
+    # import the console once the storage is loaded
+    from console import HBNBCommand
+
+    console = HBNBCommand()
+    seconds = dict.fromkeys(("create", "show", "update", "destroy", "all"), 0)
+    stdout = sys.stdout
+    try:
+        for number in range(count):
+            class_name = datasets.CLASSES[number % len(datasets.CLASSES)]
+            output = sys.stdout = io.StringIO()
+            seconds["create"] += timed(console.onecmd, f"create {class_name}")
+            obj_id = output.getvalue().strip()
+
+            sys.stdout = io.StringIO()
+            seconds["show"] += timed(
+                console.onecmd, f"show {class_name} {obj_id}"
+            )
+            seconds["update"] += timed(
+                console.onecmd, f'update {class_name} {obj_id} name "bench"'
+            )
+            seconds["destroy"] += timed(
+                console.onecmd, f"destroy {class_name} {obj_id}"
+            )
+            seconds["all"] += timed(console.onecmd, f"all {class_name}")
+    finally:
+        sys.stdout = stdout
+    return {name: total / count for name, total in seconds.items()}
+
+
+def run_size(count, commands):
+    """Returns the measurements of a store of count objects, taken in
+    the current interpreter, whose working directory holds the store."""
+
+    # importing the datasets module imported the models, which found
+    # no file.json to reload yet
+    from models import storage
+
+    path = os.path.abspath("file.json")
+    datasets.generate(path, count)
+    storage.file_path = path
+    results = {"reload": timed(storage.reload)}
+
+    objects = list(storage.all().values())
+    results["to_dict"] = timed(lambda: [obj.to_dict() for obj in objects])
+    results["save"] = timed(storage.save)
+    results["save_unchanged"] = timed(storage.save)
+    del objects
+
+    results.update(run_commands(commands))
+
+    classes = list(storage.classes().values())
+    results["construct"] = timed(
+        lambda: [classes[n % len(classes)]() for n in range(count)]
+    )
+
+    results = {name: round(value, 6) for name, value in results.items()}
+    if resource is not None:
+        # kilobytes on Linux, bytes on macOS
+        results["max_rss_kb"] = resource.getrusage(
+            resource.RUSAGE_SELF
+        ).ru_maxrss
+    return results
+
+
+def measure(count, commands):
+    """Runs run_size in a fresh interpreter and returns its results."""
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output = subprocess.run(
+            [
+                sys.executable, "-m", "benchmarks.bench_suite",
+                "--child", str(count), "--commands", str(commands),
+            ],
+            cwd=tmp_dir,
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+    return json.loads(output)
+
+
+def revision():
+    """Returns the commit the suite runs on, or None outside git."""
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=root,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, base, report):
+    """Writes the ratio of every timing in results to the same timing
+    in base to report, where above 1 means slower."""
+
+    for size, timings in results["sizes"].items():
+        base_timings = base.get("sizes", {}).get(size)
+        if base_timings is None:
+            continue
+        print(f"{size} objects:", file=report)
+        for name, value in timings.items():
+            previous = base_timings.get(name)
+            if previous:
+                print(
+                    f"  {name:<15} {previous:>12} -> {value:>12}"
+                    f"  x{value / previous:.2f}",
+                    file=report,
+                )
+
+
+def main(argv=None):
+    """Runs the suite."""
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--sizes", default="1000,10000,100000",
+        help="comma-separated store sizes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--commands", type=int, default=20,
+        help="console round-trips per size (default: %(default)s)",
+    )
+    parser.add_argument("--output", help="file to write the results to")
+    parser.add_argument("--compare", help="previous results to compare to")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child is not None:
+        print(json.dumps(run_size(args.child, args.commands)))
+        return
+
+    results = {
+        "revision": revision(),
+        "python": platform.python_version(),
+        "commands": args.commands,
+        "sizes": {},
+    }
+    for size in args.sizes.split(","):
+        results["sizes"][size] = measure(int(size), args.commands)
+
+    text = json.dumps(results, indent=4)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            compare(results, json.load(file), sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+"""
+The Datasets Module
+
+Generates synthetic file.json stores for the benchmarks.
+"""
+
+# import the json and uuid modules for writing synthetic records
+import json
+import uuid
+
+# import the datetime and timedelta classes for synthetic timestamps
+from datetime import datetime, timedelta
+
+# import the timestamps module for writing epoch timestamps
+from models.engine import timestamps
+
+# the model classes the records are spread across
+CLASSES = ("BaseModel", "User", "State", "City", "Amenity", "Place", "Review")
+
+
+def generate(path, count, timestamp_format="iso"):
+    """
+    Writes count synthetic records, spread across CLASSES, to path,
+    with timestamps written as "iso" strings or "epoch" integers.
+    """
+
+    start = datetime(2024, 1, 1)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("{")
+        for number in range(count):
+            class_name = CLASSES[number % len(CLASSES)]
+            obj_id = str(uuid.uuid4())
+            created_at = start + timedelta(seconds=number, microseconds=1)
+            updated_at = created_at + timedelta(microseconds=1)
+            if timestamp_format == "epoch":
+                created_at = timestamps.to_epoch(created_at)
+                updated_at = timestamps.to_epoch(updated_at)
+            else:
+                created_at = created_at.isoformat()
+                updated_at = updated_at.isoformat()
+            record = {
+                "id": obj_id,
+                "created_at": created_at,
+                "updated_at": updated_at,
+                "name": f"{class_name.lower()}-{number}",
+                "number": number,
+                "__class__": class_name,
+            }
+            separator = ", " if number else ""
+            file.write(
+                f"{separator}{json.dumps(f'{class_name}.{obj_id}')}: "
+                f"{json.dumps(record)}"
+            )
+        file.write("}")
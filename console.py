@@ -3,17 +3,143 @@
 The Console Module
 """
 
+import argparse
+import ast
 import cmd
+import re
+import sys
+import time
 from models import storage
 from models.base_model import BaseModel
+from models.engine import query
+from models.engine.metrics import metrics
 import json
 
+# matches the <class>.<command>(<arguments>) form of the commands
+DOT_COMMAND = re.compile(r"^\s*(\w+)\.(\w+)\((.*)\)\s*$")
+
+# matches the first argument of a dot command, quoted or bare, and the
+# text of the arguments after it
+FIRST_ARGUMENT = re.compile(
+    r"""^\s*("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|[^,]*?)\s*(?:,(.*))?$""",
+    re.DOTALL,
+)
+
 
 class HBNBCommand(cmd.Cmd):
     """Command interpreter class for HBNB project."""
 
     prompt = "(hbnb) "
 
+    def run_batch(self, lines, flush_every=1000, report=None):
+        """Executes lines as commands without prompting, saving once
+        every flush_every commands instead of after every change, and
+        writes the throughput of every command to report."""
+
+        if report is None:
+            report = sys.stderr
+
+        # per command name: number of calls and total seconds
+        timings = {}
+        executed = 0
+        lines = iter(lines)
+        start = time.perf_counter()
+
+        stop = False
+        while not stop:
+            # every chunk of commands is saved once, when its batch exits
+            with storage.batch():
+                chunk = 0
+                for line in lines:
+                    line = self.precmd(line.rstrip("\n"))
+                    name = self.__command_name(line) or ""
+
+                    command_start = time.perf_counter()
+                    stop = self.postcmd(self.onecmd(line), line)
+                    elapsed = time.perf_counter() - command_start
+
+                    calls, seconds = timings.get(name, (0, 0.0))
+                    timings[name] = (calls + 1, seconds + elapsed)
+                    executed += 1
+                    chunk += 1
+                    if stop or chunk == flush_every:
+                        break
+                else:
+                    # the input is exhausted
+                    stop = True
+
+        total = time.perf_counter() - start
+        print(
+            "** batch: {} commands in {:.3f}s ({:.1f} commands/s) **".format(
+                executed, total, executed / total if total else 0.0
+            ),
+            file=report,
+        )
+        for name, (calls, seconds) in sorted(timings.items()):
+            if not name:
+                continue
+            print(
+                "** {}: {} calls, {:.3f}s ({:.1f} calls/s) **".format(
+                    name, calls, seconds, calls / seconds if seconds else 0.0
+                ),
+                file=report,
+            )
+
+    def precmd(self, line):
+        """Picks up the saves of other processes sharing the storage
+        before running line."""
+
+        storage.refresh()
+        return line
+
+    def onecmd(self, line):
+        """Runs line, timing it per command name if metrics are on."""
+
+        if not metrics.enabled:
+            return super().onecmd(line)
+
+        name = self.__command_name(line) or "emptyline"
+        with metrics.timer(f"console.{name}"):
+            return super().onecmd(line)
+
+    def __command_name(self, line):
+        """Returns the name of the command line runs, the same for the
+        <class>.<command>(<arguments>) form as for the plain one, or None
+        for an empty line."""
+
+        match = DOT_COMMAND.match(line)
+        if match is not None:
+            return match.group(2)
+        return self.parseline(line)[0]
+
+    def do_stats(self, arg):
+        """Prints the metrics, or turns them on, off or resets them:
+        stats [on|off|reset]"""
+
+        if arg in ("on", "off"):
+            metrics.enabled = arg == "on"
+            return
+        if arg == "reset":
+            metrics.reset()
+            return
+        if arg:
+            print("** unknown argument **")
+            return
+
+        if not metrics.enabled:
+            print("** metrics are off, use: stats on **")
+        snapshot = metrics.snapshot()
+        for name, value in snapshot["counters"].items():
+            print(f"{name}: {value}")
+        for name, summary in snapshot["histograms"].items():
+            print(
+                "{}: count={} mean={:.6g} p50={:.6g} p90={:.6g} "
+                "p99={:.6g} max={:.6g}".format(
+                    name, summary["count"], summary["mean"], summary["p50"],
+                    summary["p90"], summary["p99"], summary["max"],
+                )
+            )
+
     def do_quit(self, arg):
         """Quit command to exit the program."""
 
@@ -30,6 +156,103 @@ class HBNBCommand(cmd.Cmd):
 
         pass
 
+    def default(self, line):
+        """Runs the <class>.<command>(<arguments>) forms of the commands:
+        all([<page size>[, <cursor>]]), count(), show(<id>),
+        destroy(<id>), update(<id>, <attribute name>, <attribute value>)
+        and update(<id>, <dictionary representation>)."""
+
+        match = DOT_COMMAND.match(line)
+        commands = ("all", "count", "show", "destroy", "update")
+        if match is None or match.group(2) not in commands:
+            return super().default(line)
+
+        class_name, command, arguments = match.groups()
+        if class_name not in storage.classes():
+            print("** class doesn't exist **")
+            return
+        try:
+            arguments = self.__parse_arguments(arguments)
+        except ValueError:
+            print("** invalid arguments **")
+            return
+
+        if command == "count":
+            # counted without building or printing any instance
+            print(storage.count(class_name))
+        elif command == "update":
+            self.__update(class_name, arguments)
+        else:
+            getattr(self, "do_" + command)(
+                " ".join([class_name] + [str(arg) for arg in arguments])
+            )
+
+    @staticmethod
+    def __parse_arguments(text):
+        """Returns the arguments of a dot command as Python values, or as
+        strings if they are not literals. The first argument, an id or a
+        page size, may be bare; a dictionary must be a valid literal, and
+        ValueError is raised if it is not."""
+
+        match = FIRST_ARGUMENT.match(text)
+        if match is None or not match.group(1):
+            return []
+        first, rest = match.groups()
+        arguments = [HBNBCommand.__literal(first, str)]
+        if rest is None or not rest.strip():
+            return arguments
+
+        try:
+            arguments.extend(ast.literal_eval("(" + rest + ",)"))
+        except (ValueError, SyntaxError):
+            if rest.lstrip().startswith("{"):
+                raise ValueError("invalid dictionary")
+            # a bare attribute name, then a value that may hold commas
+            arguments.extend(
+                HBNBCommand.__literal(arg, object)
+                for arg in rest.split(",", 1)
+            )
+        return arguments
+
+    @staticmethod
+    def __literal(text, kind):
+        """Returns the value of the literal text if it is of type kind,
+        or text without its quotes otherwise."""
+
+        text = text.strip()
+        try:
+            value = ast.literal_eval(text)
+        except (ValueError, SyntaxError):
+            return text.strip("\"'")
+        return value if isinstance(value, kind) else text
+
+    def __update(self, class_name, arguments):
+        """Sets the attributes given as (<id>, <name>, <value>) or as
+        (<id>, <dictionary>) on an instance, and saves it once."""
+
+        if not arguments:
+            print("** instance id missing **")
+            return
+        instance = storage.get(class_name, str(arguments[0]))
+        if instance is None:
+            print("** no instance found **")
+            return
+
+        if len(arguments) > 1 and isinstance(arguments[1], dict):
+            attributes = arguments[1]
+        elif len(arguments) < 2:
+            print("** attribute name missing **")
+            return
+        elif len(arguments) < 3:
+            print("** value missing **")
+            return
+        else:
+            attributes = {arguments[1]: arguments[2]}
+
+        for attribute_name, attribute_value in attributes.items():
+            setattr(instance, str(attribute_name), attribute_value)
+        instance.save()
+
     def do_create(self, arg):
         """Creates a new instance of BaseModel, saves it,
         and prints the id."""
@@ -63,12 +286,12 @@ class HBNBCommand(cmd.Cmd):
             return
 
         instance_id = args[1]
-        key = "{}.{}".format(class_name, instance_id)
+        instance = storage.get(class_name, instance_id)
 
-        if key not in storage.all():
+        if instance is None:
             print("** no instance found **")
         else:
-            print(storage.all()[key])
+            print(instance)
 
     def do_destroy(self, arg):
         """Deletes an instance based on the class name and id."""
@@ -84,22 +307,80 @@ class HBNBCommand(cmd.Cmd):
             return
 
         instance_id = args[1]
-        key = "{}.{}".format(class_name, instance_id)
+        instance = storage.get(class_name, instance_id)
 
-        if key not in storage.all():
+        if instance is None:
             print("** no instance found **")
         else:
-            del storage.all()[key]
+            storage.delete(instance)
             storage.save()
 
     def do_all(self, arg):
         """Prints all string representation of all instances based
-        or not on the class name."""
+        or not on the class name: all [<class>] [<page size> [<cursor>]]
+        A page lists instances by key, after the cursor key, and is
+        followed by the cursor of the next page if there may be one."""
 
-        if not arg or arg in storage.classes():
-            print([str(value) for value in storage.all().values()])
-        else:
-            print("** class doesn't exist **")
+        args = arg.split()
+        class_name = None
+        if args and not args[0].isdigit():
+            class_name = args.pop(0)
+            if class_name not in storage.classes():
+                print("** class doesn't exist **")
+                return
+
+        if not args:
+            # each instance is built when it is printed, so the output
+            # starts before the class is read in full
+            if class_name is None:
+                objects = (
+                    obj
+                    for name in storage.classes()
+                    for obj in storage.stream(name)
+                )
+            else:
+                objects = storage.stream(class_name)
+            self.__print_list(objects)
+            return
+
+        if not args[0].isdigit() or int(args[0]) < 1:
+            print("** invalid page size **")
+            return
+        size = int(args[0])
+        cursor = args[1] if len(args) > 1 else None
+        page = storage.page(class_name, size, cursor)
+        self.__print_list(page)
+        if len(page) == size:
+            last = page[-1]
+            print("next: {}.{}".format(type(last).__name__, last.id))
+
+    @staticmethod
+    def __print_list(objects):
+        """Prints the list of the string representations of objects,
+        one string at a time rather than building it."""
+
+        separator = ""
+        print("[", end="")
+        for value in objects:
+            print(separator + repr(str(value)), end="")
+            separator = ", "
+        print("]")
+
+    def do_query(self, arg):
+        """Prints the instances of a class matching conditions, one per
+        line: query <class> [where <attribute> <op> <value> [and ...]]
+        [order by <attribute> [asc|desc]] [offset <n>] [limit <n>]
+        [select <attribute>,... | count]"""
+
+        try:
+            parsed = query.parse(arg, storage.classes())
+            if parsed.count:
+                print(parsed.count_in(storage))
+                return
+            for obj in parsed.run(storage):
+                print(parsed.project(obj) if parsed.fields else obj)
+        except ValueError as e:
+            print("** {} **".format(e))
 
     def do_update(self, arg):
         """Updates an instance based on the class name and id by
@@ -115,9 +396,9 @@ class HBNBCommand(cmd.Cmd):
             return
 
         instance_id = args[1]
-        key = "{}.{}".format(class_name, instance_id)
+        instance = storage.get(class_name, instance_id)
 
-        if key not in storage.all():
+        if instance is None:
             print("** no instance found **")
             return
 
@@ -131,9 +412,82 @@ class HBNBCommand(cmd.Cmd):
             return
 
         attribute_value = args[3]
-        setattr(storage.all()[key], attribute_name, attribute_value)
-        storage.all()[key].save()
+        setattr(instance, attribute_name, attribute_value)
+        instance.save()
+
+    def do_import(self, arg):
+        """Imports the instances stored in a newline-delimited JSON file,
+        one record per line, and prints how many were imported."""
+
+        args = arg.split()
+        if not args:
+            print("** file name missing **")
+            return
+
+        try:
+            count = storage.import_records(args[0])
+        except FileNotFoundError:
+            print("** file doesn't exist **")
+            return
+        except ValueError as e:
+            print("** invalid record, {} **".format(e))
+            return
+        print(count)
+
+    def do_export(self, arg):
+        """Exports the instances of a class to a newline-delimited JSON
+        file, one record per line, and prints how many were exported."""
+
+        args = arg.split()
+        if not args:
+            print("** class name missing **")
+            return
+        class_name = args[0]
+        if class_name not in storage.classes():
+            print("** class doesn't exist **")
+            return
+
+        if len(args) < 2:
+            print("** file name missing **")
+            return
+
+        try:
+            count = storage.export_records(class_name, args[1])
+        except OSError as e:
+            print("** cannot write file: {} **".format(e.strerror))
+            return
+        print(count)
 
 
 if __name__ == "__main__":
-    HBNBCommand().cmdloop()
+    parser = argparse.ArgumentParser(description="HBNB command interpreter")
+    parser.add_argument(
+        "--batch",
+        nargs="?",
+        const="-",
+        metavar="FILE",
+        help="execute the commands of FILE (or stdin) in bulk",
+    )
+    parser.add_argument(
+        "--flush-every",
+        type=int,
+        default=1000,
+        metavar="N",
+        help="in batch mode, save once every N commands (default 1000)",
+    )
+    options = parser.parse_args()
+
+    if options.batch is None:
+        HBNBCommand().cmdloop()
+    elif options.batch == "-":
+        HBNBCommand().run_batch(sys.stdin, options.flush_every)
+    else:
+        try:
+            commands = open(options.batch, "r", encoding="utf-8")
+        except OSError as e:
+            # report it like the other invalid arguments, with the usage
+            parser.error(
+                "cannot read {}: {}".format(options.batch, e.strerror)
+            )
+        with commands:
+            HBNBCommand().run_batch(commands, options.flush_every)
@@ -3,11 +3,53 @@
 Initialization for the Models Package
 """
 
-# import the FileStorage class from the file_storage module
-from models.engine.file_storage import FileStorage
+# import the os module for reading the storage options
+import os
 
-# create an instance of FileStorage and assign it to the variable 'storage'
-storage = FileStorage()
+# import the metrics shared by the storage engines and the console
+from models.engine.metrics import metrics
+
+# record counters and timings if requested, dumping them on exit if a
+# file is given
+if os.getenv("HBNB_METRICS") == "1" or os.getenv("HBNB_METRICS_FILE"):
+    metrics.enabled = True
+if os.getenv("HBNB_METRICS_FILE"):
+    metrics.dump_on_exit(os.getenv("HBNB_METRICS_FILE"))
+
+# select the storage engine: the SQLite database or the JSON file
+if os.getenv("HBNB_TYPE_STORAGE") == "db":
+    # import the DBStorage class from the db_storage module
+    from models.engine.db_storage import DBStorage
+
+    # create an instance of DBStorage and assign it to the variable 'storage'
+    storage = DBStorage(os.getenv("HBNB_DB_PATH", "file.db"))
+else:
+    # import the FileStorage class from the file_storage module
+    from models.engine.file_storage import FileStorage
+
+    # create an instance of FileStorage and assign it to the variable
+    # 'storage'
+    storage = FileStorage()
+
+    # build instances on first use rather than at import time if requested
+    storage.lazy = os.getenv("HBNB_STORAGE_LAZY") == "1"
+
+    # keep the records that are not built yet column by column unless
+    # dictionaries are requested
+    storage.columnar = os.getenv("HBNB_STORAGE_COLUMNAR") != "0"
+
+    # split file.json into this many shard files per class if requested
+    storage.shards = int(os.getenv("HBNB_STORAGE_SHARDS", "0"))
+
+    # lock the store and merge the saves of other processes if requested
+    storage.shared = os.getenv("HBNB_STORAGE_SHARED") == "1"
+
+    # encode every object on every save rather than keeping the JSON text
+    # of the whole store in memory if requested
+    storage.fragment_cache = os.getenv("HBNB_STORAGE_FRAGMENT_CACHE") != "0"
+
+    # write the snapshot in the binary or record file format if requested
+    storage.snapshot_format = os.getenv("HBNB_STORAGE_FORMAT", "json")
 
 # call the 'reload' method on the 'storage' instance
 storage.reload()
@@ -0,0 +1,18 @@
+#!/usr/bin/python3
+"""
+The Amenity Module
+"""
+
+# import the BaseModel class from the base_model module
+from models.base_model import BaseModel
+
+
+class Amenity(BaseModel):
+    """
+    Amenity class represents an amenity a place can offer.
+
+    Attributes:
+    - name (str): The name of the amenity.
+    """
+
+    name = ""
@@ -12,6 +12,15 @@ from datetime import datetime
 # import the storage module from the models package
 from models import storage
 
+# import the timestamps module for (de)serializing datetimes
+from models.engine import timestamps
+
+# import the RenderCache class for reusing rendered strings
+from models.engine.render_cache import RenderCache
+
+# cache of the strings rendered by __str__, shared by every model
+render_cache = RenderCache(maxsize=4096)
+
 
 class BaseModel:
     """
@@ -30,7 +39,10 @@ class BaseModel:
     - __init__(*args, **kwargs): Initializes a new instance of
         the BaseModel class.
         If kwargs are provided, sets attributes based on the key-value pairs.
-    - __str__(): Returns a string representation of the instance.
+    - __setattr__(name, value): Sets an attribute and marks the instance
+        as changed in the storage.
+    - __str__(): Returns a string representation of the instance,
+        cached until the next attribute assignment.
     - save(): Updates the 'updated_at' attribute with the current datetime
         and saves the instance.
     - to_dict(): Returns a dictionary representation of the instance,
@@ -40,39 +52,59 @@ class BaseModel:
     def __init__(self, *args, **kwargs):
         """Initializes a new instance of the BaseModel class."""
 
-        # default attribute assignments when no kwargs are provided
-        self.id = str(uuid.uuid4())
-        self.created_at = datetime.now()
-        self.updated_at = datetime.now()
-
-        # check if kwargs are provided during instantiation
-        if kwargs:
-            # iterate through key-value pairs in kwargs
-            for key, value in kwargs.items():
-                # check if the key is "created_at" or "updated_at"
-                if key == "created_at" or key == "updated_at":
-                    # parse and set datetime attributes
-                    # based on the provided value
-                    setattr(
-                        self,
-                        key,
-                        datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f"),
-                    )
-                else:
-                    # set regular attribute based
-                    # on the provided key-value pair
-                    self.__dict__[key] = value
-
         # check if no kwargs are provided during instantiation
         if not kwargs:
+            # default attribute assignments when no kwargs are provided
+            self.id = str(uuid.uuid4())
+            self.created_at = datetime.now()
+            self.updated_at = self.created_at
+
             # add the current instance to the storage
             storage.new(self)
+            return
+
+        # iterate through key-value pairs in kwargs
+        for key, value in kwargs.items():
+            # check if the key is "created_at" or "updated_at"
+            if key == "created_at" or key == "updated_at":
+                # parse and set datetime attributes
+                # based on the provided value
+                self.__dict__[key] = timestamps.parse(value)
+            else:
+                # set regular attribute based
+                # on the provided key-value pair
+                self.__dict__[key] = value
+
+        # fall back to fresh values for what kwargs did not provide
+        if "id" not in self.__dict__:
+            self.id = str(uuid.uuid4())
+        if "created_at" not in self.__dict__:
+            self.created_at = datetime.now()
+        if "updated_at" not in self.__dict__:
+            self.updated_at = self.created_at
+
+    def __setattr__(self, name, value):
+        """Sets an attribute and marks the instance as changed."""
+
+        # set the attribute as usual
+        super().__setattr__(name, value)
+
+        # the cached string shows the previous value
+        render_cache.discard(self)
+
+        # let the storage know the instance must be serialized again
+        storage.touch(self)
 
     def __str__(self):
         """String representation of an instance."""
 
-        # return a formatted string containing class name, id, and attributes
-        return f"[{type(self).__name__}] ({self.id}) {self.__dict__}"
+        # reuse the string rendered since the last assignment, if any
+        text = render_cache.get(self)
+        if text is None:
+            # format a string containing class name, id, and attributes
+            text = f"[{type(self).__name__}] ({self.id}) {self.__dict__}"
+            render_cache.put(self, text)
+        return text
 
     def save(self):
         """Updates the 'updated_at with the current datetime."""
@@ -80,6 +112,9 @@ class BaseModel:
         # set 'updated_at' attribute to the current date and time
         self.updated_at = datetime.now()
 
+        # register the instance again so storage knows it changed
+        storage.new(self)
+
         # save the changes to the storage
         storage.save()
 
@@ -96,8 +131,8 @@ class BaseModel:
 
         # convert 'created_at' and 'updated_at' attributes
         # to ISO format strings
-        instance_dict["created_at"] = self.created_at.isoformat()
-        instance_dict["updated_at"] = self.updated_at.isoformat()
+        instance_dict["created_at"] = timestamps.to_iso(self.created_at)
+        instance_dict["updated_at"] = timestamps.to_iso(self.updated_at)
 
         # return the modified dictionary
         return instance_dict
@@ -0,0 +1,20 @@
+#!/usr/bin/python3
+"""
+The City Module
+"""
+
+# import the BaseModel class from the base_model module
+from models.base_model import BaseModel
+
+
+class City(BaseModel):
+    """
+    City class represents a city places are located in.
+
+    Attributes:
+    - state_id (str): The id of the State the city belongs to.
+    - name (str): The name of the city.
+    """
+
+    state_id = ""
+    name = ""
@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+"""
+The AsyncStorage Module
+"""
+
+# import the asyncio module for running flushes off the event loop
+import asyncio
+
+
+class AsyncFileStorage:
+    """
+    The AsyncFileStorage class wraps a storage engine for use from
+    asyncio code, running its flushes and reloads in an executor so the
+    event loop keeps serving while the store is written or read.
+
+    Attributes:
+    - storage: The wrapped FileStorage (or DBStorage) instance, whose
+        other methods, such as all(), get() and new(), are available
+        on the wrapper as well.
+    - executor: The concurrent.futures executor the flushes run in,
+        None for the default executor of the event loop.
+
+    Methods:
+    - save(self): Writes the changes made so far, sharing a single
+        flush with every save() awaited at the same time.
+    - reload(self): Reloads the wrapped storage.
+
+    Coalescing:
+    At most one flush runs at a time. The save() calls made while one
+    runs all wait for the single flush that follows it, which writes
+    every change they made, so a burst of saves costs two writes at
+    most. The storage only holds its lock while a flush takes its
+    snapshot, so new(), delete() and reads made meanwhile do not wait
+    for the encoding and the write.
+    """
+
+    def __init__(self, storage=None, executor=None):
+        """
+        Initializes the wrapper around storage, the shared models.storage
+        by default.
+        """
+
+        if storage is None:
+            # import the shared storage instance from the models package
+            from models import storage
+
+        self.storage = storage
+        self.executor = executor
+        # future of the flush the next save() calls wait for
+        self.__next = None
+        # task running the flushes, None when none is running
+        self.__task = None
+
+    def __getattr__(self, name):
+        """Forwards the other attributes to the wrapped storage."""
+
+        return getattr(self.storage, name)
+
+    async def save(self):
+        """
+        Writes the changes made so far without blocking the event loop,
+        returning once a flush that started after this call is done.
+        """
+
+        if self.__next is None:
+            self.__next = asyncio.get_running_loop().create_future()
+        future = self.__next
+        if self.__task is None:
+            self.__task = asyncio.ensure_future(self.__run())
+
+        # a cancelled caller must not cancel the flush others wait for
+        await asyncio.shield(future)
+
+    async def reload(self):
+        """
+        Reloads the wrapped storage without blocking the event loop.
+        """
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self.storage.reload)
+
+    async def __run(self):
+        """
+        Flushes until no save() is waiting for a flush anymore.
+        """
+
+        loop = asyncio.get_running_loop()
+        try:
+            while self.__next is not None:
+                # the save() calls made from now on wait for the next flush
+                future, self.__next = self.__next, None
+                try:
+                    await loop.run_in_executor(
+                        self.executor, self.storage.flush
+                    )
+                except Exception as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(None)
+        finally:
+            self.__task = None
@@ -0,0 +1,138 @@
+#!/usr/bin/python3
+"""
+The Batching Module
+
+Provides the methods the storage engines share for bulk changes:
+batch(), which defers the saves made inside a block to a single save
+when the block exits and undoes the new() and delete() calls made
+inside it if it raises, nested blocks acting as savepoints, and
+import_records(), which adds the records of a newline-delimited JSON
+file one batch at a time.
+"""
+
+# import the contextlib module for the batch() context manager
+import contextlib
+
+# import the itertools module for slicing imports into batches
+import itertools
+
+# import the threading module for keeping the state of each thread
+import threading
+
+# import the streaming helpers for reading newline-delimited JSON
+from models.engine import json_stream
+
+
+class BatchState(threading.local):
+    """
+    The BatchState class holds the batch() state of each thread.
+
+    Attributes:
+    - depth (int): The number of nested batch() blocks open.
+    - save_requested (bool): Whether save() was called inside them.
+    - undo (dict): What the engine needs to roll back the changes
+        made inside the innermost block, by key, or None outside of a
+        batch.
+    """
+
+    def __init__(self):
+        """Initializes the state of a thread outside of any batch."""
+
+        self.depth = 0
+        self.save_requested = False
+        self.undo = None
+
+
+class BatchMixin:
+    """
+    The BatchMixin class gives a storage engine its batch() and
+    import_records() methods.
+
+    The engine provides _batch_state(), returning its BatchState, and
+    _rollback(undo), restoring the changes recorded in undo. Its save()
+    returns early when _defer_save() does, and its new() and delete()
+    record what they replace in the undo log of _batch_state().
+    """
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Defers every save() made inside the block to a single flush when
+        the outermost block exits, and undoes the new() and delete()
+        calls made inside a block if it raises. A nested block is a
+        savepoint: it only undoes its own changes, so an outer block that
+        catches its exception keeps the changes made before it.
+        """
+
+        # the state is the calling thread's, so no lock is needed
+        state = self._batch_state()
+        outermost = state.depth == 0
+        if outermost:
+            state.save_requested = False
+        # each block logs what its own changes replace
+        outer_undo = state.undo
+        state.undo = {}
+        state.depth += 1
+
+        try:
+            yield self
+        except BaseException:
+            state.depth -= 1
+            undo = state.undo
+            state.undo = outer_undo
+            if outermost:
+                state.save_requested = False
+            self._rollback(undo)
+            raise
+
+        state.depth -= 1
+        undo = state.undo
+        state.undo = outer_undo
+        if not outermost:
+            # the outer block undoes these changes too if it raises, to
+            # the state they replaced unless it changed them first
+            for key, value in undo.items():
+                outer_undo.setdefault(key, value)
+            return
+        requested = state.save_requested
+        state.save_requested = False
+        if requested:
+            self.save()
+
+    def import_records(self, path, batch_size=1000):
+        """
+        Adds the records of the newline-delimited JSON file at path,
+        one record per line, and returns how many were imported.
+
+        Records are validated against classes() and built through the
+        kwargs path of BaseModel.__init__, and every batch_size records
+        are saved together. An invalid record raises ValueError, after
+        rolling back the records of its batch.
+        """
+
+        classes = self.classes()
+        count = 0
+        with open(path, "r", encoding="utf-8") as file:
+            records = json_stream.iter_lines(file, classes)
+            while True:
+                with self.batch():
+                    chunk = 0
+                    for record in itertools.islice(records, batch_size):
+                        self.new(classes[record["__class__"]](**record))
+                        chunk += 1
+                    if chunk:
+                        self.save()
+                count += chunk
+                if chunk < batch_size:
+                    return count
+
+    def _defer_save(self):
+        """
+        Returns whether the calling thread is inside a batch, in which
+        case its save is recorded for when the batch exits.
+        """
+
+        state = self._batch_state()
+        if state.depth:
+            state.save_requested = True
+        return bool(state.depth)
@@ -0,0 +1,241 @@
+#!/usr/bin/python3
+"""
+The Binary Snapshot Module
+
+Reads and writes snapshots in a compact binary format, an alternative
+to the JSON object of file.json that is smaller and faster to read:
+- Field names and class names are stored once per layout, a (class
+    name, field names) pair, rather than once per record.
+- Records are stored as the number of their layout and the tuple of
+    their values, from which the "Class.id" key is rebuilt.
+- Timestamps are stored as integer microseconds since the epoch.
+
+The file starts with MAGIC and a version byte, followed by chunks of
+up to CHUNK_RECORDS records, each a marshal dump preceded by its size
+as a 4-byte little-endian integer, and ends with a size of 0. A chunk
+holds the layouts it introduces and its records. Within a chunk,
+marshal stores an object referenced by several records only once.
+"""
+
+# import the json module for converting snapshots to and from JSON
+import json
+
+# import the marshal module for encoding chunks of records
+import marshal
+
+# import the struct module for encoding the size of every chunk
+import struct
+
+# import the streaming helpers for reading and writing JSON snapshots
+from models.engine import json_stream
+
+# import the timestamps module for storing timestamps as integers
+from models.engine import timestamps
+
+# bytes every binary snapshot starts with, which no JSON text does
+MAGIC = b"\x89HBNB\r\n\x1a\n"
+
+# version of the format, written after MAGIC
+VERSION = 1
+
+# number of records encoded per chunk
+CHUNK_RECORDS = 4096
+
+# version of the marshal format used for the chunks
+MARSHAL_VERSION = 4
+
+# the size preceding every chunk
+CHUNK_SIZE = struct.Struct("<I")
+
+# the fields stored as integer microseconds since the epoch
+TIMESTAMPS = ("created_at", "updated_at")
+
+# maps the field names of records, in order, to their layout: the
+# tuple of fields stored, the position of "__class__" and the positions
+# of the timestamps among the stored fields
+_layouts = {}
+
+
+class SnapshotError(ValueError):
+    """
+    Raised when a binary snapshot cannot be decoded.
+    """
+
+
+def is_binary(file):
+    """
+    Returns whether the buffered binary file, positioned at its start,
+    holds a binary snapshot, without consuming anything.
+    """
+
+    return file.peek(len(MAGIC))[:len(MAGIC)] == MAGIC
+
+
+def encode_record(record):
+    """
+    Returns the encoded form of record, a dictionary as returned by
+    to_dict(), to be written by dump_records().
+    """
+
+    names = tuple(record)
+    layout = _layouts.get(names)
+    if layout is None:
+        fields = tuple(name for name in names if name != "__class__")
+        layout = _layouts[names] = (
+            fields,
+            names.index("__class__"),
+            [fields.index(name) for name in TIMESTAMPS if name in fields],
+        )
+    fields, position, timestamp_positions = layout
+
+    values = list(record.values())
+    class_name = values.pop(position)
+    for position in timestamp_positions:
+        if isinstance(values[position], str):
+            values[position] = timestamps.to_epoch(
+                timestamps.parse(values[position])
+            )
+    return class_name, fields, tuple(values)
+
+
+def decode_record(encoded):
+    """
+    Returns the record dictionary of a record encoded by encode_record(),
+    with its timestamps as integers.
+    """
+
+    class_name, fields, values = encoded
+    record = dict(zip(fields, values))
+    record["__class__"] = class_name
+    return record
+
+
+def dump_records(file, items):
+    """
+    Writes a binary snapshot to the binary file, one chunk at a time.
+
+    items yields (key, encoded) pairs, where encoded is the record
+    stored under key as returned by encode_record().
+
+    Raises SnapshotError for a key other than "<class name>.<id>".
+    """
+
+    file.write(MAGIC + bytes((VERSION,)))
+    layouts = {}
+    added = []
+    records = []
+    for key, (class_name, fields, values) in items:
+        layout = layouts.get((class_name, fields))
+        if layout is None:
+            if "id" not in fields:
+                raise SnapshotError(f"{key}: record without an id")
+            layout = layouts[(class_name, fields)] = len(layouts)
+            added.append((class_name, fields))
+        if key != f"{class_name}.{values[fields.index('id')]}":
+            raise SnapshotError(f"{key}: key does not match the record")
+        records.append((layout, values))
+
+        if len(records) == CHUNK_RECORDS:
+            _dump_chunk(file, added, records)
+            added = []
+            records = []
+
+    if records:
+        _dump_chunk(file, added, records)
+    file.write(CHUNK_SIZE.pack(0))
+
+
+def _dump_chunk(file, added, records):
+    """Writes a chunk of records and the layouts it introduces."""
+
+    data = marshal.dumps((added, records), MARSHAL_VERSION)
+    file.write(CHUNK_SIZE.pack(len(data)) + data)
+
+
+def iter_records(file):
+    """
+    Yields the (key, record) pairs of the binary snapshot stored in the
+    binary file, decoding one chunk at a time.
+
+    Raises SnapshotError if the file is not a complete binary snapshot.
+    Records decoded before the error have already been yielded.
+    """
+
+    header = file.read(len(MAGIC) + 1)
+    if header[:len(MAGIC)] != MAGIC:
+        raise SnapshotError("not a binary snapshot")
+    if header[len(MAGIC):] != bytes((VERSION,)):
+        raise SnapshotError(f"unsupported version {header[len(MAGIC):]!r}")
+
+    # (class name, fields, position of the id) of every layout
+    layouts = []
+    while True:
+        header = file.read(CHUNK_SIZE.size)
+        if len(header) != CHUNK_SIZE.size:
+            raise SnapshotError("truncated snapshot")
+        size = CHUNK_SIZE.unpack(header)[0]
+        if not size:
+            return
+
+        data = file.read(size)
+        try:
+            if len(data) != size:
+                raise EOFError("chunk cut short")
+            added, records = marshal.loads(data)
+        except (EOFError, ValueError, TypeError) as e:
+            raise SnapshotError(f"truncated or corrupted snapshot: {e}")
+
+        for class_name, fields in added:
+            layouts.append((class_name, fields, fields.index("id")))
+        for layout, values in records:
+            class_name, fields, position = layouts[layout]
+            record = dict(zip(fields, values))
+            record["__class__"] = class_name
+            yield f"{class_name}.{values[position]}", record
+
+
+def json_to_binary(source, destination):
+    """
+    Converts the JSON snapshot at source to a binary snapshot written
+    to destination, and returns the number of records.
+    """
+
+    count = 0
+
+    def items(file):
+        nonlocal count
+        for key, record in json_stream.iter_items(file):
+            count += 1
+            yield key, encode_record(record)
+
+    with open(source, "r", encoding="utf-8") as file, \
+            open(destination, "wb") as output:
+        dump_records(output, items(file))
+    return count
+
+
+def binary_to_json(source, destination, timestamp_format="iso"):
+    """
+    Converts the binary snapshot at source to a JSON snapshot written
+    to destination, with timestamps in timestamp_format ("iso" or
+    "epoch"), and returns the number of records.
+    """
+
+    count = 0
+
+    def items(file):
+        nonlocal count
+        for key, record in iter_records(file):
+            if timestamp_format == "iso":
+                for name in TIMESTAMPS:
+                    if isinstance(record.get(name), int):
+                        record[name] = timestamps.to_iso(
+                            timestamps.parse(record[name])
+                        )
+            count += 1
+            yield key, json.dumps(record)
+
+    with open(source, "rb") as file, \
+            open(destination, "w", encoding="utf-8") as output:
+        json_stream.dump_items(output, items(file))
+    return count
@@ -0,0 +1,131 @@
+#!/usr/bin/python3
+"""
+The Columns Module
+
+Stores the records of one model class column by column, so a record
+costs one list slot per field instead of a dictionary of its own.
+"""
+
+# marks the fields a record does not have
+MISSING = object()
+
+
+class ColumnStore:
+    """
+    The ColumnStore class holds the pending records of one class,
+    behaving like the {key: record dictionary} mapping it replaces.
+
+    Attributes:
+    - fields (dict): Maps field names to their column number.
+    - columns (list): One list of values per field, indexed by row.
+    - rows (dict): Maps record keys to their row number.
+    - free (list): Row numbers left behind by removed records.
+
+    The "__class__" field is implied by the store and the "id" field by
+    the key, so neither is stored when it can be rebuilt.
+    """
+
+    def __init__(self):
+        """Initializes an empty store."""
+
+        self.fields = {}
+        self.columns = []
+        self.rows = {}
+        self.free = []
+        self.class_name = None
+        self.size = 0
+
+    def __len__(self):
+        """Returns the number of records."""
+
+        return len(self.rows)
+
+    def __contains__(self, key):
+        """Returns whether a record is stored under key."""
+
+        return key in self.rows
+
+    def __setitem__(self, key, record):
+        """Stores record under key, replacing any previous one."""
+
+        if self.class_name is None:
+            self.class_name = record.get("__class__")
+
+        row = self.rows.get(key)
+        if row is None:
+            row = self.__allocate()
+            self.rows[key] = row
+        else:
+            self.__clear(row)
+
+        for name, value in record.items():
+            if name == "__class__" and value == self.class_name:
+                continue
+            if name == "id" and key == f"{self.class_name}.{value}":
+                continue
+            column = self.fields.get(name)
+            if column is None:
+                # a new field gets a column of missing values
+                column = len(self.columns)
+                self.fields[name] = column
+                self.columns.append([MISSING] * self.size)
+            self.columns[column][row] = value
+
+    def get(self, key, default=None):
+        """Returns the record stored under key, or default."""
+
+        row = self.rows.get(key)
+        if row is None:
+            return default
+        return self.__record(key, row)
+
+    def pop(self, key, default=None):
+        """Removes and returns the record stored under key, or default."""
+
+        row = self.rows.pop(key, None)
+        if row is None:
+            return default
+
+        record = self.__record(key, row)
+        self.__clear(row)
+        self.free.append(row)
+        return record
+
+    def keys(self):
+        """Returns the keys of the store."""
+
+        return self.rows.keys()
+
+    def items(self):
+        """Yields the (key, record) pairs of the store."""
+
+        for key, row in self.rows.items():
+            yield key, self.__record(key, row)
+
+    def __allocate(self):
+        """Returns a free row number, growing the columns if needed."""
+
+        if self.free:
+            return self.free.pop()
+
+        for column in self.columns:
+            column.append(MISSING)
+        self.size += 1
+        return self.size - 1
+
+    def __clear(self, row):
+        """Resets every field of row to missing."""
+
+        for column in self.columns:
+            column[row] = MISSING
+
+    def __record(self, key, row):
+        """Rebuilds the record dictionary stored in row."""
+
+        record = {"id": key.split(".", 1)[1]}
+        for name, column in self.fields.items():
+            value = self.columns[column][row]
+            if value is not MISSING:
+                record[name] = value
+        record["__class__"] = self.class_name
+        return record
@@ -0,0 +1,572 @@
+#!/usr/bin/python3
+"""
+The DBStorage Module
+"""
+
+# import the json module for handling JSON data
+import json
+
+# import the sqlite3 module for the database itself
+import sqlite3
+
+# import the threading module for sharing the connection between threads
+import threading
+
+# import the weakref module for the identity map of loaded instances
+import weakref
+
+# import the BatchMixin class providing batch() and import_records(),
+# and its state
+from models.engine.batching import BatchMixin, BatchState
+
+
+class DBStorage(BatchMixin):
+    """
+    The DBStorage class stores instances in an SQLite database, one row
+    per instance holding its JSON representation, as an alternative to
+    FileStorage with the same interface.
+
+    Attributes:
+    - __db_path (str): The path of the SQLite database file.
+    - __connection (sqlite3.Connection): The open database connection.
+    - __objects (WeakValueDictionary): The instances loaded so far, so a
+        key always maps to the same instance while it is in use.
+    - __changes (dict): Changes since the last save, mapping keys to
+        instances (None if deleted).
+
+    Methods:
+    - all(self, cls=None): Returns the stored instances, or only
+        the instances of cls.
+    - get(self, cls, id): Returns the instance of cls with the given id.
+    - count(self, cls=None): Returns the number of stored instances.
+    - page(self, cls=None, limit=None, after=None): Returns at most
+        limit instances ordered by key, starting after a key.
+    - stream(self, cls): Yields the instances of cls, building them
+        one row at a time.
+    - find(self, cls, **filters): Returns the instances of cls whose
+        attributes are equal to the given filters.
+    - add_index(self, cls, attribute): Indexes the instances of cls
+        by attribute in the database.
+    - new(self, obj): Adds a new object to the storage.
+    - delete(self, obj=None): Removes obj from the storage.
+    - touch(self, obj): Marks a stored object as changed.
+    - save(self): Writes the changes, unless a batch defers it.
+    - flush(self): Writes the changes in a single transaction.
+    - batch(self): Context manager deferring saves until it exits.
+    - import_records(self, path, batch_size=1000): Adds the records of
+        a newline-delimited JSON file, saving once per batch.
+    - export_records(self, cls, path): Writes the instances of cls
+        to a newline-delimited JSON file.
+    - classes(self): Returns a dictionary mapping class names
+        to their corresponding types.
+    - reload(self): Opens the database, creating its table if needed.
+    - refresh(self): Reads the loaded instances again if another
+        connection changed the database since the last look.
+
+    Only the instances that are looked up are loaded, so point lookups
+    and updates cost an index lookup rather than a pass over the whole
+    store, and the store does not have to fit in memory. The database
+    runs in WAL mode, so readers are not blocked by a save.
+    """
+
+    def __init__(self, db_path="file.db"):
+        """
+        Initializes a storage backed by the database at db_path.
+        """
+
+        self.__db_path = db_path
+        self.__connection = None
+        self.__objects = weakref.WeakValueDictionary()
+        self.__changes = {}
+        self.__lock = threading.RLock()
+        self.__batches = BatchState()
+        self.__classes = None
+        self.__data_version = None
+
+    @property
+    def db_path(self):
+        """
+        Getter method for the 'db_path' property.
+        """
+
+        return self.__db_path
+
+    def all(self, cls=None):
+        """
+        Returns a dictionary of the stored instances, or of the
+        instances of cls (a class or a class name) if it is given.
+        """
+
+        if cls is None:
+            rows = self.__execute("SELECT key, data FROM objects")
+        else:
+            rows = self.__execute(
+                "SELECT key, data FROM objects WHERE class = ?",
+                (self.__class_name(cls),),
+            )
+        return self.__merge(cls, rows, lambda obj: True)
+
+    def get(self, cls, id):
+        """
+        Returns the instance of cls (a class or a class name)
+        with the given id, or None if there is none.
+        """
+
+        key = f"{self.__class_name(cls)}.{id}"
+        with self.__lock:
+            if key in self.__changes:
+                return self.__changes[key]
+            obj = self.__objects.get(key)
+            if obj is not None:
+                return obj
+
+            row = self.__execute(
+                "SELECT data FROM objects WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            return self.__build(key, row[0])
+
+    def count(self, cls=None):
+        """
+        Returns the number of stored instances, or of instances of cls.
+        """
+
+        with self.__lock:
+            if cls is None:
+                class_name = None
+                total = self.__execute(
+                    "SELECT COUNT(*) FROM objects"
+                ).fetchone()[0]
+            else:
+                class_name = self.__class_name(cls)
+                total = self.__execute(
+                    "SELECT COUNT(*) FROM objects WHERE class = ?",
+                    (class_name,),
+                ).fetchone()[0]
+
+            # account for the changes that are not saved yet
+            for key, obj in self.__changes.items():
+                if class_name and not key.startswith(class_name + "."):
+                    continue
+                stored = self.__execute(
+                    "SELECT 1 FROM objects WHERE key = ?", (key,)
+                ).fetchone()
+                if obj is None and stored:
+                    total -= 1
+                elif obj is not None and not stored:
+                    total += 1
+            return total
+
+    def stream(self, cls):
+        """
+        Yields the instances of cls (a class or a class name), reading
+        and building them a few rows at a time, so a caller that stops
+        early only builds the instances it used.
+        """
+
+        class_name = self.__class_name(cls)
+        rows = self.__execute(
+            "SELECT key, data FROM objects WHERE class = ?", (class_name,)
+        )
+        while True:
+            with self.__lock:
+                chunk = rows.fetchmany(100)
+                objects = [
+                    self.__build(key, data)
+                    for key, data in chunk
+                    if key not in self.__changes
+                ]
+            if not chunk:
+                break
+            yield from objects
+
+        # then the instances that are not saved yet
+        prefix = class_name + "."
+        with self.__lock:
+            changed = [
+                obj
+                for key, obj in self.__changes.items()
+                if obj is not None and key.startswith(prefix)
+            ]
+        yield from changed
+
+    def page(self, cls=None, limit=None, after=None):
+        """
+        Returns a list of at most limit instances, or instances of cls,
+        ordered by key, starting after the key after. The database reads
+        the page from the primary key index, so paging through the store
+        by passing the key of the last instance of each page only reads
+        and builds the rows of each page.
+        """
+
+        prefix = None if cls is None else self.__class_name(cls) + "."
+        query = "SELECT key, data FROM objects"
+        conditions = []
+        params = []
+        if prefix is not None:
+            conditions.append("class = ?")
+            params.append(prefix[:-1])
+        if after is not None:
+            conditions.append("key > ?")
+            params.append(after)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY key"
+
+        with self.__lock:
+            changes = {
+                key: obj
+                for key, obj in self.__changes.items()
+                if (prefix is None or key.startswith(prefix))
+                and (after is None or key > after)
+            }
+            if limit is not None:
+                # read enough rows to fill the page if unsaved changes
+                # replace or delete some of them
+                query += " LIMIT ?"
+                params.append(limit + len(changes))
+
+            rows = {
+                key: data
+                for key, data in self.__execute(query, params)
+                if key not in changes
+            }
+            keys = sorted(
+                set(rows)
+                | {key for key, obj in changes.items() if obj is not None}
+            )
+            return [
+                changes[key] if key in changes
+                else self.__build(key, rows[key])
+                for key in keys[:limit]
+            ]
+
+    def find(self, cls, **filters):
+        """
+        Returns a dictionary of the instances of cls whose attributes
+        are equal to the values given as keyword arguments.
+        """
+
+        class_name = self.__class_name(cls)
+        query = "SELECT key, data FROM objects WHERE class = ?"
+        params = [class_name]
+        for attribute, value in filters.items():
+            # only plain values can be compared by the database, and the
+            # path is inlined so the indexes of add_index() can be used
+            if not attribute.isidentifier() or isinstance(value, bool):
+                continue
+            if isinstance(value, (str, int, float)):
+                query += f" AND json_extract(data, '$.{attribute}') = ?"
+                params.append(value)
+
+        missing = object()
+        return self.__merge(
+            cls,
+            self.__execute(query, params),
+            lambda obj: all(
+                getattr(obj, attribute, missing) == value
+                for attribute, value in filters.items()
+            ),
+        )
+
+    def add_index(self, cls, attribute):
+        """
+        Indexes the instances of cls (a class or a class name)
+        by the value of attribute, to speed up find().
+        """
+
+        class_name = self.__class_name(cls)
+        if not attribute.isidentifier() or not class_name.isidentifier():
+            raise ValueError(f"invalid index: {class_name}.{attribute}")
+
+        # the expression must match the one find() filters on
+        self.__execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{class_name}_{attribute} "
+            f"ON objects(class, json_extract(data, '$.{attribute}'))"
+        )
+
+    def new(self, obj):
+        """
+        Adds obj to the storage, to be written by the next save.
+        """
+
+        key = f"{type(obj).__name__}.{obj.id}"
+        with self.__lock:
+            self.__remember(key)
+            self.__objects[key] = obj
+            self.__changes[key] = obj
+
+    def delete(self, obj=None):
+        """
+        Deletes obj from the storage with the next save.
+        """
+
+        if obj is None:
+            return
+
+        key = f"{type(obj).__name__}.{obj.id}"
+        with self.__lock:
+            self.__remember(key)
+            self.__objects.pop(key, None)
+            self.__changes[key] = None
+
+    def touch(self, obj):
+        """
+        Marks obj as changed so the next save writes it again.
+        """
+
+        key = f"{type(obj).__name__}.{obj.id}"
+        # objects that are not (yet) stored have nothing to write
+        if self.__objects.get(key) is obj:
+            with self.__lock:
+                self.__changes[key] = obj
+
+    def save(self):
+        """
+        Writes the changes made since the last save, or defers it
+        to the end of the current batch.
+        """
+
+        if not self._defer_save():
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the changes made since the last save in one transaction.
+        """
+
+        with self.__lock:
+            if not self.__changes:
+                return
+
+            upserts = []
+            deletes = []
+            for key, obj in self.__changes.items():
+                if obj is None:
+                    deletes.append((key,))
+                else:
+                    upserts.append(
+                        (key, type(obj).__name__, json.dumps(obj.to_dict()))
+                    )
+
+            # executemany runs one prepared statement for every row
+            with self.__connect():
+                self.__connection.executemany(
+                    "INSERT OR REPLACE INTO objects (key, class, data) "
+                    "VALUES (?, ?, ?)",
+                    upserts,
+                )
+                self.__connection.executemany(
+                    "DELETE FROM objects WHERE key = ?", deletes
+                )
+            self.__changes.clear()
+
+    def export_records(self, cls, path):
+        """
+        Writes the instances of cls (a class or a class name) to path
+        as newline-delimited JSON, one record per line, and returns how
+        many were written. Rows are copied without building instances.
+        """
+
+        count = 0
+        with self.__lock, open(path, "w", encoding="utf-8") as file:
+            # the rows must include the changes made so far
+            self.flush()
+            rows = self.__execute(
+                "SELECT data FROM objects WHERE class = ?",
+                (self.__class_name(cls),),
+            )
+            for (data,) in rows:
+                file.write(data + "\n")
+                count += 1
+        return count
+
+    def classes(self):
+        """
+        Returns the dictionary mapping class names
+        to their corresponding types.
+        """
+
+        if self.__classes is None:
+            # import the FileStorage class, which owns the class registry
+            from models.engine.file_storage import FileStorage
+
+            self.__classes = FileStorage().classes()
+        return self.__classes
+
+    def reload(self):
+        """
+        Opens the database, creating its table if it does not exist.
+        """
+
+        with self.__lock:
+            self.__connect()
+
+    def refresh(self):
+        """
+        Reads the loaded instances again if another connection committed
+        changes since the last call, and returns whether it did. Each
+        instance is updated in place from its row, so the references
+        callers hold stay the stored instances; those whose row is gone
+        are forgotten. Unsaved changes are kept.
+        """
+
+        with self.__lock:
+            # data_version only changes on commits of other connections
+            version = self.__execute("PRAGMA data_version").fetchone()[0]
+            if version == self.__data_version:
+                return False
+            self.__data_version = version
+
+            for key, obj in list(self.__objects.items()):
+                if key in self.__changes:
+                    continue
+                row = self.__execute(
+                    "SELECT data FROM objects WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    del self.__objects[key]
+                else:
+                    self.__update_instance(obj, json.loads(row[0]))
+            return True
+
+    def close(self):
+        """
+        Writes the pending changes and closes the database.
+        """
+
+        with self.__lock:
+            if self.__connection is not None:
+                self.flush()
+                self.__connection.close()
+                self.__connection = None
+
+    def __connect(self):
+        """
+        Returns the open connection, opening it first if needed.
+        """
+
+        if self.__connection is None:
+            connection = sqlite3.connect(
+                self.__db_path, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS objects ("
+                "key TEXT PRIMARY KEY, "
+                "class TEXT NOT NULL, "
+                "data TEXT NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_objects_class "
+                "ON objects(class)"
+            )
+            connection.commit()
+            self.__connection = connection
+        return self.__connection
+
+    def __execute(self, query, params=()):
+        """
+        Runs query on the database and returns its cursor.
+        """
+
+        with self.__lock:
+            return self.__connect().execute(query, params)
+
+    def __build(self, key, data):
+        """
+        Returns the instance stored under key, building it from its
+        JSON text unless it is already loaded.
+        """
+
+        obj = self.__objects.get(key)
+        if obj is None:
+            obj_dict = json.loads(data)
+            obj = self.classes()[obj_dict["__class__"]](**obj_dict)
+            self.__objects[key] = obj
+        return obj
+
+    def __merge(self, cls, rows, matches):
+        """
+        Returns the instances of rows overlaid with the unsaved changes,
+        keeping those for which matches returns True.
+        """
+
+        prefix = None if cls is None else self.__class_name(cls) + "."
+        with self.__lock:
+            result = {}
+            for key, data in rows:
+                if key not in self.__changes:
+                    obj = self.__build(key, data)
+                    if matches(obj):
+                        result[key] = obj
+
+            for key, obj in self.__changes.items():
+                if obj is None or (prefix and not key.startswith(prefix)):
+                    continue
+                if matches(obj):
+                    result[key] = obj
+            return result
+
+    def __remember(self, key):
+        """
+        Records the change pending on key before the current batch
+        changes it, so the batch can be rolled back.
+        """
+
+        undo = self._batch_state().undo
+        if undo is not None and key not in undo:
+            undo[key] = (
+                key in self.__changes,
+                self.__changes.get(key),
+                self.__objects.get(key),
+            )
+
+    def _batch_state(self):
+        """
+        Returns the batch() state of the threads, for BatchMixin.
+        """
+
+        return self.__batches
+
+    def _rollback(self, undo):
+        """
+        Restores the changes pending before a batch, as recorded in
+        undo, for BatchMixin.
+        """
+
+        with self.__lock:
+            for key, (changed, change, obj) in undo.items():
+                if changed:
+                    self.__changes[key] = change
+                else:
+                    self.__changes.pop(key, None)
+                if obj is not None:
+                    self.__objects[key] = obj
+                else:
+                    self.__objects.pop(key, None)
+
+    def __update_instance(self, obj, obj_dict):
+        """
+        Gives obj the attributes of the record obj_dict.
+        """
+
+        # import the cache of the strings rendered for the instances
+        from models.base_model import render_cache
+
+        # built apart, then copied without __setattr__, so obj is not
+        # marked as changed
+        fresh = self.classes()[obj_dict["__class__"]](**obj_dict)
+        vars(obj).clear()
+        vars(obj).update(vars(fresh))
+        render_cache.discard(obj)
+
+    @staticmethod
+    def __class_name(cls):
+        """
+        Returns the name of cls, which is either a class or a name.
+        """
+
+        return cls if isinstance(cls, str) else cls.__name__
@@ -3,14 +3,74 @@
 The FileStorage Module
 """
 
+# import the atexit module for flushing pending writes on exit
+import atexit
+
+# import the io module for reading JSON snapshots from binary files
+import io
+
+# import the contextlib module for the lock file context manager
+import contextlib
+
+# import the heapq module for the keys of a page
+import heapq
+
+# import the itertools module for slicing imports into batches
+import itertools
+
 # import the json module for handling JSON data
 import json
 
 # import the os module for interacting with the operating system
 import os
 
+# import the tempfile module for writing snapshots next to file.json
+import tempfile
+
+# import the threading module for write-behind flushes
+import threading
+
+# import the time module for spacing out group commits
+import time
+
+# import the fcntl module for locking the store between processes,
+# which only exists on POSIX systems
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# import the zlib module for hashing keys to shards
+import zlib
+
+# import the BatchMixin class providing batch() and import_records(),
+# and its state
+from models.engine.batching import BatchMixin, BatchState
+
+# import the streaming helpers for reading and writing file.json
+from models.engine import json_stream
+
+# import the binary snapshot format, an alternative to JSON
+from models.engine import binary_snapshot
+
+# import the ColumnStore class for compact pending records
+from models.engine.columns import ColumnStore
+
+# import the record file format, whose records are read on demand
+from models.engine import record_file
+from models.engine.record_file import MappedRecords
+
+# import the timestamps module for writing epoch timestamps
+from models.engine import timestamps
+
+# import the shared metrics for instrumenting saves and reloads
+from models.engine.metrics import metrics
 
-class FileStorage:
+# the pending record stores that build a new record on every lookup
+REBUILT = (ColumnStore, MappedRecords)
+
+
+class FileStorage(BatchMixin):
     """
     The FileStorage class is responsible for serializing instances
     to a JSON file and deserializing JSON files back to instances.
@@ -23,22 +83,261 @@ class FileStorage:
         with keys in the format '<class_name>.<instance_id>'.
 
     Methods:
-    - all(self): Returns the dictionary __objects containing
-        all stored instances.
+    - all(self, cls=None): Returns a copy of the dictionary __objects
+        containing all stored instances, or only the instances of cls.
+    - get(self, cls, id): Returns the instance of cls with the given id.
+    - count(self, cls=None): Returns the number of stored instances.
+    - page(self, cls=None, limit=None, after=None): Returns at most
+        limit instances ordered by key, starting after a key.
+    - stream(self, cls): Yields the instances of cls, building pending
+        records one at a time.
+    - find(self, cls, **filters): Returns the instances of cls whose
+        attributes are equal to the given filters.
+    - add_index(self, cls, attribute): Maintains a secondary index
+        of the instances of cls by attribute.
     - new(self, obj): Adds a new object to __objects with a key
         derived from the object's class name and ID.
-    - save(self): Serializes __objects to the JSON file specified
-        by __file_path.
+    - delete(self, obj=None): Removes obj from __objects, if present.
+    - touch(self, obj): Marks a stored object as changed.
+    - save(self): Persists the changes, unless a batch or write-behind
+        defers it.
+    - flush(self): Serializes __objects to the JSON file specified
+        by __file_path, or appends the pending changes to the journal
+        when journal mode is enabled.
+    - batch(self): Context manager deferring saves until it exits.
+    - import_records(self, path, batch_size=1000): Adds the records of
+        a newline-delimited JSON file, saving once per batch.
+    - export_records(self, cls, path): Writes the instances of cls
+        to a newline-delimited JSON file.
+    - compact(self): Folds the journal back into a fresh snapshot.
     - classes(self): Returns a dictionary mapping class names
         to their corresponding types.
     - reload(self): Deserializes the JSON file to __objects,
-        only if the file exists.
+        only if the file exists, then replays the journal on top of it.
+    - refresh(self): Reloads the store in shared mode if another
+        process saved it since it was last read.
+
+    Journal mode:
+    When journal mode is enabled, save() appends only the objects that
+    changed since the last save (upserts and deletions) to an append-only
+    journal next to the snapshot, instead of rewriting the whole file.
+    Once the journal holds more than journal_limit entries, it is folded
+    back into a fresh snapshot by compact().
+
+    Incremental serialization:
+    The JSON text of every object is cached after it is serialized, and
+    only objects marked as changed (through new() or touch(), which
+    BaseModel calls on every attribute assignment) are encoded again.
+    In-place mutations, such as appending to a list attribute, are not
+    detected and must be followed by an assignment or a touch().
+    The cache holds about as much text as the snapshot itself for as
+    long as the process runs. Setting fragment_cache to False drops it
+    and encodes every object on every full save instead.
+
+    Indexes:
+    Stored instances are indexed by class, so all(cls) costs the size of
+    its result rather than the size of __objects. Secondary indexes on
+    attributes (for example Review.place_id) are opt-in through
+    add_index() and let find() look up matching instances directly.
+    Objects should be added and removed through new() and delete()
+    rather than by editing the dictionary returned by all().
+
+    Streaming:
+    file.json is written and read one entry at a time, so saving and
+    reloading hold no more than one entry of JSON text at a time on
+    their own. The fragment cache is the exception: while it is enabled,
+    every save keeps the JSON text of the objects it encoded until the
+    write is done, then caches it. With fragment_cache set to False, a
+    save, compact() or export_records() holds the text of one record at
+    a time, besides the references to the objects it writes.
+
+    Threads:
+    Any number of threads may create, change, delete, read and save
+    objects at the same time. A save holds the lock only while it takes
+    a snapshot of the references to write and the changes to forget,
+    then encodes and writes the snapshot without it, so the other
+    threads are not blocked by serialization or disk I/O. Saves
+    themselves run one at a time. all() returns a copy of __objects.
+
+    Batches and write-behind:
+    Inside a batch() block, save() only records that a save was asked
+    for, and a single flush happens when the outermost block exits. If
+    the block raises, the objects added or deleted inside it through
+    new() and delete() are restored instead; attribute changes are kept.
+    A nested block that raises only restores the objects of its own
+    new() and delete() calls.
+    Batches belong to the thread that opens them: the saves of other
+    threads are not deferred, and a rollback only undoes the new() and
+    delete() calls of its own thread.
+    When write_behind is set to a number of milliseconds, save() only
+    schedules a flush that a background thread performs at most once
+    every write_behind milliseconds, and at exit.
+
+    Timestamps:
+    created_at and updated_at are written as ISO 8601 strings, or as
+    integer microseconds since the epoch when timestamp_format is set
+    to "epoch", which is smaller and faster to read back. Both forms
+    are accepted when reloading, whatever the current format is.
+
+    Binary snapshots:
+    When snapshot_format is set to "binary", file.json and the shard
+    files are written in the format of the binary_snapshot module, which
+    stores field names once per class and timestamps as integers, and
+    is smaller and faster to read than JSON. Reloading detects the
+    format of every file, and the journal stays JSON in both formats.
+
+    Record files:
+    When snapshot_format is set to "records", file.json is written as a
+    record file of the record_file module, one JSON record per line,
+    with an index of the offset of every record in index_path. Reloading
+    only reads the index and maps the file with mmap, keeping every
+    record pending until it is looked up, so a get() decodes one record
+    whatever the size of the store. Saves append the changed records
+    and their offsets instead of rewriting the file, which is only
+    rewritten whole once it mostly holds stale versions of records.
+    Record files are never sharded and need no journal.
+
+    Durability:
+    Snapshots are written to a temporary file in the same directory and
+    renamed over file.json, so an interrupted save leaves the previous
+    snapshot in place. The durability level decides when data is forced
+    to disk with fsync, for snapshots and journal appends alike:
+    - "none": never, so a power failure may lose recent saves.
+    - "fsync": on every save, before it returns.
+    - "group": at most once every commit_interval seconds, so a power
+        failure may lose the saves made since the last fsync. A save
+        made less than commit_interval seconds after the last fsync is
+        forced to disk by a background thread once the interval is over,
+        or at exit, so no save stays unsynced for longer than that.
+
+    Lazy reload:
+    When lazy mode is enabled, reload() only keeps the decoded records
+    and an instance is built the first time it is looked up, through
+    get(), or through all(), find() and add_index() for its class.
+    count() and save() never build instances, so records that are
+    never looked up are written back as they were read.
+    Pending records are kept column by column in a ColumnStore per class,
+    which takes about half the memory of the instances they replace, so
+    lazy mode costs memory only for the objects that are looked up.
+    With columnar set to False, they are kept as one dictionary each
+    instead, which takes more memory than the instances themselves.
+
+    Sharding:
+    When shards is set to a positive number, the snapshot is split into
+    one file per class in the shard_dir directory, and each class into
+    that many files by a hash of the key: <Class>.json for one shard,
+    <Class>.<n>.json otherwise. compact() then rewrites only the shard
+    files holding objects that changed since the last compaction. In
+    lazy mode, reload() only lists the shard files, and each one is read
+    the first time its class, or one of its keys through get(), is looked
+    up; objects already in memory take precedence over what it holds.
+    Changing shards, or switching between a single file and shards,
+    rewrites every file at the next compaction.
+
+    Shared mode:
+    When shared is enabled, several processes can use the same store.
+    save() and reload() hold an advisory lock (fcntl.flock) on a lock
+    file next to file.json, exclusive for saves and shared for reloads,
+    and every save increments a generation number kept in the lock file.
+    A save that finds the generation changed since this process last read
+    the store first reads it again and applies only the changes made
+    here on top, so the saves of other processes are kept; when two
+    processes change the same object, the last save wins. refresh() reads
+    the store again only if its generation changed, which is cheap
+    enough to call before every console command. On systems without
+    fcntl the generation is still checked, but nothing is locked.
+
+    Metrics:
+    When metrics.enabled is set (see models.engine.metrics), the storage
+    counts the calls to new(), delete() and save(), the objects encoded
+    and the bytes written and read, and records how long each flush and
+    reload takes, and how many objects each flush encodes, in the
+    "storage.flush", "storage.reload" and "storage.encoded_per_flush"
+    histograms.
     """
 
     # define the default file path for storing JSON data
     __file_path = "file.json"
     # initialize an empty dictionary to store serialized instances
     __objects = {}
+    # changes since the last save, mapping keys to objects (None if deleted)
+    __changes = {}
+    # cached JSON text of each object, mapping keys to (object, text)
+    __fragments = {}
+    # whether saves keep the JSON text they encode in __fragments
+    __fragment_cache = True
+    # per-class index, mapping class names to {key: object}
+    __by_class = {}
+    # secondary indexes, mapping class names to {attribute: (buckets,
+    # values)}, where buckets maps attribute values to {key: object}
+    # and values maps keys to the value they are indexed under
+    __indexes = {}
+    # records loaded but not built yet, mapping class names to
+    # {key: record dictionary}
+    __pending = {}
+    # whether reload() defers building instances until they are used
+    __lazy = False
+    # whether pending records are stored column by column
+    __columnar = True
+    # how timestamps are written: "iso" or "epoch"
+    __timestamp_format = "iso"
+    # how snapshots are encoded: "json", "binary" or "records"
+    __snapshot_format = "json"
+    # the RecordFile at file_path saves append to in "records" format,
+    # None until it is rewritten whole
+    __mapped = None
+    # when saves are forced to disk: "none", "fsync" or "group"
+    __durability = "none"
+    # minimum number of seconds between two fsyncs in "group" durability
+    __commit_interval = 1.0
+    # monotonic time of the last fsync
+    __last_sync = 0.0
+    # paths written but not forced to disk yet in "group" durability
+    __unsynced = set()
+    # timer of the deferred fsync of __unsynced, if any
+    __sync_timer = None
+    # whether the exit handler syncing deferred writes is registered
+    __sync_atexit_registered = False
+    # lock guarding __objects and the other state below, only held
+    # briefly, so threads can keep working while another one saves
+    __lock = threading.RLock()
+    # lock serializing the flushes, and the reads of the files, taken
+    # before __lock whenever both are held
+    __flush_lock = threading.RLock()
+    # batch() state of each thread: the number of nested blocks it has
+    # open, whether it called save() inside them, and the objects it
+    # replaced inside them, mapping keys to the object stored before
+    # (None if there was none)
+    __batches = BatchState()
+    # delay of write-behind flushes in milliseconds, 0 to disable them
+    __write_behind = 0
+    # timer of the scheduled write-behind flush, if any
+    __timer = None
+    # whether the exit handler flushing pending writes is registered
+    __atexit_registered = False
+    # whether save() appends changes to the journal instead of rewriting
+    __journal = False
+    # number of journal entries that triggers a compaction
+    __journal_limit = 1000
+    # number of entries currently stored in the journal
+    __journal_size = 0
+    # number of shard files per class, 0 to keep a single file
+    __shards = 0
+    # shards changed since the last compaction, as (class name, shard)
+    # pairs, or None when every shard file must be rewritten
+    __dirty_shards = set()
+    # shard files not read yet, mapping class names to {shard: path}
+    __unloaded = {}
+    # keys deleted while their shard file was not read yet
+    __tombstones = set()
+    # whether save() and reload() lock the store and merge the changes
+    # of other processes
+    __shared = False
+    # generation of the store when this process last read or saved it,
+    # None if unknown
+    __generation = None
+    # number of objects encoded since the process started
+    __encoded = 0
 
     @property
     def file_path(self):
@@ -48,6 +347,300 @@ class FileStorage:
 
         return FileStorage.__file_path
 
+    @file_path.setter
+    def file_path(self, value):
+        """
+        Setter method for the 'file_path' property.
+        """
+
+        FileStorage.__file_path = value
+        # a journal only belongs to the snapshot it was written against
+        FileStorage.__journal_size = 0
+        FileStorage.__generation = None
+        # and so do the shard files, so write them all at the new path
+        FileStorage.__unloaded = {}
+        FileStorage.__tombstones = set()
+        FileStorage.__dirty_shards = None
+        FileStorage.__mapped = None
+
+    @property
+    def journal_path(self):
+        """
+        Getter method for the 'journal_path' property.
+        """
+
+        return FileStorage.__file_path + ".journal"
+
+    @property
+    def index_path(self):
+        """
+        Getter method for the 'index_path' property.
+        """
+
+        return FileStorage.__file_path + ".idx"
+
+    @property
+    def shard_dir(self):
+        """
+        Getter method for the 'shard_dir' property.
+        """
+
+        return FileStorage.__file_path + ".shards"
+
+    @property
+    def shards(self):
+        """
+        Getter method for the 'shards' property.
+        """
+
+        return FileStorage.__shards
+
+    @shards.setter
+    def shards(self, value):
+        """
+        Setter method for the 'shards' property.
+        """
+
+        if value < 0:
+            raise ValueError("shards must not be negative")
+        if value and self.__snapshot_format == "records":
+            raise ValueError("record files cannot be sharded")
+        with self.__lock:
+            if value != FileStorage.__shards:
+                # the files not read yet are numbered for the current count
+                for class_name in list(self.__unloaded):
+                    self.__load_shards_of(class_name)
+                FileStorage.__dirty_shards = None
+            FileStorage.__shards = value
+
+    @property
+    def lock_path(self):
+        """
+        Getter method for the 'lock_path' property.
+        """
+
+        return FileStorage.__file_path + ".lock"
+
+    @property
+    def shared(self):
+        """
+        Getter method for the 'shared' property.
+        """
+
+        return FileStorage.__shared
+
+    @shared.setter
+    def shared(self, value):
+        """
+        Setter method for the 'shared' property.
+        """
+
+        FileStorage.__shared = bool(value)
+
+    @property
+    def journal(self):
+        """
+        Getter method for the 'journal' property.
+        """
+
+        return FileStorage.__journal
+
+    @journal.setter
+    def journal(self, value):
+        """
+        Setter method for the 'journal' property.
+        """
+
+        FileStorage.__journal = bool(value)
+
+    @property
+    def journal_limit(self):
+        """
+        Getter method for the 'journal_limit' property.
+        """
+
+        return FileStorage.__journal_limit
+
+    @journal_limit.setter
+    def journal_limit(self, value):
+        """
+        Setter method for the 'journal_limit' property.
+        """
+
+        if value < 1:
+            raise ValueError("journal_limit must be a positive integer")
+        FileStorage.__journal_limit = value
+
+    @property
+    def lazy(self):
+        """
+        Getter method for the 'lazy' property.
+        """
+
+        return FileStorage.__lazy
+
+    @lazy.setter
+    def lazy(self, value):
+        """
+        Setter method for the 'lazy' property.
+        """
+
+        FileStorage.__lazy = bool(value)
+
+    @property
+    def columnar(self):
+        """
+        Getter method for the 'columnar' property.
+        """
+
+        return FileStorage.__columnar
+
+    @columnar.setter
+    def columnar(self, value):
+        """
+        Setter method for the 'columnar' property.
+        """
+
+        FileStorage.__columnar = bool(value)
+
+    @property
+    def fragment_cache(self):
+        """
+        Getter method for the 'fragment_cache' property.
+        """
+
+        return FileStorage.__fragment_cache
+
+    @fragment_cache.setter
+    def fragment_cache(self, value):
+        """
+        Setter method for the 'fragment_cache' property.
+        """
+
+        with self.__lock:
+            FileStorage.__fragment_cache = bool(value)
+            if not value:
+                # release the text already cached
+                self.__fragments.clear()
+
+    @property
+    def timestamp_format(self):
+        """
+        Getter method for the 'timestamp_format' property.
+        """
+
+        return FileStorage.__timestamp_format
+
+    @timestamp_format.setter
+    def timestamp_format(self, value):
+        """
+        Setter method for the 'timestamp_format' property.
+        """
+
+        if value not in ("iso", "epoch"):
+            raise ValueError("timestamp_format must be 'iso' or 'epoch'")
+        if value != FileStorage.__timestamp_format:
+            # the cached JSON text uses the previous format
+            self.__fragments.clear()
+        FileStorage.__timestamp_format = value
+
+    @property
+    def snapshot_format(self):
+        """
+        Getter method for the 'snapshot_format' property.
+        """
+
+        return FileStorage.__snapshot_format
+
+    @snapshot_format.setter
+    def snapshot_format(self, value):
+        """
+        Setter method for the 'snapshot_format' property.
+        """
+
+        if value not in ("json", "binary", "records"):
+            raise ValueError(
+                "snapshot_format must be 'json', 'binary' or 'records'"
+            )
+        if value == "records" and self.__shards:
+            raise ValueError("record files cannot be sharded")
+        with self.__flush_lock, self.__lock:
+            if value != FileStorage.__snapshot_format:
+                # the cached fragments are encoded in the previous format,
+                # and so are the shard files
+                self.__fragments.clear()
+                FileStorage.__dirty_shards = None
+                FileStorage.__mapped = None
+            FileStorage.__snapshot_format = value
+
+    @property
+    def durability(self):
+        """
+        Getter method for the 'durability' property.
+        """
+
+        return FileStorage.__durability
+
+    @durability.setter
+    def durability(self, value):
+        """
+        Setter method for the 'durability' property.
+        """
+
+        if value not in ("none", "fsync", "group"):
+            raise ValueError("durability must be 'none', 'fsync' or 'group'")
+        FileStorage.__durability = value
+
+        if value == "group" and not FileStorage.__sync_atexit_registered:
+            # never exit with writes still waiting for their fsync
+            atexit.register(self.__sync_deferred)
+            FileStorage.__sync_atexit_registered = True
+        if value != "group":
+            self.__sync_deferred()
+
+    @property
+    def commit_interval(self):
+        """
+        Getter method for the 'commit_interval' property.
+        """
+
+        return FileStorage.__commit_interval
+
+    @commit_interval.setter
+    def commit_interval(self, value):
+        """
+        Setter method for the 'commit_interval' property.
+        """
+
+        if value < 0:
+            raise ValueError("commit_interval must not be negative")
+        FileStorage.__commit_interval = value
+
+    @property
+    def write_behind(self):
+        """
+        Getter method for the 'write_behind' property.
+        """
+
+        return FileStorage.__write_behind
+
+    @write_behind.setter
+    def write_behind(self, value):
+        """
+        Setter method for the 'write_behind' property.
+        """
+
+        if value < 0:
+            raise ValueError("write_behind must not be negative")
+        FileStorage.__write_behind = value
+
+        if value and not FileStorage.__atexit_registered:
+            # never lose the writes still waiting for their timer
+            atexit.register(self.__flush_scheduled)
+            FileStorage.__atexit_registered = True
+        if not value:
+            self.__flush_scheduled()
+
     @property
     def objects(self):
         """
@@ -56,12 +649,201 @@ class FileStorage:
 
         return FileStorage.__objects
 
-    def all(self):
+    def all(self, cls=None):
+        """
+        Returns a copy of the dictionary __objects, or a dictionary of
+        the instances of cls (a class or a class name) if it is given,
+        which other threads can keep changing the store while it is used.
+        """
+
+        if cls is None:
+            # every record is needed, so read and build them all
+            for class_name in list(self.__unloaded):
+                self.__load_shards_of(class_name)
+            for class_name in list(self.__pending):
+                self.__hydrate_class(class_name)
+            with self.__lock:
+                return dict(self.__objects)
+
+        class_name = self.__class_name(cls)
+        self.__hydrate_class(class_name)
+        with self.__lock:
+            index = self.__by_class.get(class_name, {})
+            # skip entries removed from __objects behind the index's back
+            return {
+                key: obj
+                for key, obj in index.items()
+                if self.__objects.get(key) is obj
+            }
+
+    def get(self, cls, id):
+        """
+        Returns the instance of cls (a class or a class name)
+        with the given id, or None if there is none.
+        """
+
+        class_name = self.__class_name(cls)
+        key = f"{class_name}.{id}"
+
+        obj = self.__objects.get(key)
+        if obj is None and class_name in self.__unloaded:
+            # only the shard file the key hashes to is read
+            self.__load_shards_of(class_name, self.__shard_of(key))
+        if obj is None and class_name in self.__pending:
+            # build the instance if its record is still pending
+            with self.__lock:
+                record = self.__pending.get(class_name, {}).pop(key, None)
+                if record is not None:
+                    obj = self.__hydrate(key, record)
+        return obj
+
+    def count(self, cls=None):
+        """
+        Returns the number of stored instances, or of instances of cls,
+        without building the pending ones.
+        """
+
+        if cls is None:
+            for class_name in list(self.__unloaded):
+                self.__load_shards_of(class_name)
+            with self.__lock:
+                pending = sum(
+                    len(records) for records in self.__pending.values()
+                )
+                return len(self.__objects) + pending
+
+        class_name = self.__class_name(cls)
+        self.__load_shards_of(class_name)
+        with self.__lock:
+            return len(self.__by_class.get(class_name, {})) + len(
+                self.__pending.get(class_name, {})
+            )
+
+    def stream(self, cls):
+        """
+        Yields the instances of cls (a class or a class name): the
+        stored ones, then those of the pending records, each built only
+        when it is reached, so a caller that stops early only builds the
+        instances it used.
+        """
+
+        class_name = self.__class_name(cls)
+        self.__load_shards_of(class_name)
+        with self.__lock:
+            stored = [
+                obj
+                for key, obj in self.__by_class.get(class_name, {}).items()
+                if self.__objects.get(key) is obj
+            ]
+            pending = list(self.__pending.get(class_name, {}).keys())
+
+        yield from stored
+        for key in pending:
+            obj = self.get(class_name, key.split(".", 1)[1])
+            # skip instances deleted since their key was read
+            if obj is not None:
+                yield obj
+
+    def page(self, cls=None, limit=None, after=None):
+        """
+        Returns a list of at most limit instances, or instances of cls,
+        ordered by key, starting after the key after. Only the instances
+        returned are built from pending records, so a store is paged
+        through by passing the key of the last instance of each page.
+        """
+
+        if cls is None:
+            for class_name in list(self.__unloaded):
+                self.__load_shards_of(class_name)
+            with self.__lock:
+                class_names = set(self.__by_class) | set(self.__pending)
+        else:
+            class_names = {self.__class_name(cls)}
+            self.__load_shards_of(next(iter(class_names)))
+
+        with self.__lock:
+            keys = itertools.chain.from_iterable(
+                self.__iter_keys(class_name) for class_name in class_names
+            )
+            if after is not None:
+                keys = (key for key in keys if key > after)
+            # a page only keeps its own keys while the others are scanned
+            if limit is None:
+                keys = sorted(keys)
+            else:
+                keys = heapq.nsmallest(limit, keys)
+
+        page = []
+        for key in keys:
+            class_name, obj_id = key.split(".", 1)
+            obj = self.get(class_name, obj_id)
+            # skip instances deleted since their key was read
+            if obj is not None:
+                page.append(obj)
+        return page
+
+    def find(self, cls, **filters):
         """
-        Returns the dictionary __objects.
+        Returns a dictionary of the instances of cls whose attributes
+        are equal to the values given as keyword arguments.
         """
 
-        return self.__objects
+        class_name = self.__class_name(cls)
+        self.__hydrate_class(class_name)
+        with self.__lock:
+            return self.__find(class_name, filters)
+
+    def __find(self, class_name, filters):
+        """
+        Returns the instances of class_name matching filters, while the
+        caller holds the lock.
+        """
+
+        indexes = self.__indexes.get(class_name, {})
+
+        # start from the smallest candidate set an index can provide
+        candidates = None
+        for attribute, value in filters.items():
+            if attribute not in indexes:
+                continue
+            try:
+                bucket = indexes[attribute][0].get(value, {})
+            except TypeError:
+                # unhashable values are never indexed
+                continue
+            if candidates is None or len(bucket) < len(candidates):
+                candidates = bucket
+        if candidates is None:
+            candidates = self.__by_class.get(class_name, {})
+
+        missing = object()
+        return {
+            key: obj
+            for key, obj in candidates.items()
+            if self.__objects.get(key) is obj
+            and all(
+                getattr(obj, attribute, missing) == value
+                for attribute, value in filters.items()
+            )
+        }
+
+    def add_index(self, cls, attribute):
+        """
+        Maintains a secondary index of the instances of cls
+        by the value of attribute, to speed up find().
+        """
+
+        class_name = self.__class_name(cls)
+        self.__hydrate_class(class_name)
+        with self.__lock:
+            indexes = self.__indexes.setdefault(class_name, {})
+            if attribute in indexes:
+                return
+
+            indexes[attribute] = ({}, {})
+            # index the instances that are already stored
+            for key, obj in self.all(class_name).items():
+                self.__index_attribute(class_name, attribute, key, obj)
 
     def new(self, obj):
         """
@@ -70,70 +852,1345 @@ class FileStorage:
 
         # create a key using the object's class name and ID
         key = f"{type(obj).__name__}.{obj.id}"
-        # add the object to the __objects dictionary with the generated key
-        self.__objects[key] = obj
+        if metrics.enabled:
+            metrics.increment("storage.new")
+        with self.__lock:
+            self.__remember(key)
+            # add the object to the __objects dictionary
+            # with the generated key
+            self.__insert(key, obj)
+            # remember the object so the next save can persist it
+            self.__changes[key] = obj
 
-    def save(self):
+    def delete(self, obj=None):
         """
-        Serializes __objects to the JSON file specified by __file_path.
+        Deletes obj from __objects if it's inside.
         """
 
-        # create a new dictionary to store serialized objects
-        serialized_objects = {}
-        # iterate through each key-value pair in __objects
-        for key, obj in self.__objects.items():
-            # convert each object to a dictionary using its to_dict method
-            serialized_objects[key] = obj.to_dict()
+        if obj is None:
+            return
 
-        # open the file specified by __file_path
-        # and write the serialized_objects as JSON
-        with open(self.__file_path, "w", encoding="utf-8") as file:
-            json.dump(serialized_objects, file)
+        key = f"{type(obj).__name__}.{obj.id}"
+        if metrics.enabled:
+            metrics.increment("storage.delete")
+        with self.__lock:
+            if type(obj).__name__ in self.__unloaded:
+                # never bring the object back from its shard file
+                self.__tombstones.add(key)
+            if key in self.__objects:
+                self.__remember(key)
+                self.__remove(key)
+                # remember the deletion so the next save can persist it
+                self.__changes[key] = None
 
-    def classes(self):
+    def touch(self, obj):
         """
-        Returns the dictionary mapping class names
-        to their corresponding types.
+        Marks obj as changed so the next save serializes it again.
         """
-        # import the BaseModel class from the base_model module
-        from models.base_model import BaseModel
 
-        # add other classes as needed
-        classes = {
-            "BaseModel": BaseModel,
-            # add other classes here as needed
-        }
-        return classes
+        key = f"{type(obj).__name__}.{obj.id}"
+        # objects that are not (yet) stored have nothing to invalidate
+        if self.__objects.get(key) is not obj:
+            return
 
-    def reload(self):
+        with self.__lock:
+            self.__changes[key] = obj
+            # the assignment may have moved obj in a secondary index
+            class_name = type(obj).__name__
+            for attribute in self.__indexes.get(class_name, ()):
+                self.__index_attribute(class_name, attribute, key, obj)
+
+    def __remember(self, key):
         """
-        Deserializes the JSON file to __objects only if the file exists.
+        Records the object stored under key before the current batch
+        changes it, so the batch can be rolled back.
         """
 
-        # check if the JSON file exists
-        if not os.path.isfile(self.__file_path):
+        undo = self._batch_state().undo
+        if undo is not None and key not in undo:
+            undo[key] = self.__objects.get(key)
+
+    def __insert(self, key, obj):
+        """
+        Adds obj to __objects and to the indexes of its class.
+        """
+
+        previous = self.__objects.get(key)
+        if previous is obj:
             return
+        # a stored instance replaces the pending record of its key
+        self.__pending.get(type(obj).__name__, {}).pop(key, None)
+        # drop the entries of the object previously stored under key
+        if previous is not None:
+            self.__remove(key)
+
+        class_name = type(obj).__name__
+        self.__objects[key] = obj
+        self.__by_class.setdefault(class_name, {})[key] = obj
+        for attribute in self.__indexes.get(class_name, ()):
+            self.__index_attribute(class_name, attribute, key, obj)
+
+    def __remove(self, key):
+        """
+        Removes the object stored under key from __objects,
+        from the indexes of its class and from the JSON text cache.
+        """
+
+        obj = self.__objects.pop(key)
+        self.__fragments.pop(key, None)
 
+        class_name = type(obj).__name__
+        self.__by_class.get(class_name, {}).pop(key, None)
+        for buckets, values in self.__indexes.get(class_name, {}).values():
+            if key in values:
+                self.__discard(buckets, values.pop(key), key)
+
+    def __index_attribute(self, class_name, attribute, key, obj):
+        """
+        Moves obj to the bucket of its current attribute value in
+        the secondary index of class_name by attribute.
+        """
+
+        buckets, values = self.__indexes[class_name][attribute]
+        missing = object()
+        value = getattr(obj, attribute, missing)
+
+        if key in values:
+            old_value = values[key]
+            bucket = buckets.get(old_value, {})
+            if old_value == value and bucket.get(key) is obj:
+                return
+            self.__discard(buckets, values.pop(key), key)
+
+        if value is missing:
+            return
         try:
-            # attempt to open the JSON file for reading
-            with open(self.__file_path, "r", encoding="utf-8") as file:
-                # load the JSON data into loaded_objects
-                loaded_objects = json.load(file)
-
-            # iterate through each key-value pair in loaded_objects
-            for key, obj_dict in loaded_objects.items():
-                # retrieve the class type from the classes dictionary
-                class_type = self.classes()[obj_dict["__class__"]]
-
-                # create an instance of the class using the provided dictionary
-                obj_instance = class_type(**obj_dict)
-                # add the object instance to __objects
-                # with the corresponding key
-                self.__objects[key] = obj_instance
+            buckets.setdefault(value, {})[key] = obj
+        except TypeError:
+            # unhashable values, such as lists, are not indexed
+            return
+        values[key] = value
 
-        except json.JSONDecodeError as e:
-            # handle potential issues with JSON decoding
-            print(f"error decoding JSON: {e}")
+    def __hydrate(self, key, record):
+        """
+        Builds the instance of a pending record and stores it.
+        """
 
-        except FileNotFoundError:
-            pass  # if the file doesn't exist, do nothing
+        class_type = self.classes()[record["__class__"]]
+        obj = class_type(**record)
+        self.__insert(key, obj)
+
+        # the record is unchanged, so its JSON text is still valid
+        cached = self.__fragments.get(key)
+        if cached is not None and cached[0] is record:
+            self.__fragments[key] = (obj, cached[1])
+        return obj
+
+    def __hydrate_class(self, class_name):
+        """
+        Builds the instances of every pending record of class_name.
+        """
+
+        self.__load_shards_of(class_name)
+        if class_name not in self.__pending:
+            return
+
+        with self.__lock:
+            records = self.__pending.pop(class_name, None)
+            if records:
+                for key, record in records.items():
+                    self.__hydrate(key, record)
+
+    @staticmethod
+    def __discard(buckets, value, key):
+        """
+        Removes key from the bucket of value, dropping empty buckets.
+        """
+
+        bucket = buckets.get(value)
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del buckets[value]
+
+    @staticmethod
+    def __class_name(cls):
+        """
+        Returns the name of cls, which is either a class or a name.
+        """
+
+        return cls if isinstance(cls, str) else cls.__name__
+
+    def save(self):
+        """
+        Persists the changes made since the last save, or defers it
+        to the end of the current batch or to the write-behind thread.
+        """
+
+        if metrics.enabled:
+            metrics.increment("storage.save")
+        if self._defer_save():
+            return
+        if self.__write_behind:
+            self.__schedule_flush()
+        else:
+            self.flush()
+
+    def flush(self):
+        """
+        Persists the changes made since the last save right away.
+
+        In journal mode only the changed objects are appended to the
+        journal, otherwise __objects is serialized to the JSON file
+        specified by __file_path.
+        """
+
+        # the state lock is only held while the changes are collected,
+        # not while they are encoded and written
+        with self.__flush_lock, \
+                self.__lock_file(exclusive=True) as lock_file, \
+                metrics.timer("storage.flush"):
+            encoded = self.__encoded
+            if lock_file is not None:
+                generation = self.__read_generation(lock_file)
+                if generation != self.__generation:
+                    # keep what other processes saved in the meantime
+                    with self.__lock:
+                        self.__reread()
+
+            if self.__snapshot_format == "records":
+                # record files are patched in place of a journal
+                self.__append_records()
+            elif self.__journal:
+                self.__append_journal()
+                # fold the journal into the snapshot once it grows too long
+                if self.__journal_size >= self.__journal_limit:
+                    self.compact()
+            else:
+                self.compact()
+
+            if lock_file is not None:
+                self.__write_generation(lock_file, generation + 1)
+            if metrics.enabled:
+                encoded = self.__encoded - encoded
+                metrics.increment("storage.encoded", encoded)
+                metrics.observe("storage.encoded_per_flush", encoded)
+
+    def refresh(self):
+        """
+        Reads the store again, keeping the unsaved changes, if shared mode
+        is enabled and another process saved it since it was last read,
+        and returns whether it did.
+        """
+
+        if not self.__shared:
+            return False
+
+        with self.__flush_lock, self.__lock, \
+                self.__lock_file(exclusive=False) as lock_file:
+            generation = self.__read_generation(lock_file)
+            if generation == self.__generation:
+                return False
+            self.__reread()
+            FileStorage.__generation = generation
+            return True
+
+    @contextlib.contextmanager
+    def __lock_file(self, exclusive):
+        """
+        Holds the lock file open, and locked if fcntl is available, while
+        the block runs in shared mode. Yields the open file, or None
+        outside of shared mode.
+        """
+
+        if not self.__shared:
+            yield None
+            return
+
+        with open(self.lock_path, "a+", encoding="utf-8") as file:
+            if fcntl is not None:
+                mode = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+                fcntl.flock(file.fileno(), mode)
+            try:
+                yield file
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+    @staticmethod
+    def __read_generation(file):
+        """
+        Returns the generation number stored in the lock file.
+        """
+
+        file.seek(0)
+        text = file.read().strip()
+        return int(text) if text.isdigit() else 0
+
+    def __write_generation(self, file, generation):
+        """
+        Stores generation in the lock file as the one this process saw.
+        """
+
+        # the file is opened for appending, so empty it first
+        file.truncate(0)
+        file.write(str(generation))
+        file.flush()
+        FileStorage.__generation = generation
+
+    def __reread(self):
+        """
+        Replaces the stored objects with those on disk, then applies
+        the changes not saved yet on top of them.
+
+        The instances that were stored and are still on disk stay the
+        stored ones, updated with what was read, so the references
+        callers hold to them keep working.
+        """
+
+        changes = dict(self.__changes)
+        previous = dict(self.__objects)
+        for key in list(self.__objects):
+            self.__remove(key)
+        self.__pending.clear()
+        self.__fragments.clear()
+
+        self.__read()
+        for key, obj in previous.items():
+            if key in changes:
+                continue
+            class_name, obj_id = key.split(".", 1)
+            # builds the instance if its record is pending
+            fresh = self.get(class_name, obj_id)
+            if fresh is not None and fresh is not obj:
+                self.__update_instance(obj, fresh)
+                self.__insert(key, obj)
+        for key, obj in changes.items():
+            if obj is None:
+                self.__unload(key)
+            else:
+                self.__insert(key, obj)
+        self.__changes.clear()
+        self.__changes.update(changes)
+
+    @staticmethod
+    def __update_instance(obj, fresh):
+        """
+        Gives obj the attributes of fresh, read again from disk.
+        """
+
+        # import the cache of the strings rendered for the instances
+        from models.base_model import render_cache
+
+        # the attributes are replaced without going through __setattr__,
+        # which cannot take the "__class__" entry built instances keep
+        vars(obj).clear()
+        vars(obj).update(vars(fresh))
+        render_cache.discard(obj)
+
+    def export_records(self, cls, path):
+        """
+        Writes the instances of cls (a class or a class name) to path
+        as newline-delimited JSON, one record per line, and returns how
+        many were written. Pending records are written without being
+        built.
+        """
+
+        class_name = self.__class_name(cls)
+        self.__load_shards_of(class_name)
+        with self.__lock:
+            entries = self.__snapshot(class_name)
+
+        count = 0
+        fresh = []
+        with open(path, "w", encoding="utf-8") as file:
+            for key, text in self.__encode_entries(entries, fresh):
+                file.write(self.__json_text(text) + "\n")
+                count += 1
+        self.__cache_fragments(fresh)
+        return count
+
+    def _batch_state(self):
+        """
+        Returns the batch() state of the threads, for BatchMixin.
+        """
+
+        return FileStorage.__batches
+
+    def _rollback(self, undo):
+        """
+        Restores the objects replaced by a batch, as recorded in undo,
+        for BatchMixin.
+        """
+
+        with self.__lock:
+            for key, previous in undo.items():
+                if previous is None:
+                    if key in self.__objects:
+                        self.__remove(key)
+                else:
+                    self.__insert(key, previous)
+                # the next save must undo whatever a save already wrote
+                self.__changes[key] = previous
+
+    def __schedule_flush(self):
+        """
+        Schedules a write-behind flush unless one is already pending.
+        """
+
+        with self.__lock:
+            if self.__timer is not None:
+                return
+            timer = threading.Timer(
+                self.__write_behind / 1000, self.__flush_scheduled
+            )
+            timer.daemon = True
+            FileStorage.__timer = timer
+            timer.start()
+
+    def __flush_scheduled(self):
+        """
+        Performs the pending write-behind flush, if any.
+        """
+
+        with self.__lock:
+            timer = self.__timer
+            if timer is None:
+                return
+            FileStorage.__timer = None
+            timer.cancel()
+        self.flush()
+
+    def compact(self):
+        """
+        Serializes __objects to the JSON file specified by __file_path,
+        or rewrites the changed shard files in sharded mode, and discards
+        the journal, whose entries the snapshot now holds.
+        """
+
+        if self.__snapshot_format == "records":
+            self.__write_records()
+            return
+
+        with self.__flush_lock:
+            # take the snapshot under the lock, but encode and write it
+            # without, so other threads can keep changing objects
+            with self.__lock:
+                if self.__shards:
+                    directory = self.shard_dir
+                    writes, removals, full = self.__plan_shards()
+                else:
+                    directory = os.path.dirname(
+                        os.path.abspath(self.__file_path)
+                    )
+                    writes = [(self.__file_path, self.__snapshot())]
+                    removals, full = [], False
+                changes = self.__take_changes()
+
+            fresh = []
+            synced = False
+            try:
+                for path, entries in writes:
+                    # reuse the cached JSON text of unchanged objects
+                    items = self.__encode_entries(entries, fresh)
+                    synced = self.__write_file(path, items) or synced
+                for path in removals:
+                    # every object of the shard was deleted
+                    if os.path.isfile(path):
+                        os.remove(path)
+            except BaseException:
+                self.__restore_changes(changes)
+                raise
+
+            # make the renames durable along with the data
+            if synced:
+                self.__sync_directory(directory)
+
+            if not self.__shards:
+                # the single file replaces any previous shard files,
+                # and any record file
+                self.__remove_shards()
+                if os.path.isfile(self.index_path):
+                    os.remove(self.index_path)
+                FileStorage.__mapped = None
+            elif full:
+                # drop the files of the previous layout
+                self.__remove_shards(keep={path for path, _ in writes})
+                if os.path.isfile(self.__file_path):
+                    os.remove(self.__file_path)
+            if self.__shards:
+                FileStorage.__dirty_shards = set()
+
+            # the snapshot is up to date, so the journal is no longer needed
+            if os.path.isfile(self.journal_path):
+                os.remove(self.journal_path)
+            FileStorage.__journal_size = 0
+            self.__cache_fragments(fresh)
+
+    def __write_file(self, path, items, dump=None):
+        """
+        Atomically replaces the file at path with a JSON object of the
+        (key, text) pairs yielded by items, or with a binary snapshot of
+        them, or with what dump(file, items) writes to a binary file if
+        dump is given, and returns whether it was forced to disk.
+        """
+
+        # write the snapshot to a temporary file next to path,
+        # so the current snapshot stays intact until it is replaced
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(
+            dir=directory, prefix=".file_storage.", suffix=".tmp"
+        )
+        try:
+            if dump is not None:
+                file = os.fdopen(fd, "wb")
+            elif self.__snapshot_format == "binary":
+                file = os.fdopen(fd, "wb")
+                dump = binary_snapshot.dump_records
+            else:
+                file = os.fdopen(fd, "w", encoding="utf-8")
+                dump = json_stream.dump_items
+            with file:
+                dump(file, items)
+                # path is the name the file has once it is renamed
+                synced = self.__sync(file, path)
+                if metrics.enabled:
+                    file.flush()
+                    metrics.increment(
+                        "storage.bytes_written", os.fstat(fd).st_size
+                    )
+
+            # keep the permissions of the snapshot being replaced
+            if os.path.isfile(path):
+                mode = os.stat(path).st_mode & 0o777
+            else:
+                mode = 0o644
+            os.chmod(tmp_path, mode)
+
+            # atomically swap the new snapshot in
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return synced
+
+    def __write_records(self):
+        """
+        Rewrites the record file and its index whole, with only the
+        current version of every record, and maps it.
+        """
+
+        with self.__flush_lock:
+            with self.__lock:
+                entries = self.__snapshot()
+                changes = self.__take_changes()
+
+            token = record_file.new_token()
+            offsets = {}
+            fresh = []
+            try:
+                synced = self.__write_file(
+                    self.__file_path,
+                    self.__encode_entries(entries, fresh),
+                    lambda file, items: record_file.dump_data(
+                        file, items, token, offsets
+                    ),
+                )
+                # the index is renamed last, so an interrupted rewrite
+                # leaves a data file whose index is rebuilt on reload
+                synced = self.__write_file(
+                    self.index_path,
+                    offsets.items(),
+                    lambda file, items: record_file.dump_index(
+                        file, items, token
+                    ),
+                ) or synced
+            except BaseException:
+                self.__restore_changes(changes)
+                raise
+
+            if synced:
+                self.__sync_directory(
+                    os.path.dirname(os.path.abspath(self.__file_path))
+                )
+            if os.path.isfile(self.journal_path):
+                os.remove(self.journal_path)
+            FileStorage.__journal_size = 0
+
+            mapped = record_file.RecordFile(
+                self.__file_path, self.index_path, offsets
+            )
+            with self.__lock:
+                # read the records still pending from the new file
+                for class_name, records in list(self.__pending.items()):
+                    if isinstance(records, MappedRecords):
+                        self.__pending[class_name] = MappedRecords(
+                            mapped,
+                            {key: mapped.offsets[key] for key in records},
+                        )
+                FileStorage.__mapped = mapped
+            self.__cache_fragments(fresh)
+
+    def __append_records(self):
+        """
+        Appends the changed records to the record file and their new
+        offsets to its index, or rewrites both whole if the file is not
+        mapped or mostly holds previous versions of records.
+        """
+
+        with self.__lock:
+            mapped = self.__mapped
+            if not self.__changes:
+                return
+            rewrite = (
+                mapped is None
+                # records replayed from a journal are not in the file
+                or any(
+                    records.added
+                    for records in self.__pending.values()
+                    if isinstance(records, MappedRecords)
+                )
+                or mapped.size > 2 * mapped.live + 65536
+            )
+            if not rewrite:
+                deletes, puts, changes = self.__take_journal_entries()
+        if rewrite:
+            self.__write_records()
+            return
+
+        fresh = []
+        try:
+            items = [
+                (key, self.__json_text(text))
+                for key, text in self.__encode_entries(puts, fresh)
+            ]
+            written = mapped.append(items, deletes, self.__sync)
+        except BaseException:
+            self.__restore_changes(changes)
+            raise
+
+        if metrics.enabled:
+            metrics.increment("storage.bytes_written", written)
+        self.__cache_fragments(fresh)
+
+    def __take_journal_entries(self):
+        """
+        Returns the keys deleted since the last save, the snapshot
+        entries of the objects changed since, and the changes, which
+        are taken.
+        """
+
+        deletes = [key for key, obj in self.__changes.items() if obj is None]
+        puts = [
+            self.__entry(key, obj)
+            for key, obj in self.__changes.items()
+            if obj is not None
+        ]
+        return deletes, puts, self.__take_changes()
+
+    def __plan_shards(self):
+        """
+        Returns the shard files to rewrite, as (path, snapshot entries)
+        pairs, the shard files to remove and whether every shard file is
+        rewritten: those holding objects changed since the last
+        compaction, or all of them after the layout changed.
+        """
+
+        self.__mark_dirty(self.__changes)
+        dirty = self.__dirty_shards
+        os.makedirs(self.shard_dir, exist_ok=True)
+
+        # a shard file is rewritten whole, so read it first if needed
+        if dirty is None:
+            for class_name in list(self.__unloaded):
+                self.__load_shards_of(class_name)
+            class_names = set(self.__by_class) | set(self.__pending)
+        else:
+            for class_name, shard in dirty:
+                self.__load_shards_of(class_name, shard)
+            class_names = {class_name for class_name, _ in dirty}
+
+        writes = []
+        removals = []
+        for class_name in class_names:
+            # group the keys of the class by shard, without encoding any
+            groups = {}
+            for key in self.__iter_keys(class_name):
+                shard = self.__shard_of(key)
+                if dirty is None or (class_name, shard) in dirty:
+                    groups.setdefault(shard, []).append(key)
+
+            if dirty is None:
+                targets = list(groups)
+            else:
+                targets = [
+                    shard for name, shard in dirty if name == class_name
+                ]
+            for shard in targets:
+                path = self.__shard_path(class_name, shard)
+                keys = groups.get(shard)
+                if keys:
+                    writes.append(
+                        (path, [self.__entry_of(key) for key in keys])
+                    )
+                else:
+                    removals.append(path)
+        return writes, removals, dirty is None
+
+    def __remove_shards(self, keep=()):
+        """
+        Removes the shard files whose path is not in keep, and the shard
+        directory itself if nothing is kept.
+        """
+
+        if not os.path.isdir(self.shard_dir):
+            return
+
+        for name in os.listdir(self.shard_dir):
+            path = os.path.join(self.shard_dir, name)
+            if path not in keep and self.__parse_shard_name(name):
+                os.remove(path)
+        if not keep and not os.listdir(self.shard_dir):
+            os.rmdir(self.shard_dir)
+
+    def __mark_dirty(self, keys):
+        """
+        Records the shards holding keys as needing a rewrite.
+        """
+
+        if not self.__shards or self.__dirty_shards is None:
+            return
+        for key in keys:
+            self.__dirty_shards.add(
+                (key.split(".", 1)[0], self.__shard_of(key))
+            )
+
+    def __shard_of(self, key):
+        """
+        Returns the shard number key hashes to.
+        """
+
+        if self.__shards <= 1:
+            return 0
+        # crc32 is stable across processes, unlike hash()
+        return zlib.crc32(key.encode("utf-8")) % self.__shards
+
+    def __shard_path(self, class_name, shard):
+        """
+        Returns the path of the shard file of class_name numbered shard.
+        """
+
+        if self.__shards == 1:
+            name = f"{class_name}.json"
+        else:
+            name = f"{class_name}.{shard}.json"
+        return os.path.join(self.shard_dir, name)
+
+    def __parse_shard_name(self, name):
+        """
+        Returns the (class name, shard) pair of a shard file name, with
+        shard None for a whole-class file, or None for any other file.
+        """
+
+        parts = name.split(".")
+        if parts[-1] != "json" or parts[0] not in self.classes():
+            return None
+        if len(parts) == 2:
+            return parts[0], None
+        if len(parts) == 3 and parts[1].isdigit():
+            return parts[0], int(parts[1])
+        return None
+
+    def __iter_keys(self, class_name):
+        """
+        Yields the keys of the instances and pending records of class_name.
+        """
+
+        for key, obj in self.__by_class.get(class_name, {}).items():
+            if self.__objects.get(key) is obj:
+                yield key
+        yield from self.__pending.get(class_name, {}).keys()
+
+    def __snapshot(self, class_name=None):
+        """
+        Returns the snapshot entries of every instance and pending record,
+        or only of those of class_name, to be encoded by __encode_entries()
+        once the lock is released.
+        """
+
+        if class_name is None:
+            objects = self.__objects.items()
+            pending = list(self.__pending.values())
+        else:
+            objects = (
+                (key, obj)
+                for key, obj in self.__by_class.get(class_name, {}).items()
+                if self.__objects.get(key) is obj
+            )
+            pending = [self.__pending.get(class_name, {})]
+
+        entries = [self.__entry(key, obj) for key, obj in objects]
+        # records that were never built are written back as read
+        for records in pending:
+            if isinstance(records, REBUILT):
+                # rebuilt records are new dictionaries every time, so
+                # they are only rebuilt when encoded
+                entries.extend((key, records, None) for key in records.keys())
+            else:
+                entries.extend(
+                    self.__entry(key, record)
+                    for key, record in records.items()
+                )
+        return entries
+
+    def __entry(self, key, obj):
+        """
+        Returns the snapshot entry of obj, an instance or a pending
+        record: (key, obj, text), where text is its cached JSON text,
+        or None if it changed since it was last encoded.
+        """
+
+        cached = self.__fragments.get(key)
+        if cached is not None and cached[0] is obj:
+            if key not in self.__changes:
+                return key, obj, cached[1]
+        return key, obj, None
+
+    def __entry_of(self, key):
+        """
+        Returns the snapshot entry of the instance or pending record of key.
+        """
+
+        obj = self.__objects.get(key)
+        if obj is not None:
+            return self.__entry(key, obj)
+
+        records = self.__pending[key.split(".", 1)[0]]
+        if isinstance(records, REBUILT):
+            return key, records, None
+        return self.__entry(key, records[key])
+
+    def __encode_entries(self, entries, fresh):
+        """
+        Yields the key and JSON text of every snapshot entry, encoding the
+        entries without cached text and, if the fragment cache is on,
+        adding them to fresh, as (key, obj, text), for __cache_fragments().
+        """
+
+        # without the cache, the text is dropped once it is written
+        collect = self.__fragment_cache
+        for key, obj, text in entries:
+            if text is None:
+                if isinstance(obj, REBUILT):
+                    # the record may have been built since the snapshot,
+                    # and its row reused, so read it under the lock
+                    with self.__lock:
+                        value = obj.get(key)
+                        if value is None:
+                            value = self.__objects.get(key)
+                    if value is None:
+                        # deleted since the snapshot, which the next save
+                        # writes as well
+                        continue
+                    text = self.__encode_value(value)
+                else:
+                    text = self.__encode_value(obj)
+                    if collect:
+                        fresh.append((key, obj, text))
+            yield key, text
+
+    def __encode_value(self, obj):
+        """
+        Returns the JSON text of obj, an instance or a record, or its
+        encoded record in the binary snapshot format.
+        """
+
+        FileStorage.__encoded += 1
+        binary = self.__snapshot_format == "binary"
+        if isinstance(obj, dict):
+            if binary:
+                return binary_snapshot.encode_record(obj)
+            return json.dumps(self.__with_timestamps(obj))
+
+        obj_dict = obj.to_dict()
+        # binary snapshots always hold epoch timestamps
+        if binary or self.__timestamp_format == "epoch":
+            obj_dict["created_at"] = timestamps.to_epoch(obj.created_at)
+            obj_dict["updated_at"] = timestamps.to_epoch(obj.updated_at)
+        if binary:
+            return binary_snapshot.encode_record(obj_dict)
+        return json.dumps(obj_dict)
+
+    def __json_text(self, text):
+        """
+        Returns the JSON text of text, an encoded value returned by
+        __encode_value() in either snapshot format.
+        """
+
+        if isinstance(text, str):
+            return text
+        record = binary_snapshot.decode_record(text)
+        return json.dumps(self.__with_timestamps(record))
+
+    def __with_timestamps(self, record):
+        """
+        Returns record, or a copy of it if its timestamps are not in the
+        current timestamp format, which records read from a file written
+        in another format may be.
+        """
+
+        epoch = self.__timestamp_format == "epoch"
+        converted = None
+        for name in binary_snapshot.TIMESTAMPS:
+            value = record.get(name)
+            if value is None or isinstance(value, int) == epoch:
+                continue
+            if converted is None:
+                converted = dict(record)
+            value = timestamps.parse(value)
+            if epoch:
+                converted[name] = timestamps.to_epoch(value)
+            else:
+                converted[name] = timestamps.to_iso(value)
+        return record if converted is None else converted
+
+    def __cache_fragments(self, fresh):
+        """
+        Caches the JSON text encoded for the (key, obj, text) entries of
+        fresh, unless their object changed or went away meanwhile.
+        """
+
+        if not self.__fragment_cache:
+            return
+
+        with self.__lock:
+            for key, obj, text in fresh:
+                if key in self.__changes:
+                    continue
+                records = self.__pending.get(key.split(".", 1)[0], {})
+                if self.__objects.get(key) is obj or records.get(key) is obj:
+                    self.__fragments[key] = (obj, text)
+
+    def __take_changes(self):
+        """
+        Returns the changes made since the last save, and starts
+        recording the next ones.
+        """
+
+        changes = self.__changes
+        FileStorage.__changes = {}
+        return changes
+
+    def __restore_changes(self, changes):
+        """
+        Puts back the changes taken by a save that failed, unless their
+        keys changed again since.
+        """
+
+        with self.__lock:
+            for key, obj in changes.items():
+                self.__changes.setdefault(key, obj)
+
+    def __append_journal(self):
+        """
+        Appends one upsert or delete entry per pending change
+        to the journal.
+        """
+
+        with self.__lock:
+            if not self.__changes:
+                return
+
+            # the shards of the journaled keys are rewritten at compaction
+            self.__mark_dirty(self.__changes)
+            deletes, puts, changes = self.__take_journal_entries()
+
+        fresh = []
+        try:
+            # build one JSON line per changed key
+            lines = [
+                f'{{"op": "delete", "key": {json.dumps(key)}}}\n'
+                for key in deletes
+            ]
+            for key, text in self.__encode_entries(puts, fresh):
+                lines.append(
+                    f'{{"op": "put", "key": {json.dumps(key)}, '
+                    f'"value": {self.__json_text(text)}}}\n'
+                )
+
+            # append the entries in a single write
+            text = "".join(lines)
+            with open(self.journal_path, "a", encoding="utf-8") as file:
+                file.write(text)
+                self.__sync(file)
+        except BaseException:
+            self.__restore_changes(changes)
+            raise
+
+        if metrics.enabled:
+            metrics.increment(
+                "storage.bytes_written", len(text.encode("utf-8"))
+            )
+        FileStorage.__journal_size += len(lines)
+        self.__cache_fragments(fresh)
+
+    def __sync(self, file, path=None):
+        """
+        Forces the content of file, stored at path (its name by default),
+        to disk if the durability level asks for it, and returns whether
+        it did.
+        """
+
+        if self.__durability == "none":
+            return False
+
+        now = time.monotonic()
+        if self.__durability == "group":
+            # let the saves of the current interval share one fsync
+            if now - self.__last_sync < self.__commit_interval:
+                self.__defer_sync(file.name if path is None else path)
+                return False
+
+        file.flush()
+        os.fsync(file.fileno())
+        FileStorage.__last_sync = now
+        return True
+
+    def __defer_sync(self, path):
+        """
+        Schedules the fsync of path for the end of the current commit
+        interval, along with the other paths deferred until then.
+        """
+
+        with self.__lock:
+            FileStorage.__unsynced.add(os.path.abspath(path))
+            if self.__sync_timer is not None:
+                return
+            delay = self.__last_sync + self.__commit_interval
+            timer = threading.Timer(
+                max(delay - time.monotonic(), 0), self.__sync_deferred
+            )
+            timer.daemon = True
+            FileStorage.__sync_timer = timer
+            timer.start()
+
+    def __sync_deferred(self):
+        """
+        Forces the paths whose fsync was deferred to disk, along with
+        their directories.
+        """
+
+        # files are only replaced and removed while the flush lock is held
+        with self.__flush_lock:
+            with self.__lock:
+                paths = self.__unsynced
+                FileStorage.__unsynced = set()
+                timer = self.__sync_timer
+                FileStorage.__sync_timer = None
+            if timer is not None:
+                timer.cancel()
+            if not paths:
+                return
+
+            for path in paths:
+                try:
+                    fd = os.open(path, os.O_RDONLY)
+                except FileNotFoundError:
+                    # removed since, such as a journal folded into a
+                    # snapshot, so only its directory needs syncing
+                    continue
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            for directory in {os.path.dirname(path) for path in paths}:
+                self.__sync_directory(directory)
+            FileStorage.__last_sync = time.monotonic()
+
+    @staticmethod
+    def __sync_directory(directory):
+        """
+        Forces the entries of directory, such as a rename, to disk.
+        """
+
+        # directories can only be opened for syncing on POSIX systems
+        if not hasattr(os, "O_DIRECTORY"):
+            return
+
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def __replay_journal(self):
+        """
+        Applies the journal entries, in order, on top of __objects.
+        """
+
+        FileStorage.__journal_size = 0
+        if not os.path.isfile(self.journal_path):
+            return
+
+        classes = self.classes()
+        with open(self.journal_path, "r", encoding="utf-8") as file:
+            if metrics.enabled:
+                metrics.increment(
+                    "storage.bytes_read", os.fstat(file.fileno()).st_size
+                )
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # a torn final line is left behind by an interrupted
+                    # append, and everything before it is still valid
+                    break
+
+                key = entry["key"]
+                self.__mark_dirty((key,))
+                if entry["op"] == "delete":
+                    self.__unload(key)
+                else:
+                    self.__load(key, entry["value"], classes)
+                FileStorage.__journal_size += 1
+
+    def classes(self):
+        """
+        Returns the dictionary mapping class names
+        to their corresponding types.
+        """
+        # import the model classes from their modules
+        from models.base_model import BaseModel
+        from models.user import User
+        from models.state import State
+        from models.city import City
+        from models.amenity import Amenity
+        from models.place import Place
+        from models.review import Review
+
+        # add other classes as needed
+        classes = {
+            "BaseModel": BaseModel,
+            "User": User,
+            "State": State,
+            "City": City,
+            "Amenity": Amenity,
+            "Place": Place,
+            "Review": Review,
+        }
+        return classes
+
+    def reload(self):
+        """
+        Deserializes the JSON file to __objects only if the file exists,
+        then replays the journal written since the last snapshot.
+        """
+
+        with self.__flush_lock, self.__lock, \
+                self.__lock_file(exclusive=False) as lock_file, \
+                metrics.timer("storage.reload"):
+            self.__read()
+            if lock_file is not None:
+                FileStorage.__generation = self.__read_generation(lock_file)
+
+    def __read(self):
+        """
+        Deserializes the snapshot to __objects and replays the journal.
+        """
+
+        FileStorage.__dirty_shards = set()
+        FileStorage.__unloaded = {}
+        FileStorage.__tombstones = set()
+
+        sharded = os.path.isdir(self.shard_dir)
+        if self.__shards and sharded:
+            self.__load_shards()
+        # a record file is mapped rather than read
+        elif os.path.isfile(self.index_path) and self.__map_records():
+            if self.__shards:
+                FileStorage.__dirty_shards = None
+        # check if the JSON file exists
+        elif os.path.isfile(self.__file_path):
+            self.__load_snapshot(self.__file_path)
+            if self.__shards:
+                # split the single file at the next compaction
+                FileStorage.__dirty_shards = None
+        elif sharded:
+            # merge the shard files at the next compaction
+            self.__load_shards()
+
+        # replay the changes saved since the last snapshot
+        self.__replay_journal()
+        if self.__journal_size:
+            # which the record file does not hold
+            FileStorage.__mapped = None
+
+    def __load_snapshot(self, path, merge=False):
+        """
+        Deserializes the JSON file at path to __objects. When merge is
+        set, the keys already in memory or deleted are skipped.
+        """
+
+        # look the classes up once rather than once per record
+        classes = self.classes()
+
+        try:
+            # attempt to open the snapshot for reading
+            with open(path, "rb") as file:
+                if metrics.enabled:
+                    metrics.increment(
+                        "storage.bytes_read", os.fstat(file.fileno()).st_size
+                    )
+                # decode the entries one at a time, so only one record
+                # (or one chunk of a binary snapshot) at a time exists
+                # outside of __objects
+                for key, obj_dict in _iter_snapshot(file):
+                    if merge and (
+                        key in self.__objects
+                        or key in self.__tombstones
+                        or key in self.__pending.get(obj_dict["__class__"], {})
+                    ):
+                        continue
+                    self.__load(key, obj_dict, classes)
+
+        except json.JSONDecodeError as e:
+            # handle potential issues with JSON decoding
+            print(f"error decoding JSON: {e}")
+
+        except binary_snapshot.SnapshotError as e:
+            print(f"error decoding snapshot: {e}")
+
+        except FileNotFoundError:
+            pass  # if the file doesn't exist, do nothing
+
+    def __map_records(self):
+        """
+        Maps the record file at file_path, keeping its records pending
+        until they are looked up, and returns whether it is one.
+        """
+
+        try:
+            mapped = record_file.RecordFile(self.__file_path, self.index_path)
+        except ValueError:
+            # a snapshot replaced the record file before its index was
+            # removed, so read it as a snapshot
+            return False
+        if metrics.enabled:
+            metrics.increment(
+                "storage.bytes_read", os.path.getsize(self.index_path)
+            )
+
+        # the records of a previously mapped file are forgotten
+        for class_name, records in list(self.__pending.items()):
+            if isinstance(records, MappedRecords):
+                del self.__pending[class_name]
+
+        for class_name, records in mapped.views().items():
+            for key in records:
+                # the record on disk replaces the instance in memory
+                if key in self.__objects:
+                    self.__remove(key)
+            for key, record in self.__pending.get(class_name, {}).items():
+                if key not in records:
+                    records[key] = record
+            self.__pending[class_name] = records
+        FileStorage.__mapped = mapped
+        return True
+
+    def __load_shards(self):
+        """
+        Deserializes the shard files to __objects or, in lazy mode, only
+        notes which exist so that each is read on first use.
+        """
+
+        for name in sorted(os.listdir(self.shard_dir)):
+            parsed = self.__parse_shard_name(name)
+            if parsed is None:
+                continue
+            class_name, shard = parsed
+            path = os.path.join(self.shard_dir, name)
+
+            # only files of the current layout can be found by shard
+            if self.__shards == 1:
+                matches = shard is None
+                shard = 0
+            else:
+                matches = shard is not None and shard < self.__shards
+
+            if self.__lazy and matches:
+                self.__unloaded.setdefault(class_name, {})[shard] = path
+            else:
+                self.__load_snapshot(path)
+                if not matches:
+                    # rewrite the files of another layout in this one
+                    FileStorage.__dirty_shards = None
+
+    def __load_shards_of(self, class_name, shard=None):
+        """
+        Reads the shard files of class_name not read yet, or only the
+        one numbered shard if it is given.
+        """
+
+        if class_name not in self.__unloaded:
+            return
+
+        with self.__lock:
+            shards = self.__unloaded.get(class_name, {})
+            if shard is None:
+                paths = list(shards.values())
+                shards.clear()
+            else:
+                paths = [shards.pop(shard)] if shard in shards else []
+            if not shards:
+                self.__unloaded.pop(class_name, None)
+            for path in paths:
+                self.__load_snapshot(path, merge=True)
+
+    def __load(self, key, obj_dict, classes):
+        """
+        Stores a record read from disk under key, as an instance or,
+        in lazy mode, as a pending record.
+        """
+
+        # retrieve the class type from the classes dictionary
+        class_type = classes[obj_dict["__class__"]]
+
+        if self.__lazy:
+            # the record on disk replaces the instance in memory
+            if key in self.__objects:
+                self.__remove(key)
+            records = self.__pending.get(class_type.__name__)
+            if records is None:
+                records = ColumnStore() if self.__columnar else {}
+                self.__pending[class_type.__name__] = records
+            records[key] = obj_dict
+        else:
+            # create an instance of the class using the provided dictionary
+            # and add it to __objects with the corresponding key
+            self.__insert(key, class_type(**obj_dict))
+
+    def __unload(self, key):
+        """
+        Forgets the instance or pending record stored under key.
+        """
+
+        if key.split(".", 1)[0] in self.__unloaded:
+            # never bring the record back from its shard file
+            self.__tombstones.add(key)
+
+        if key in self.__objects:
+            self.__remove(key)
+        self.__pending.get(key.split(".", 1)[0], {}).pop(key, None)
+        self.__fragments.pop(key, None)
+
+
+def _iter_snapshot(file):
+    """
+    Yields the (key, record) pairs of the snapshot in the binary file,
+    whichever format it was written in.
+    """
+
+    if binary_snapshot.is_binary(file):
+        return binary_snapshot.iter_records(file)
+    return json_stream.iter_items(io.TextIOWrapper(file, encoding="utf-8"))
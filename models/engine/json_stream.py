@@ -0,0 +1,183 @@
+#!/usr/bin/python3
+"""
+The JSON Stream Module
+
+Reads and writes the top-level JSON object of file.json one entry at a
+time, so neither side ever holds the whole document in memory, and reads
+newline-delimited JSON (one record per line) for bulk imports.
+"""
+
+# import the json module for decoding single JSON values
+import json
+
+# number of characters read from the file at a time
+CHUNK_SIZE = 65536
+
+# characters JSON allows between tokens
+WHITESPACE = " \t\n\r"
+
+
+def dump_items(file, items):
+    """
+    Writes a JSON object to file, one entry at a time.
+
+    items yields (key, text) pairs, where text is the JSON text
+    of the value stored under key.
+    """
+
+    file.write("{")
+    separator = ""
+    for key, text in items:
+        file.write(f"{separator}{json.dumps(key)}: {text}")
+        separator = ", "
+    file.write("}")
+
+
+def iter_items(file, chunk_size=CHUNK_SIZE):
+    """
+    Yields the (key, value) pairs of the JSON object stored in file,
+    decoding one entry at a time.
+
+    Raises json.JSONDecodeError if the document is not a JSON object.
+    Entries decoded before the error have already been yielded.
+    """
+
+    reader = _Reader(file, chunk_size)
+
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.advance(1)
+        reader.expect_end()
+        return
+
+    while True:
+        key = reader.decode()
+        if not isinstance(key, str):
+            raise reader.error("Expecting property name enclosed in quotes")
+        reader.expect(":")
+        yield key, reader.decode()
+
+        if reader.peek() == "}":
+            reader.advance(1)
+            reader.expect_end()
+            return
+        reader.expect(",")
+
+
+def iter_lines(file, classes):
+    """
+    Yields the records of a newline-delimited JSON file, one per line,
+    skipping blank lines.
+
+    Raises ValueError, naming the line, for a line that is not a JSON
+    object with an "id" and a "__class__" found in classes.
+    """
+
+    for number, line in enumerate(file, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"line {number}: {e}") from None
+
+        if not isinstance(record, dict) or "id" not in record:
+            raise ValueError(f"line {number}: not a record with an id")
+        if record.get("__class__") not in classes:
+            raise ValueError(
+                f"line {number}: unknown class {record.get('__class__')!r}"
+            )
+        yield record
+
+
+class _Reader:
+    """
+    Buffered cursor over a text file feeding json.JSONDecoder.
+    """
+
+    def __init__(self, file, chunk_size):
+        """Initializes the reader on file."""
+
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Reads the next chunk, returning False at the end of file."""
+
+        if self.eof:
+            return False
+
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+
+        # drop what has already been consumed before growing the buffer
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def skip_whitespace(self):
+        """Moves past whitespace, reading more of the file if needed."""
+
+        while True:
+            while (
+                self.pos < len(self.buffer)
+                and self.buffer[self.pos] in WHITESPACE
+            ):
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self.fill():
+                return
+
+    def peek(self):
+        """Returns the next non-whitespace character, or ''."""
+
+        self.skip_whitespace()
+        return self.buffer[self.pos:self.pos + 1]
+
+    def advance(self, count):
+        """Consumes count characters."""
+
+        self.pos += count
+
+    def expect(self, char):
+        """Consumes char, which must be the next token."""
+
+        if self.peek() != char:
+            raise self.error(f"Expecting '{char}' delimiter")
+        self.advance(1)
+
+    def expect_end(self):
+        """Checks that nothing but whitespace is left."""
+
+        if self.peek():
+            raise self.error("Extra data")
+
+    def decode(self):
+        """Decodes the next JSON value, reading more of the file if needed."""
+
+        self.skip_whitespace()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+
+            # a value ending with the buffer may continue in the file,
+            # as a number split between two chunks would
+            if end == len(self.buffer) and self.fill():
+                continue
+
+            self.pos = end
+            return value
+
+    def error(self, message):
+        """Returns a JSONDecodeError located at the current position."""
+
+        return json.JSONDecodeError(message, self.buffer, self.pos)
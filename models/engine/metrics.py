@@ -0,0 +1,210 @@
+#!/usr/bin/python3
+"""
+The Metrics Module
+
+Collects counters and histograms from the storage and the console, such
+as the number of saves, the bytes they write and how long they take.
+
+Nothing is recorded until metrics.enabled is set, and the instrumented
+code checks that flag before doing any work, so disabled metrics cost
+one attribute lookup per event.
+"""
+
+# import the atexit module for dumping the metrics on exit
+import atexit
+
+# import the contextlib module for the timer() context manager
+import contextlib
+
+# import the json module for dumping the metrics
+import json
+
+# import the math module for bucketing histogram values
+import math
+
+# import the threading module for recording from several threads
+import threading
+
+# import the time module for timing operations
+import time
+
+
+class Histogram:
+    """
+    The Histogram class summarizes the values of one measurement, in
+    buckets whose bounds are powers of two, so quantiles are estimated
+    within a factor of two whatever the unit.
+
+    Attributes:
+    - count (int): The number of values.
+    - total (float): The sum of the values.
+    - min (float): The smallest value, None if there is none.
+    - max (float): The largest value, None if there is none.
+    - buckets (dict): Maps binary exponents to the number of values
+        v with 2 ** (exponent - 1) <= v < 2 ** exponent.
+    """
+
+    def __init__(self):
+        """Initializes an empty histogram."""
+
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+        self.buckets = {}
+
+    def add(self, value):
+        """Records value."""
+
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        exponent = math.frexp(value)[1]
+        self.buckets[exponent] = self.buckets.get(exponent, 0) + 1
+
+    def quantile(self, fraction):
+        """Returns the upper bound of the bucket holding the given
+        fraction of the values, capped by the largest value."""
+
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for exponent in sorted(self.buckets):
+            seen += self.buckets[exponent]
+            if seen >= rank:
+                return min(math.ldexp(1, exponent), self.max)
+        return self.max
+
+    def summary(self):
+        """Returns the histogram as a dictionary."""
+
+        return {
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
+
+
+class Metrics:
+    """
+    The Metrics class holds named counters and histograms.
+
+    Attributes:
+    - enabled (bool): Whether events are recorded.
+
+    Methods:
+    - increment(self, name, amount=1): Adds amount to a counter.
+    - observe(self, name, value): Adds value to a histogram.
+    - timer(self, name): Context manager observing the seconds its
+        block takes.
+    - subscribe(self, listener): Calls listener(kind, name, value) for
+        every event, where kind is "counter" or "histogram".
+    - snapshot(self): Returns the counters and histogram summaries.
+    - reset(self): Forgets every recorded value.
+    - dump(self, path): Writes the snapshot to path as JSON.
+    - dump_on_exit(self, path): Dumps the snapshot to path at exit.
+    """
+
+    def __init__(self):
+        """Initializes disabled, empty metrics."""
+
+        self.enabled = False
+        self.__counters = {}
+        self.__histograms = {}
+        self.__listeners = []
+        self.__lock = threading.Lock()
+        self.__dump_path = None
+
+    def increment(self, name, amount=1):
+        """Adds amount to the counter name."""
+
+        if not self.enabled:
+            return
+        with self.__lock:
+            self.__counters[name] = self.__counters.get(name, 0) + amount
+        for listener in self.__listeners:
+            listener("counter", name, amount)
+
+    def observe(self, name, value):
+        """Adds value to the histogram name."""
+
+        if not self.enabled:
+            return
+        with self.__lock:
+            histogram = self.__histograms.get(name)
+            if histogram is None:
+                histogram = self.__histograms[name] = Histogram()
+            histogram.add(value)
+        for listener in self.__listeners:
+            listener("histogram", name, value)
+
+    @contextlib.contextmanager
+    def timer(self, name):
+        """Observes the seconds the block takes in the histogram name."""
+
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def subscribe(self, listener):
+        """Calls listener(kind, name, value) for every recorded event."""
+
+        self.__listeners.append(listener)
+
+    def snapshot(self):
+        """Returns {"counters": {...}, "histograms": {...}}."""
+
+        with self.__lock:
+            return {
+                "counters": dict(sorted(self.__counters.items())),
+                "histograms": {
+                    name: histogram.summary()
+                    for name, histogram in sorted(self.__histograms.items())
+                },
+            }
+
+    def reset(self):
+        """Forgets every counter and histogram."""
+
+        with self.__lock:
+            self.__counters.clear()
+            self.__histograms.clear()
+
+    def dump(self, path):
+        """Writes the snapshot to path as JSON."""
+
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.snapshot(), file, indent=4)
+            file.write("\n")
+
+    def dump_on_exit(self, path):
+        """Writes the snapshot to path as JSON when the interpreter
+        exits, replacing any path given before."""
+
+        if self.__dump_path is None:
+            atexit.register(self.__dump_at_exit)
+        self.__dump_path = path
+
+    def __dump_at_exit(self):
+        """Writes the snapshot to the path given to dump_on_exit()."""
+
+        if self.__dump_path is not None:
+            self.dump(self.__dump_path)
+
+
+# the metrics shared by the storage engines and the console
+metrics = Metrics()
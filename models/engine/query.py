@@ -0,0 +1,277 @@
+#!/usr/bin/python3
+"""
+The Query Module
+
+Parses and runs the queries of the console's query command:
+
+    <class> [where <attribute> <op> <value> [and ...]]
+            [order by <attribute> [asc|desc]] [offset <n>] [limit <n>]
+            [select <attribute>[,<attribute>...] | count]
+
+where <op> is one of =, ==, !=, <, <=, >, >= and contains. Values are
+compared as strings to string attributes, as numbers to numeric ones
+and as ISO 8601 timestamps to datetime ones. Words are case-sensitive
+except for the keywords, and values holding spaces can be quoted.
+
+Queries run against the storage's public methods. An unordered query
+with a limit goes through stream(), which only builds the instances of
+pending records as they are reached, so matching stops, and instances
+stop being built, as soon as the limit is reached. Other queries need
+every instance of the class: their equality conditions on string
+values go through find(), which uses the secondary indexes added with
+add_index(). An ordered query with a limit only keeps offset + limit
+instances while it scans, and a count without conditions is answered
+by count() without building any instance.
+"""
+
+# import the heapq and itertools modules for ordering and limiting
+# the results without holding or scanning more than needed
+import heapq
+import itertools
+
+# import the json module for parsing numeric values
+import json
+
+# import the operator module for the comparison operators
+import operator
+
+# import the shlex module for splitting queries with quoted values
+import shlex
+
+# import the datetime class for comparing timestamps
+from datetime import datetime
+
+# import the timestamps module for parsing timestamp values
+from models.engine import timestamps
+
+# the comparison operators, by their name in queries
+OPERATORS = {
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "contains": operator.contains,
+}
+
+# the keywords starting a clause
+CLAUSES = ("where", "order", "offset", "limit", "select", "count")
+
+# marks missing attributes
+MISSING = object()
+
+
+class Condition:
+    """
+    The Condition class holds one "<attribute> <op> <value>" condition.
+
+    Attributes:
+    - attribute (str): The name of the attribute compared.
+    - op (str): The name of the operator.
+    - text (str): The value as written in the query.
+    - value: The value as a number, or text if it is not one.
+    """
+
+    def __init__(self, attribute, op, text):
+        """Initializes the condition, parsing numeric values."""
+
+        self.attribute = attribute
+        self.op = op
+        self.text = text
+        try:
+            value = json.loads(text)
+        except ValueError:
+            value = text
+        self.value = value if isinstance(value, (int, float)) else text
+
+    def matches(self, obj):
+        """Returns whether the attribute of obj satisfies the condition."""
+
+        actual = getattr(obj, self.attribute, MISSING)
+        if actual is MISSING:
+            return False
+        if isinstance(actual, str):
+            expected = self.text
+        elif isinstance(actual, datetime):
+            try:
+                expected = timestamps.parse(self.text)
+            except ValueError:
+                return False
+        else:
+            expected = self.value
+        try:
+            return bool(OPERATORS[self.op](actual, expected))
+        except TypeError:
+            # values that cannot be compared never match
+            return False
+
+
+class Query:
+    """
+    The Query class holds a parsed query.
+
+    Attributes:
+    - class_name (str): The name of the class queried.
+    - conditions (list): The Condition instances, all of which match.
+    - order_by (str): The attribute the results are ordered by, or None.
+    - descending (bool): Whether the results are in descending order.
+    - offset (int): The number of results skipped.
+    - limit (int): The maximum number of results, or None.
+    - fields (list): The attributes printed, or None for the instances.
+    - count (bool): Whether only the number of results is printed.
+    """
+
+    def __init__(self, class_name):
+        """Initializes a query of every instance of class_name."""
+
+        self.class_name = class_name
+        self.conditions = []
+        self.order_by = None
+        self.descending = False
+        self.offset = 0
+        self.limit = None
+        self.fields = None
+        self.count = False
+
+    def run(self, storage):
+        """Returns an iterator over the matching instances of storage."""
+
+        matches = (
+            obj
+            for obj in self.__candidates(storage)
+            if all(condition.matches(obj) for condition in self.conditions)
+        )
+        end = None if self.limit is None else self.offset + self.limit
+
+        if self.order_by is not None:
+            key = self.__sort_key
+            try:
+                if end is None:
+                    matches = sorted(matches, key=key, reverse=self.descending)
+                elif self.descending:
+                    matches = heapq.nlargest(end, matches, key=key)
+                else:
+                    matches = heapq.nsmallest(end, matches, key=key)
+            except TypeError:
+                raise ValueError(
+                    f"cannot order by {self.order_by}: mixed types"
+                ) from None
+        return itertools.islice(matches, self.offset, end)
+
+    def count_in(self, storage):
+        """Returns the number of matching instances of storage."""
+
+        if self.conditions:
+            return sum(1 for _ in self.run(storage))
+
+        # no instance needs to be looked at, nor even built
+        total = max(storage.count(self.class_name) - self.offset, 0)
+        return total if self.limit is None else min(total, self.limit)
+
+    def project(self, obj):
+        """Returns the selected attributes of obj, as a dictionary."""
+
+        values = {}
+        for field in self.fields:
+            value = getattr(obj, field, MISSING)
+            if value is not MISSING:
+                values[field] = value
+        return values
+
+    def __candidates(self, storage):
+        """Returns the instances the conditions are checked against."""
+
+        if self.limit is not None and self.order_by is None:
+            # the scan may stop early, so build instances as it goes
+            return storage.stream(self.class_name)
+
+        # equality with a string goes through find(), and its indexes,
+        # except for timestamps, which are not stored as strings
+        filters = {
+            condition.attribute: condition.text
+            for condition in self.conditions
+            if condition.op in ("=", "==")
+            and condition.value is condition.text
+            and condition.attribute not in ("created_at", "updated_at")
+        }
+        if filters:
+            return storage.find(self.class_name, **filters).values()
+        return storage.all(self.class_name).values()
+
+    def __sort_key(self, obj):
+        """Returns the key ordering obj, with missing attributes last."""
+
+        value = getattr(obj, self.order_by, MISSING)
+        present = 1 if self.descending else 0
+        if value is MISSING:
+            return (1 - present,)
+        return (present, value)
+
+
+def parse(text, classes):
+    """
+    Returns the Query written as text, querying one of classes.
+
+    Raises ValueError with a message for the user if it is invalid.
+    """
+
+    try:
+        tokens = shlex.split(text)
+    except ValueError as e:
+        raise ValueError(f"invalid query: {e}") from None
+    if not tokens:
+        raise ValueError("class name missing")
+    if tokens[0] not in classes:
+        raise ValueError("class doesn't exist")
+
+    query = Query(tokens[0])
+    tokens = tokens[1:]
+    while tokens:
+        clause = tokens.pop(0).lower()
+        if clause == "where":
+            tokens = _parse_conditions(query, tokens)
+        elif clause == "order":
+            if len(tokens) < 2 or tokens[0].lower() != "by":
+                raise ValueError("expected: order by <attribute>")
+            query.order_by = tokens[1]
+            tokens = tokens[2:]
+            if tokens and tokens[0].lower() in ("asc", "desc"):
+                query.descending = tokens.pop(0).lower() == "desc"
+        elif clause in ("offset", "limit"):
+            if not tokens or not tokens[0].isdigit():
+                raise ValueError(f"expected: {clause} <number>")
+            setattr(query, clause, int(tokens.pop(0)))
+        elif clause == "select":
+            fields = []
+            while tokens and tokens[0].lower() not in CLAUSES:
+                fields.extend(
+                    field for field in tokens.pop(0).split(",") if field
+                )
+            if not fields:
+                raise ValueError("expected: select <attribute>,...")
+            query.fields = fields
+        elif clause == "count":
+            query.count = True
+        else:
+            raise ValueError(f"unexpected {clause!r}")
+    return query
+
+
+def _parse_conditions(query, tokens):
+    """Adds the conditions at the start of tokens to query, and returns
+    the tokens left."""
+
+    while True:
+        if len(tokens) < 3:
+            raise ValueError("expected: where <attribute> <op> <value>")
+        attribute, op, text = tokens[:3]
+        op = op.lower()
+        if op not in OPERATORS:
+            raise ValueError(f"unknown operator {op!r}")
+        query.conditions.append(Condition(attribute, op, text))
+        tokens = tokens[3:]
+        if not tokens or tokens[0].lower() != "and":
+            return tokens
+        tokens = tokens[1:]
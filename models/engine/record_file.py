@@ -0,0 +1,307 @@
+#!/usr/bin/python3
+"""
+The Record File Module
+
+Stores records in a data file, one JSON record per line, next to a
+sidecar index giving the offset and length of the line of every
+"Class.id" key. The data file is opened with mmap, so a record is only
+decoded when it is looked up, and the records that never are stay in
+the page cache of the operating system rather than in Python objects.
+
+The data file starts with a header line {"records": VERSION, "token":
+"<hex>"}. The index file starts with a "records <VERSION> <token>" line,
+followed by one "<offset> <length> <key>" line per record written, or
+"-1 0 <key>" per record deleted, where the last line of a key wins.
+Changed records are appended to the data file, and their index lines
+to the index, so both only grow until they are rewritten whole.
+
+Both files carry the same token. A data file whose index has another
+token was rewritten without its index, and its index is rebuilt by
+scanning it instead.
+"""
+
+# import the json module for decoding the records
+import json
+
+# import the mmap module for mapping the data file into memory
+import mmap
+
+# import the os module for the size of the data file
+import os
+
+# import the uuid module for generating tokens
+import uuid
+
+# version of the format, written in both headers
+VERSION = 1
+
+
+def new_token():
+    """Returns a new token pairing a data file with its index."""
+
+    return uuid.uuid4().hex
+
+
+def dump_data(file, items, token, offsets):
+    """
+    Writes a data file to the binary file, and the offset and length of
+    the line of every key to offsets.
+
+    items yields (key, text) pairs, where text is the JSON text of the
+    record stored under key.
+    """
+
+    header = json.dumps({"records": VERSION, "token": token}) + "\n"
+    file.write(header.encode("utf-8"))
+    offset = len(header)
+    for key, text in items:
+        line = text.encode("utf-8") + b"\n"
+        file.write(line)
+        offsets[key] = (offset, len(line) - 1)
+        offset += len(line)
+
+
+def dump_index(file, items, token):
+    """
+    Writes an index file to the binary file, where items yields the
+    (key, (offset, length)) pairs of the records of the data file.
+    """
+
+    file.write(f"records {VERSION} {token}\n".encode("utf-8"))
+    file.write(
+        "".join(
+            f"{offset} {length} {key}\n" for key, (offset, length) in items
+        ).encode("utf-8")
+    )
+
+
+class RecordFile:
+    """
+    The RecordFile class maps a data file and reads its index.
+
+    Attributes:
+    - path (str): The path of the data file.
+    - index_path (str): The path of the index file.
+    - offsets (dict): Maps the key of every record to the offset and
+        length of its line in the data file.
+    - size (int): The size of the data file in bytes.
+    - live (int): The bytes of the data file the records use, the rest
+        being previous versions of records and deleted records.
+
+    Raises ValueError if the data file is not a record file.
+    """
+
+    def __init__(self, path, index_path, offsets=None):
+        """Maps the data file at path and reads the index at index_path,
+        unless the offsets just written to it are given."""
+
+        self.path = path
+        self.index_path = index_path
+        with open(path, "rb") as file:
+            self.size = os.fstat(file.fileno()).st_size
+            if not self.size:
+                raise ValueError("empty record file")
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            # a snapshot may be a single line, so check its start first
+            if self.data[:12] != b'{"records": ':
+                raise ValueError("no header")
+            header = json.loads(self.data[:self.data.find(b"\n")])
+            token = header["token"]
+            if header["records"] != VERSION:
+                raise ValueError(f"unsupported version {header['records']}")
+        except (ValueError, KeyError, TypeError) as e:
+            self.data.close()
+            raise ValueError(f"not a record file: {e}") from None
+
+        self.offsets = offsets
+        if self.offsets is None:
+            self.offsets = self.__read_index(token)
+        if self.offsets is None:
+            self.offsets = self.__scan()
+        self.live = sum(length for _, length in self.offsets.values())
+
+    def __read_index(self, token):
+        """Returns the offsets read from the index, or None if it does
+        not belong to the data file."""
+
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as file:
+                if file.readline().split() != ["records", str(VERSION), token]:
+                    return None
+                offsets = {}
+                for line in file:
+                    # an interrupted append leaves a partial last line
+                    if not line.endswith("\n"):
+                        break
+                    offset, length, key = line[:-1].split(" ", 2)
+                    offset, length = int(offset), int(length)
+                    if offset < 0:
+                        offsets.pop(key, None)
+                    elif offset + length <= self.size:
+                        offsets[key] = (offset, length)
+                return offsets
+        except FileNotFoundError:
+            return None
+
+    def __scan(self):
+        """Returns the offsets of the records found in the data file."""
+
+        offsets = {}
+        offset = self.data.find(b"\n") + 1
+        while offset < self.size:
+            end = self.data.find(b"\n", offset)
+            if end < 0:
+                break
+            try:
+                record = json.loads(self.data[offset:end])
+                key = f"{record['__class__']}.{record['id']}"
+            except (ValueError, KeyError, TypeError):
+                pass
+            else:
+                offsets[key] = (offset, end - offset)
+            offset = end + 1
+        return offsets
+
+    def read(self, offset, length):
+        """Returns the record stored at offset."""
+
+        return json.loads(self.data[offset:offset + length])
+
+    def views(self):
+        """Returns the records, as {class name: MappedRecords}."""
+
+        grouped = {}
+        for key, location in self.offsets.items():
+            grouped.setdefault(key.split(".", 1)[0], {})[key] = location
+        return {
+            class_name: MappedRecords(self, offsets)
+            for class_name, offsets in grouped.items()
+        }
+
+    def append(self, items, deletes, sync):
+        """
+        Appends the (key, text) pairs of items, and the deletion of the
+        keys of deletes, to the data file and the index, calling sync
+        on each file once written, and returns the bytes written.
+        """
+
+        lines = []
+        entries = []
+        offset = self.size
+        for key, text in items:
+            line = text.encode("utf-8") + b"\n"
+            lines.append(line)
+            entries.append((key, offset, len(line) - 1))
+            offset += len(line)
+
+        # the data is written first, so the index never points past it
+        data = b"".join(lines)
+        with open(self.path, "ab") as file:
+            file.write(data)
+            sync(file)
+        index = "".join(
+            [f"{offset} {length} {key}\n" for key, offset, length in entries]
+            + [f"-1 0 {key}\n" for key in deletes]
+        ).encode("utf-8")
+        with open(self.index_path, "ab") as file:
+            file.write(index)
+            sync(file)
+
+        self.size += len(data)
+        for key in deletes:
+            self.live -= self.offsets.pop(key, (0, 0))[1]
+        for key, offset, length in entries:
+            self.live += length - self.offsets.get(key, (0, 0))[1]
+            self.offsets[key] = (offset, length)
+        return len(data) + len(index)
+
+    def close(self):
+        """Unmaps the data file."""
+
+        self.data.close()
+
+
+class MappedRecords:
+    """
+    The MappedRecords class holds the pending records of one class in a
+    record file, behaving like the {key: record dictionary} mapping it
+    replaces. Every lookup decodes the record again.
+
+    Attributes:
+    - file (RecordFile): The record file the records are read from.
+    - offsets (dict): Maps the keys to the offset and length of their
+        records in the file.
+    - added (dict): The records stored after the file was mapped.
+    """
+
+    def __init__(self, file, offsets):
+        """Initializes the records of file found at offsets."""
+
+        self.file = file
+        self.offsets = offsets
+        self.added = {}
+
+    def __len__(self):
+        """Returns the number of records."""
+
+        return len(self.offsets) + len(self.added)
+
+    def __contains__(self, key):
+        """Returns whether a record is stored under key."""
+
+        return key in self.offsets or key in self.added
+
+    def __iter__(self):
+        """Iterates over the keys."""
+
+        yield from self.offsets
+        yield from self.added
+
+    def __getitem__(self, key):
+        """Returns the record stored under key."""
+
+        record = self.get(key)
+        if record is None:
+            raise KeyError(key)
+        return record
+
+    def __setitem__(self, key, record):
+        """Stores record under key, replacing any previous one."""
+
+        self.offsets.pop(key, None)
+        self.added[key] = record
+
+    def keys(self):
+        """Returns an iterator over the keys."""
+
+        return iter(self)
+
+    def get(self, key, default=None):
+        """Returns the record stored under key, or default."""
+
+        location = self.offsets.get(key)
+        if location is not None:
+            return self.file.read(*location)
+        return self.added.get(key, default)
+
+    def pop(self, key, default=None):
+        """Removes the record stored under key and returns it."""
+
+        location = self.offsets.pop(key, None)
+        if location is not None:
+            return self.file.read(*location)
+        return self.added.pop(key, default)
+
+    def items(self):
+        """Yields the (key, record) pairs."""
+
+        for key in list(self):
+            yield key, self.get(key)
+
+    def values(self):
+        """Yields the records."""
+
+        for _, record in self.items():
+            yield record
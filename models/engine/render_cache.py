@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+"""
+The Render Cache Module
+
+Keeps the strings rendered for model instances, so printing an instance
+that did not change since it was last printed costs a lookup instead of
+formatting its whole __dict__ again.
+"""
+
+# import the OrderedDict class for keeping the entries in LRU order
+from collections import OrderedDict
+
+# import the threading module for sharing the cache between threads
+import threading
+
+# import the weakref module for noticing collected instances
+import weakref
+
+
+class RenderCache:
+    """
+    The RenderCache class maps instances, by identity, to the string
+    rendered for them, keeping at most maxsize entries and evicting the
+    least recently used one first.
+
+    Attributes:
+    - maxsize (int): The maximum number of entries, 0 to cache nothing.
+
+    An entry is dropped when its instance is garbage collected, so a new
+    instance reusing the same id() never sees the string of an old one.
+    """
+
+    def __init__(self, maxsize=4096):
+        """Initializes an empty cache of at most maxsize entries."""
+
+        self.maxsize = maxsize
+        # maps id(obj) to (weak reference to obj, rendered string)
+        self.__entries = OrderedDict()
+        # (key, weak reference) pairs of collected instances
+        self.__collected = []
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        """Returns the number of entries."""
+
+        return len(self.__entries)
+
+    def get(self, obj):
+        """Returns the string cached for obj, or None."""
+
+        with self.__lock:
+            entry = self.__entries.get(id(obj))
+            if entry is None or entry[0]() is not obj:
+                return None
+            self.__entries.move_to_end(id(obj))
+            return entry[1]
+
+    def put(self, obj, text):
+        """Caches text as the string rendered for obj."""
+
+        if self.maxsize <= 0:
+            return
+
+        key = id(obj)
+        # the callback may run in the middle of any allocation, even with
+        # the lock held, so it only queues the entry for removal
+        ref = weakref.ref(obj, lambda ref: self.__collected.append((key, ref)))
+        with self.__lock:
+            self.__purge()
+            self.__entries[key] = (ref, text)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+
+    def discard(self, obj):
+        """Drops the string cached for obj, if any."""
+
+        if not self.__entries:
+            return
+        with self.__lock:
+            entry = self.__entries.get(id(obj))
+            if entry is not None and entry[0]() is obj:
+                del self.__entries[id(obj)]
+
+    def clear(self):
+        """Drops every entry."""
+
+        with self.__lock:
+            self.__entries.clear()
+            self.__collected.clear()
+
+    def __purge(self):
+        """Drops the entries of collected instances."""
+
+        while self.__collected:
+            key, ref = self.__collected.pop()
+            entry = self.__entries.get(key)
+            if entry is not None and entry[0] is ref:
+                del self.__entries[key]
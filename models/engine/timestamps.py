@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+"""
+The Timestamps Module
+
+Converts the created_at and updated_at timestamps of the models to and
+from their stored forms: ISO 8601 strings, as written by isoformat(),
+or integer microseconds since the epoch.
+"""
+
+# import the lru_cache decorator for sharing repeated timestamps
+from functools import lru_cache
+
+# import the datetime and timedelta classes for working with timestamps
+from datetime import datetime, timedelta
+
+# the naive epoch integer timestamps are counted from
+EPOCH = datetime(1970, 1, 1)
+
+# one microsecond, the unit of integer timestamps
+MICROSECOND = timedelta(microseconds=1)
+
+
+@lru_cache(maxsize=4096)
+def parse(value):
+    """
+    Returns the datetime stored as value, either an ISO 8601 string
+    (with or without microseconds) or integer microseconds since the
+    epoch.
+
+    Repeated values return the same datetime object, which is safe
+    since datetimes are immutable.
+    """
+
+    if isinstance(value, int):
+        return EPOCH + value * MICROSECOND
+    return datetime.fromisoformat(value)
+
+
+def to_iso(value):
+    """
+    Returns the ISO 8601 string of the datetime value.
+    """
+
+    return value.isoformat()
+
+
+def to_epoch(value):
+    """
+    Returns the integer microseconds between the epoch and the naive
+    datetime value, without any time zone conversion.
+    """
+
+    return (value - EPOCH) // MICROSECOND
@@ -0,0 +1,38 @@
+#!/usr/bin/python3
+"""
+The Place Module
+"""
+
+# import the BaseModel class from the base_model module
+from models.base_model import BaseModel
+
+
+class Place(BaseModel):
+    """
+    Place class represents a place offered for rent.
+
+    Attributes:
+    - city_id (str): The id of the City the place is located in.
+    - user_id (str): The id of the User who owns the place.
+    - name (str): The name of the place.
+    - description (str): The description of the place.
+    - number_rooms (int): The number of rooms.
+    - number_bathrooms (int): The number of bathrooms.
+    - max_guest (int): The maximum number of guests.
+    - price_by_night (int): The price for one night.
+    - latitude (float): The latitude of the place.
+    - longitude (float): The longitude of the place.
+    - amenity_ids (list): The ids of the Amenity instances of the place.
+    """
+
+    city_id = ""
+    user_id = ""
+    name = ""
+    description = ""
+    number_rooms = 0
+    number_bathrooms = 0
+    max_guest = 0
+    price_by_night = 0
+    latitude = 0.0
+    longitude = 0.0
+    amenity_ids = []
@@ -0,0 +1,22 @@
+#!/usr/bin/python3
+"""
+The Review Module
+"""
+
+# import the BaseModel class from the base_model module
+from models.base_model import BaseModel
+
+
+class Review(BaseModel):
+    """
+    Review class represents a review left by a user for a place.
+
+    Attributes:
+    - place_id (str): The id of the reviewed Place.
+    - user_id (str): The id of the User who wrote the review.
+    - text (str): The text of the review.
+    """
+
+    place_id = ""
+    user_id = ""
+    text = ""
@@ -0,0 +1,18 @@
+#!/usr/bin/python3
+"""
+The State Module
+"""
+
+# import the BaseModel class from the base_model module
+from models.base_model import BaseModel
+
+
+class State(BaseModel):
+    """
+    State class represents a state cities belong to.
+
+    Attributes:
+    - name (str): The name of the state.
+    """
+
+    name = ""
@@ -0,0 +1,24 @@
+#!/usr/bin/python3
+"""
+The User Module
+"""
+
+# import the BaseModel class from the base_model module
+from models.base_model import BaseModel
+
+
+class User(BaseModel):
+    """
+    User class represents a user of the application.
+
+    Attributes:
+    - email (str): The email address of the user.
+    - password (str): The password of the user.
+    - first_name (str): The first name of the user.
+    - last_name (str): The last name of the user.
+    """
+
+    email = ""
+    password = ""
+    first_name = ""
+    last_name = ""
@@ -0,0 +1,542 @@
+#!/usr/bin/python3
+"""
+The Console Tests
+
+This file contains unittests for the console module.
+
+To run the test, use the following command:
+    python3 -m unittest tests.test_console
+
+To run the entire test suite, use the following command:
+    python3 -m unittest discover tests
+"""
+
+# import the unittest module for creating and running test cases
+import unittest
+
+# import the pycodestyle module for checking code style compliance
+import pycodestyle
+
+# import the io, json, os, shutil and tempfile modules for capturing
+# the output and using a temporary storage file
+import io
+import json
+import os
+import shutil
+import tempfile
+
+# import the subprocess and sys modules for running the console script
+import subprocess
+import sys
+
+# import the patch helper for intercepting STDOUT
+from unittest.mock import patch
+
+# import the HBNBCommand class from the console module
+from console import HBNBCommand
+
+# import the storage instance from the models package
+from models import storage
+
+# import the metrics shown by the stats command
+from models.engine.metrics import metrics
+
+
+class TestPycodestyle(unittest.TestCase):
+    """
+    Test Pycodestyle compliance for the project.
+    """
+
+    def test_pycodestyle(self):
+        """Check if the code follows Pycodestyle conventions."""
+
+        style_checker = pycodestyle.StyleGuide()
+        result = style_checker.check_files(
+            ["console.py", "tests/test_console.py"]
+        )
+        self.assertEqual(
+            result.total_errors, 0, "Found code style errors (and warning)."
+        )
+
+
+class ConsoleTestCase(unittest.TestCase):
+    """
+    Base class for tests running the console on an empty storage.
+    """
+
+    def setUp(self):
+        """Point the storage at a temporary file and empty it."""
+
+        self.tmp_dir = tempfile.mkdtemp()
+        self.saved_path = storage.file_path
+        self.saved_objects = dict(storage.all())
+        storage.file_path = os.path.join(self.tmp_dir, "file.json")
+        self.clear()
+        storage.save()
+
+    def tearDown(self):
+        """Restore the storage configuration and objects."""
+
+        self.clear()
+        storage.file_path = self.saved_path
+        for obj in self.saved_objects.values():
+            storage.new(obj)
+        shutil.rmtree(self.tmp_dir)
+
+    def clear(self):
+        """Remove every object from the storage."""
+
+        for obj in list(storage.all().values()):
+            storage.delete(obj)
+
+    def run_command(self, line):
+        """Run one console command and return its output."""
+
+        with patch("sys.stdout", new_callable=io.StringIO) as output:
+            HBNBCommand().onecmd(line)
+        return output.getvalue()
+
+    def saved(self):
+        """Return the content of the storage file."""
+
+        with open(storage.file_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+
+class TestBatchMode(ConsoleTestCase):
+    """
+    Test cases for the batch mode of the console.
+    """
+
+    def run_batch(self, lines, flush_every=1000):
+        """Run lines in batch mode and return its output and report."""
+
+        report = io.StringIO()
+        with patch("sys.stdout", new_callable=io.StringIO) as output:
+            HBNBCommand().run_batch(lines, flush_every, report)
+        return output.getvalue(), report.getvalue()
+
+    def test_commands_are_executed(self):
+        """Test that every line is executed as a command."""
+
+        output, report = self.run_batch(
+            ["create User\n", "create Place\n", "\n", "create Nope\n"]
+        )
+        lines = output.splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[2], "** class doesn't exist **")
+        self.assertEqual(len(self.saved()), 2)
+        self.assertIn("** batch: 4 commands in", report)
+        self.assertIn("** create: 3 calls,", report)
+
+    def test_dot_commands_are_reported_by_name(self):
+        """Test that dot forms add up under their command name."""
+
+        ids = [self.run_command("create User").strip() for _ in range(3)]
+        _, report = self.run_batch(
+            [f'User.update("{user_id}", "age", 36)' for user_id in ids]
+            + [f"update User {ids[0]} age 37"]
+        )
+        lines = report.splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith("** update: 4 calls,"))
+
+    def test_saves_once_per_chunk(self):
+        """Test that the storage is flushed once every flush_every lines."""
+
+        with patch.object(type(storage), "flush") as flush:
+            self.run_batch(["create User"] * 10, flush_every=4)
+        self.assertEqual(flush.call_count, 3)
+
+    def test_quit_stops_the_batch(self):
+        """Test that quit ends the batch and saves what was done."""
+
+        output, _ = self.run_batch(["create User", "quit", "create User"])
+        self.assertEqual(len(output.splitlines()), 1)
+        self.assertEqual(len(self.saved()), 1)
+
+    def test_missing_file(self):
+        """Test that a missing batch file is reported as a usage error."""
+
+        console = os.path.abspath("console.py")
+        result = subprocess.run(
+            [sys.executable, console, "--batch", "missing.txt"],
+            cwd=self.tmp_dir,
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(result.returncode, 2)
+        self.assertIn("cannot read missing.txt: No such file", result.stderr)
+        self.assertNotIn("Traceback", result.stderr)
+
+
+class TestImportExport(ConsoleTestCase):
+    """
+    Test cases for the import and export commands of the console.
+    """
+
+    def write_lines(self, name, lines):
+        """Write lines to a file of the temporary directory."""
+
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+        return path
+
+    def test_export_then_import(self):
+        """Test that exported instances can be imported back."""
+
+        ids = [self.run_command("create User").strip() for _ in range(3)]
+        self.run_command("create Place")
+        path = os.path.join(self.tmp_dir, "users.jsonl")
+
+        self.assertEqual(self.run_command(f"export User {path}"), "3\n")
+        with open(path, "r", encoding="utf-8") as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual(sorted(record["id"] for record in records),
+                         sorted(ids))
+
+        self.clear()
+        self.assertEqual(self.run_command(f"import {path}"), "3\n")
+        self.assertEqual(storage.count("User"), 3)
+        self.assertEqual(len(self.saved()), 3)
+
+    def test_import_in_batches(self):
+        """Test that imports are saved once per batch."""
+
+        path = self.write_lines("places.jsonl", [
+            json.dumps({"id": str(number), "__class__": "Place"})
+            for number in range(5)
+        ])
+        with patch.object(type(storage), "flush") as flush:
+            self.assertEqual(storage.import_records(path, batch_size=2), 5)
+        self.assertEqual(flush.call_count, 3)
+
+    def test_invalid_records(self):
+        """Test that invalid records are reported and rolled back."""
+
+        path = self.write_lines("bad.jsonl", [
+            json.dumps({"id": "1", "__class__": "User"}),
+            "",
+            json.dumps({"id": "2", "__class__": "Nope"}),
+        ])
+        self.assertEqual(
+            self.run_command(f"import {path}"),
+            "** invalid record, line 3: unknown class 'Nope' **\n",
+        )
+        self.assertEqual(storage.count(), 0)
+
+    def test_invalid_records_in_batch_mode(self):
+        """Test that a failed import is rolled back inside a batch."""
+
+        path = self.write_lines("bad.jsonl", [
+            json.dumps({"id": "1", "__class__": "User"}),
+            json.dumps({"id": "2", "__class__": "User"}),
+            json.dumps({"id": "3", "__class__": "Nope"}),
+        ])
+        with patch("sys.stdout", new_callable=io.StringIO) as output:
+            HBNBCommand().run_batch(
+                ["create Place", f"import {path}", "User.count()"],
+                report=io.StringIO(),
+            )
+        self.assertEqual(
+            output.getvalue().splitlines()[1:],
+            ["** invalid record, line 3: unknown class 'Nope' **", "0"],
+        )
+        self.assertEqual(
+            [key.split(".")[0] for key in self.saved()], ["Place"]
+        )
+
+    def test_errors(self):
+        """Test the error messages of import and export."""
+
+        missing = os.path.join(self.tmp_dir, "missing.jsonl")
+        self.assertEqual(
+            self.run_command("import"), "** file name missing **\n"
+        )
+        self.assertEqual(
+            self.run_command(f"import {missing}"),
+            "** file doesn't exist **\n",
+        )
+        self.assertEqual(
+            self.run_command("export"), "** class name missing **\n"
+        )
+        self.assertEqual(
+            self.run_command("export Nope x"), "** class doesn't exist **\n"
+        )
+        self.assertEqual(
+            self.run_command("export User"), "** file name missing **\n"
+        )
+
+
+class TestAll(ConsoleTestCase):
+    """
+    Test cases for the all command of the console.
+    """
+
+    def test_output_is_a_list_of_strings(self):
+        """Test that the streamed output reads as the list it replaces."""
+
+        self.assertEqual(self.run_command("all"), "[]\n")
+        self.run_command("create Place")
+        self.run_command("create User")
+        # the instances are listed class by class
+        expected = [
+            str(obj)
+            for name in storage.classes()
+            for obj in storage.all(name).values()
+        ]
+        self.assertEqual(self.run_command("all"), f"{expected}\n")
+        self.assertEqual(
+            self.run_command("all Place"),
+            f"{[str(obj) for obj in storage.all('Place').values()]}\n",
+        )
+
+    def test_output_is_streamed(self):
+        """Test that all builds each instance as it prints it."""
+
+        for _ in range(3):
+            self.run_command("create Place")
+        storage.save()
+        self.clear()
+        storage.lazy = True
+        try:
+            storage.reload()
+            printed = []
+
+            def build(cls, obj_id):
+                # the instances already printed are all the output so far
+                printed.append(sys.stdout.getvalue().count("[Place]"))
+                return get(cls, obj_id)
+
+            get = storage.get
+            with patch.object(storage, "get", side_effect=build), \
+                    patch.object(storage, "all") as all_objects:
+                output = self.run_command("all Place")
+            all_objects.assert_not_called()
+            self.assertEqual(printed, [0, 1, 2])
+            self.assertEqual(output.count("[Place]"), 3)
+        finally:
+            storage.lazy = False
+
+    def test_pages(self):
+        """Test that pages list instances by key, followed by a cursor."""
+
+        for _ in range(3):
+            self.run_command("create Place")
+        self.run_command("create User")
+        places = sorted(
+            storage.all("Place").values(), key=lambda obj: obj.id
+        )
+
+        self.assertEqual(
+            self.run_command("all Place 2"),
+            f"{[str(obj) for obj in places[:2]]}\n"
+            f"next: Place.{places[1].id}\n",
+        )
+        self.assertEqual(
+            self.run_command(f"all Place 2 Place.{places[1].id}"),
+            f"{[str(places[2])]}\n",
+        )
+        output = self.run_command(f"all 10 Place.{places[2].id}")
+        self.assertEqual(
+            output, f"{[str(obj) for obj in storage.all('User').values()]}\n"
+        )
+        self.assertEqual(
+            self.run_command("all Place 0"), "** invalid page size **\n"
+        )
+        self.assertEqual(
+            self.run_command("all Nope 2"), "** class doesn't exist **\n"
+        )
+
+
+class TestStats(ConsoleTestCase):
+    """
+    Test cases for the stats command of the console.
+    """
+
+    def tearDown(self):
+        """Disable the metrics."""
+
+        metrics.enabled = False
+        metrics.reset()
+        super().tearDown()
+
+    def test_stats(self):
+        """Test that commands and saves show up in the stats."""
+
+        self.run_command("stats on")
+        self.run_command("stats reset")
+        self.run_command("create User")
+        output = self.run_command("stats")
+        self.assertIn("storage.save: 1\n", output)
+        self.assertIn("console.create: count=1 ", output)
+
+        user_id = self.run_command("create User").strip()
+        self.run_command(f'User.show("{user_id}")')
+        self.run_command(f"show User {user_id}")
+        self.assertIn("console.show: count=2 ", self.run_command("stats"))
+
+        self.run_command("stats off")
+        self.assertIn("metrics are off", self.run_command("stats"))
+        self.assertEqual(
+            self.run_command("stats bogus"), "** unknown argument **\n"
+        )
+
+
+class TestQuery(ConsoleTestCase):
+    """
+    Test cases for the query command of the console.
+    """
+
+    def test_query(self):
+        """Test that matching instances, fields and counts are printed."""
+
+        places = {}
+        for name, rooms in (("loft", 1), ("house", 4), ("villa", 6)):
+            places[name] = storage.classes()["Place"]()
+            places[name].name = name
+            places[name].number_rooms = rooms
+
+        self.assertEqual(
+            self.run_command(
+                "query Place where number_rooms > 2 order by name select name"
+            ),
+            "{'name': 'house'}\n{'name': 'villa'}\n",
+        )
+        self.assertEqual(
+            self.run_command("query Place where name = loft"),
+            f"{places['loft']}\n",
+        )
+        self.assertEqual(
+            self.run_command("query Place order by number_rooms desc limit 1"),
+            f"{places['villa']}\n",
+        )
+        self.assertEqual(self.run_command("query Place count"), "3\n")
+        self.assertEqual(self.run_command("query User count"), "0\n")
+
+    def test_errors(self):
+        """Test that invalid queries print an error."""
+
+        self.assertEqual(
+            self.run_command("query"), "** class name missing **\n"
+        )
+        self.assertEqual(
+            self.run_command("query Nope"), "** class doesn't exist **\n"
+        )
+        self.assertEqual(
+            self.run_command("query Place limit"),
+            "** expected: limit <number> **\n",
+        )
+
+
+class TestDotCommands(ConsoleTestCase):
+    """
+    Test cases for the <class>.<command>(<arguments>) forms of the console.
+    """
+
+    def setUp(self):
+        """Create a user to run the commands on."""
+
+        super().setUp()
+        self.user_id = self.run_command("create User").strip()
+        self.user = storage.get("User", self.user_id)
+
+    def test_all_count_show(self):
+        """Test that the forms print as their command does."""
+
+        self.run_command("create Place")
+        self.assertEqual(
+            self.run_command("User.all()"), self.run_command("all User")
+        )
+        self.assertEqual(
+            self.run_command('Place.all(1, "Place.0")'),
+            self.run_command("all Place 1 Place.0"),
+        )
+        self.assertEqual(self.run_command("User.count()"), "1\n")
+        self.assertEqual(self.run_command("Review.count()"), "0\n")
+        self.assertEqual(
+            self.run_command(f'User.show("{self.user_id}")'), f"{self.user}\n"
+        )
+        self.assertEqual(
+            self.run_command(f"User.show({self.user_id})"), f"{self.user}\n"
+        )
+
+    def test_destroy(self):
+        """Test that destroy deletes the instance."""
+
+        self.run_command(f'User.destroy("{self.user_id}")')
+        self.assertIsNone(storage.get("User", self.user_id))
+        self.assertNotIn(f"User.{self.user_id}", self.saved())
+
+    def test_update(self):
+        """Test that updates keep the types of their values."""
+
+        self.run_command(
+            f'User.update("{self.user_id}", "first_name", "Ada Lovelace")'
+        )
+        self.run_command(f'User.update("{self.user_id}", "age", 36)')
+        self.assertEqual(self.user.first_name, "Ada Lovelace")
+        self.assertEqual(self.saved()[f"User.{self.user_id}"]["age"], 36)
+
+    def test_update_with_dictionary(self):
+        """Test that every attribute of the dictionary is saved at once."""
+
+        with patch.object(storage, "save", wraps=storage.save) as save:
+            self.run_command(
+                f'User.update("{self.user_id}", '
+                '{"first_name": "Ada", "last_name": "Lovelace", "age": 36})'
+            )
+        save.assert_called_once()
+        record = self.saved()[f"User.{self.user_id}"]
+        self.assertEqual(
+            (record["first_name"], record["last_name"], record["age"]),
+            ("Ada", "Lovelace", 36),
+        )
+
+    def test_update_with_bare_id(self):
+        """Test that a bare id is followed by parsed arguments."""
+
+        self.run_command(
+            f"User.update({self.user_id}, "
+            "{'number_rooms': 3, 'latitude': 1.5})"
+        )
+        record = self.saved()[f"User.{self.user_id}"]
+        self.assertEqual(
+            (record["number_rooms"], record["latitude"]), (3, 1.5)
+        )
+        self.assertNotIn("{'number_rooms': 3", record)
+
+        self.run_command(f'User.update({self.user_id}, "bio", "a, b")')
+        self.run_command(f"User.update({self.user_id}, age, 36)")
+        self.run_command(f"User.update({self.user_id}, city, Paris, TX)")
+        record = self.saved()[f"User.{self.user_id}"]
+        self.assertEqual(
+            (record["bio"], record["age"], record["city"]),
+            ("a, b", 36, "Paris, TX"),
+        )
+
+    def test_errors(self):
+        """Test that invalid forms print an error."""
+
+        for line, output in (
+            ("Nope.all()", "** class doesn't exist **\n"),
+            ("User.update()", "** instance id missing **\n"),
+            ('User.show("missing")', "** no instance found **\n"),
+            ('User.update("missing", {})', "** no instance found **\n"),
+            (
+                f'User.update("{self.user_id}")',
+                "** attribute name missing **\n",
+            ),
+            (
+                f'User.update("{self.user_id}", "age")',
+                "** value missing **\n",
+            ),
+            (
+                f"User.update({self.user_id}, {{'age': 36, 'name'}})",
+                "** invalid arguments **\n",
+            ),
+            ("User.drop()", "*** Unknown syntax: User.drop()\n"),
+        ):
+            with self.subTest(line=line):
+                self.assertEqual(self.run_command(line), output)
@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+"""
+The AsyncFileStorage Tests
+
+This file contains unittests for the async_storage module.
+
+To run the test, use the following command:
+    python3 -m unittest tests.test_engine.test_async_storage
+
+To run the entire test suite, use the following command:
+    python3 -m unittest discover tests
+"""
+
+# import the unittest module for creating and running test cases
+import unittest
+
+# import the pycodestyle module for checking code style compliance
+import pycodestyle
+
+# import the asyncio, json, threading and time modules for driving
+# concurrent saves
+import asyncio
+import json
+import threading
+import time
+
+# import the patch helper for slowing down and counting flushes
+from unittest.mock import patch
+
+# import the AsyncFileStorage class from the async_storage module
+from models.engine.async_storage import AsyncFileStorage
+
+# import the FileStorage class from the file_storage module
+from models.engine.file_storage import FileStorage
+
+# import the BaseModel class from the models.base_model module
+from models.base_model import BaseModel
+
+# import the temporary storage setup shared with the FileStorage tests
+from tests.test_engine.test_file_storage import StorageTestCase
+
+
+class TestPycodestyle(unittest.TestCase):
+    """
+    Test Pycodestyle compliance for the project.
+    """
+
+    def test_pycodestyle(self):
+        """Check if the code follows Pycodestyle conventions."""
+
+        style_checker = pycodestyle.StyleGuide()
+        result = style_checker.check_files(
+            [
+                "models/engine/async_storage.py",
+                "tests/test_engine/test_async_storage.py",
+            ]
+        )
+        self.assertEqual(
+            result.total_errors, 0, "Found code style errors (and warning)."
+        )
+
+
+class TestAsyncFileStorage(StorageTestCase):
+    """
+    Test cases for the AsyncFileStorage class.
+    """
+
+    def setUp(self):
+        """Wrap the temporary storage."""
+
+        super().setUp()
+        self.async_storage = AsyncFileStorage(self.storage)
+
+    def read_snapshot(self):
+        """Return the keys of the snapshot."""
+
+        with open(self.storage.file_path, "r", encoding="utf-8") as file:
+            return set(json.load(file))
+
+    def test_save_and_reload(self):
+        """Test that awaited saves and reloads reach the file."""
+
+        async def scenario():
+            model = BaseModel()
+            await self.async_storage.save()
+            self.assertEqual(self.read_snapshot(), {f"BaseModel.{model.id}"})
+
+            self.clear()
+            await self.async_storage.reload()
+            return model
+
+        model = asyncio.run(scenario())
+        self.assertIn(f"BaseModel.{model.id}", self.storage.all())
+
+    def test_forwards_storage_methods(self):
+        """Test that the storage methods are available on the wrapper."""
+
+        model = BaseModel()
+        self.assertIs(self.async_storage.get(BaseModel, model.id), model)
+        self.assertEqual(self.async_storage.count(), 1)
+
+    def test_concurrent_saves_are_coalesced(self):
+        """Test that a burst of saves shares at most two flushes."""
+
+        flush = FileStorage.flush
+        threads = set()
+
+        def slow_flush(storage):
+            threads.add(threading.get_ident())
+            time.sleep(0.05)
+            flush(storage)
+
+        async def scenario():
+            models = []
+            saves = []
+            for _ in range(10):
+                models.append(BaseModel())
+                saves.append(asyncio.ensure_future(self.async_storage.save()))
+                await asyncio.sleep(0)
+            await asyncio.gather(*saves)
+            return models
+
+        with patch.object(
+            FileStorage, "flush", autospec=True, side_effect=slow_flush
+        ) as flushes:
+            models = asyncio.run(scenario())
+
+        self.assertLessEqual(flushes.call_count, 2)
+        self.assertNotIn(threading.get_ident(), threads)
+        self.assertEqual(
+            self.read_snapshot(),
+            {f"BaseModel.{model.id}" for model in models},
+        )
+
+    def test_failed_flush_is_raised(self):
+        """Test that every waiting save sees a failing flush."""
+
+        async def scenario():
+            results = await asyncio.gather(
+                self.async_storage.save(),
+                self.async_storage.save(),
+                return_exceptions=True,
+            )
+            # the next save starts a new flush
+            await self.async_storage.save()
+            return results
+
+        with patch.object(
+            FileStorage, "flush", side_effect=[OSError("disk full"), None]
+        ):
+            results = asyncio.run(scenario())
+        self.assertEqual([type(result) for result in results], [OSError] * 2)
@@ -0,0 +1,146 @@
+#!/usr/bin/python3
+"""
+The Batching Tests
+
+This file contains unittests for the batching module.
+
+To run the test, use the following command:
+    python3 -m unittest tests.test_engine.test_batching
+
+To run the entire test suite, use the following command:
+    python3 -m unittest discover tests
+"""
+
+# import the unittest module for creating and running test cases
+import unittest
+
+# import the pycodestyle module for checking code style compliance
+import pycodestyle
+
+# import the threading module for batches in several threads
+import threading
+
+# import the batching module from the models.engine package
+from models.engine import batching
+
+
+class TestPycodestyle(unittest.TestCase):
+    """
+    Test Pycodestyle compliance for the project.
+    """
+
+    def test_pycodestyle(self):
+        """Check if the code follows Pycodestyle conventions."""
+
+        style_checker = pycodestyle.StyleGuide()
+        result = style_checker.check_files(
+            ["models/engine/batching.py", "tests/test_engine/test_batching.py"]
+        )
+        self.assertEqual(
+            result.total_errors, 0, "Found code style errors (and warning)."
+        )
+
+
+class Engine(batching.BatchMixin):
+    """
+    A storage engine recording its flushes and rollbacks.
+    """
+
+    def __init__(self):
+        """Initializes the engine with nothing recorded."""
+
+        self.state = batching.BatchState()
+        self.flushes = 0
+        self.rollbacks = []
+
+    def _batch_state(self):
+        """Returns the batch() state of the threads."""
+
+        return self.state
+
+    def _rollback(self, undo):
+        """Records the undo log rolled back."""
+
+        self.rollbacks.append(undo)
+
+    def new(self, key):
+        """Records key in the undo log of the current batch."""
+
+        undo = self.state.undo
+        if undo is not None:
+            undo[key] = None
+
+    def save(self):
+        """Flushes unless a batch defers it."""
+
+        if not self._defer_save():
+            self.flushes += 1
+
+
+class TestBatchMixin(unittest.TestCase):
+    """
+    Test cases for the BatchMixin class.
+    """
+
+    def setUp(self):
+        """Create an engine."""
+
+        self.engine = Engine()
+
+    def test_nested_batches_save_once(self):
+        """Test that only the outermost batch saves, and only if asked."""
+
+        with self.engine.batch():
+            with self.engine.batch():
+                self.engine.save()
+            self.assertEqual(self.engine.flushes, 0)
+        self.assertEqual(self.engine.flushes, 1)
+
+        with self.engine.batch():
+            pass
+        self.assertEqual(self.engine.flushes, 1)
+
+    def test_rollback(self):
+        """Test that a failing batch rolls back its undo log."""
+
+        with self.assertRaises(ValueError):
+            with self.engine.batch():
+                self.engine.new("BaseModel.1")
+                self.engine.save()
+                raise ValueError("failed")
+        self.assertEqual(self.engine.rollbacks, [{"BaseModel.1": None}])
+        self.assertEqual(self.engine.flushes, 0)
+        self.assertIsNone(self.engine.state.undo)
+
+    def test_nested_rollback(self):
+        """Test that a nested batch only rolls back its own changes."""
+
+        with self.engine.batch():
+            self.engine.new("BaseModel.1")
+            with self.assertRaises(ValueError):
+                with self.engine.batch():
+                    self.engine.new("BaseModel.2")
+                    raise ValueError("failed")
+            self.assertEqual(self.engine.rollbacks, [{"BaseModel.2": None}])
+            with self.engine.batch():
+                self.engine.new("BaseModel.3")
+            self.assertEqual(
+                self.engine.state.undo,
+                {"BaseModel.1": None, "BaseModel.3": None},
+            )
+        self.assertEqual(len(self.engine.rollbacks), 1)
+
+    def test_threads(self):
+        """Test that a batch only defers the saves of its own thread."""
+
+        def other_thread():
+            self.engine.new("BaseModel.2")
+            self.engine.save()
+
+        with self.engine.batch():
+            self.engine.new("BaseModel.1")
+            thread = threading.Thread(target=other_thread)
+            thread.start()
+            thread.join()
+            self.assertEqual(self.engine.flushes, 1)
+            self.assertEqual(self.engine.state.undo, {"BaseModel.1": None})
@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+"""
+The Binary Snapshot Tests
+
+This file contains unittests for the binary_snapshot module.
+
+To run the test, use the following command:
+    python3 -m unittest tests.test_engine.test_binary_snapshot
+
+To run the entire test suite, use the following command:
+    python3 -m unittest discover tests
+"""
+
+# import the unittest module for creating and running test cases
+import unittest
+
+# import the pycodestyle module for checking code style compliance
+import pycodestyle
+
+# import the io, json, os, shutil and tempfile modules for building
+# snapshots in memory and on disk
+import io
+import json
+import os
+import shutil
+import tempfile
+
+# import the patch helper for writing smaller chunks
+from unittest.mock import patch
+
+# import the binary_snapshot module from the models.engine package
+from models.engine import binary_snapshot
+
+
+class TestPycodestyle(unittest.TestCase):
+    """
+    Test Pycodestyle compliance for the project.
+    """
+
+    def test_pycodestyle(self):
+        """Check if the code follows Pycodestyle conventions."""
+
+        style_checker = pycodestyle.StyleGuide()
+        result = style_checker.check_files(
+            [
+                "models/engine/binary_snapshot.py",
+                "tests/test_engine/test_binary_snapshot.py",
+            ]
+        )
+        self.assertEqual(
+            result.total_errors, 0, "Found code style errors (and warning)."
+        )
+
+
+class TestBinarySnapshot(unittest.TestCase):
+    """
+    Test cases for the binary snapshot reader and writer.
+    """
+
+    document = {
+        "BaseModel.1": {
+            "id": "1",
+            "created_at": "2024-01-02T03:04:05.000006",
+            "updated_at": "2024-01-02T03:04:05",
+            "names": ["a", "b"],
+            "__class__": "BaseModel",
+        },
+        "Place.2": {
+            "id": "2",
+            "latitude": 1.5,
+            "nested": {"x": None},
+            "__class__": "Place",
+        },
+        "Place.3": {"id": "3", "latitude": -2.0, "__class__": "Place"},
+    }
+
+    def dump(self, document):
+        """Return the binary snapshot of document as a buffered file."""
+
+        file = io.BytesIO()
+        binary_snapshot.dump_records(
+            file,
+            (
+                (key, binary_snapshot.encode_record(record))
+                for key, record in document.items()
+            ),
+        )
+        return io.BufferedReader(io.BytesIO(file.getvalue()))
+
+    def test_round_trip(self):
+        """Test that records are read back with epoch timestamps."""
+
+        file = self.dump(self.document)
+        self.assertTrue(binary_snapshot.is_binary(file))
+        records = dict(binary_snapshot.iter_records(file))
+
+        self.assertEqual(list(records), list(self.document))
+        first = records["BaseModel.1"]
+        self.assertEqual(first["created_at"], 1704164645000006)
+        self.assertEqual(first["updated_at"], 1704164645000000)
+        self.assertEqual(first["names"], ["a", "b"])
+        self.assertEqual(records["Place.2"], self.document["Place.2"])
+
+    def test_chunks(self):
+        """Test that layouts carry over from one chunk to the next."""
+
+        document = {
+            f"Place.{number}": {"id": str(number), "__class__": "Place"}
+            for number in range(10)
+        }
+        with patch.object(binary_snapshot, "CHUNK_RECORDS", 3):
+            file = self.dump(document)
+        self.assertEqual(dict(binary_snapshot.iter_records(file)), document)
+
+    def test_errors(self):
+        """Test that invalid and truncated snapshots are reported."""
+
+        with self.assertRaises(binary_snapshot.SnapshotError):
+            self.dump({"Place.1": {"id": "2", "__class__": "Place"}})
+        with self.assertRaises(binary_snapshot.SnapshotError):
+            self.dump({"Place.1": {"name": "x", "__class__": "Place"}})
+
+        data = self.dump(self.document).read()
+        self.assertFalse(
+            binary_snapshot.is_binary(io.BufferedReader(io.BytesIO(b"{}")))
+        )
+        for size in (0, len(data) // 2, len(data) - 1):
+            with self.subTest(size=size):
+                with self.assertRaises(binary_snapshot.SnapshotError):
+                    list(binary_snapshot.iter_records(io.BytesIO(data[:size])))
+
+    def test_converters(self):
+        """Test that JSON snapshots convert to binary and back."""
+
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        source = os.path.join(tmp_dir, "file.json")
+        binary = os.path.join(tmp_dir, "file.bin")
+        back = os.path.join(tmp_dir, "back.json")
+        with open(source, "w", encoding="utf-8") as file:
+            json.dump(self.document, file)
+
+        self.assertEqual(binary_snapshot.json_to_binary(source, binary), 3)
+        self.assertLess(os.path.getsize(binary), os.path.getsize(source))
+        self.assertEqual(binary_snapshot.binary_to_json(binary, back), 3)
+        with open(back, "r", encoding="utf-8") as file:
+            self.assertEqual(json.load(file), self.document)
+
+        binary_snapshot.binary_to_json(binary, back, timestamp_format="epoch")
+        with open(back, "r", encoding="utf-8") as file:
+            first = json.load(file)["BaseModel.1"]
+        self.assertEqual(first["created_at"], 1704164645000006)
@@ -0,0 +1,97 @@
+#!/usr/bin/python3
+"""
+The Columns Tests
+
+This file contains unittests for the columns module.
+
+To run the test, use the following command:
+    python3 -m unittest tests.test_engine.test_columns
+
+To run the entire test suite, use the following command:
+    python3 -m unittest discover tests
+"""
+
+# import the unittest module for creating and running test cases
+import unittest
+
+# import the pycodestyle module for checking code style compliance
+import pycodestyle
+
+# import the ColumnStore class from the columns module
+from models.engine.columns import ColumnStore
+
+
+class TestPycodestyle(unittest.TestCase):
+    """
+    Test Pycodestyle compliance for the project.
+    """
+
+    def test_pycodestyle(self):
+        """Check if the code follows Pycodestyle conventions."""
+
+        style_checker = pycodestyle.StyleGuide()
+        result = style_checker.check_files(
+            ["models/engine/columns.py", "tests/test_engine/test_columns.py"]
+        )
+        self.assertEqual(
+            result.total_errors, 0, "Found code style errors (and warning)."
+        )
+
+
+class TestColumnStore(unittest.TestCase):
+    """
+    Test cases for the ColumnStore class.
+    """
+
+    def setUp(self):
+        """Create a store holding two records with different fields."""
+
+        self.store = ColumnStore()
+        self.first = {"id": "1", "name": "a", "__class__": "City"}
+        self.second = {"id": "2", "state_id": "s", "__class__": "City"}
+        self.store["City.1"] = self.first
+        self.store["City.2"] = self.second
+
+    def test_records_round_trip(self):
+        """Test that records come back with the same fields."""
+
+        self.assertEqual(len(self.store), 2)
+        self.assertIn("City.1", self.store)
+        self.assertEqual(self.store.get("City.1"), self.first)
+        self.assertEqual(dict(self.store.items()), {
+            "City.1": self.first,
+            "City.2": self.second,
+        })
+        self.assertIsNone(self.store.get("City.3"))
+
+    def test_implied_fields_are_not_stored(self):
+        """Test that the id and class of a record are not stored."""
+
+        self.assertEqual(set(self.store.fields), {"name", "state_id"})
+
+    def test_mismatched_id_is_stored(self):
+        """Test that an id differing from the key is kept as is."""
+
+        record = {"id": "other", "__class__": "City"}
+        self.store["City.3"] = record
+        self.assertEqual(self.store.get("City.3"), record)
+
+    def test_pop_reuses_rows(self):
+        """Test that popped rows are cleared and reused."""
+
+        self.assertEqual(self.store.pop("City.1"), self.first)
+        self.assertNotIn("City.1", self.store)
+        self.assertIsNone(self.store.pop("City.1"))
+
+        third = {"id": "3", "__class__": "City"}
+        self.store["City.3"] = third
+        self.assertEqual(self.store.size, 2)
+        self.assertEqual(self.store.get("City.3"), third)
+
+    def test_replace_record(self):
+        """Test that storing a key again replaces its fields."""
+
+        replacement = {"id": "1", "state_id": "t", "__class__": "City"}
+        self.store["City.1"] = replacement
+        self.assertEqual(self.store.get("City.1"), replacement)
+        self.assertEqual(len(self.store), 2)
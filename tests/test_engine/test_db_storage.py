@@ -0,0 +1,321 @@
+#!/usr/bin/python3
+"""
+The DBStorage Tests
+
+This file contains unittests for the DBStorage module.
+
+To run the test, use the following command:
+    python3 -m unittest tests.test_engine.test_db_storage
+
+To run the entire test suite, use the following command:
+    python3 -m unittest discover tests
+"""
+
+# import the unittest module for creating and running test cases
+import unittest
+
+# import the pycodestyle module for checking code style compliance
+import pycodestyle
+
+# import the os, shutil and tempfile modules for temporary databases
+import os
+import shutil
+import tempfile
+
+# import the patch helper for pointing the models at the database
+from unittest.mock import patch
+
+# import the base_model module, whose storage the tests replace
+from models import base_model
+
+# import the db_storage module, and its DBStorage class
+from models.engine import db_storage
+from models.engine.db_storage import DBStorage
+
+# import the model classes stored in the tests
+from models.base_model import BaseModel
+from models.place import Place
+from models.review import Review
+
+
+class TestPycodestyle(unittest.TestCase):
+    """
+    Test Pycodestyle compliance for the project.
+    """
+
+    def test_pycodestyle(self):
+        """Check if the code follows Pycodestyle conventions."""
+
+        style_checker = pycodestyle.StyleGuide()
+        result = style_checker.check_files(
+            [
+                "models/engine/db_storage.py",
+                "tests/test_engine/test_db_storage.py",
+            ]
+        )
+        self.assertEqual(
+            result.total_errors, 0, "Found code style errors (and warning)."
+        )
+
+
+class TestDBStorage(unittest.TestCase):
+    """
+    Test cases for the DBStorage class.
+    """
+
+    def setUp(self):
+        """Make the models use a storage backed by a new database."""
+
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "file.db")
+        self.storage = DBStorage(self.db_path)
+        self.storage.reload()
+        self.patcher = patch.object(base_model, "storage", self.storage)
+        self.patcher.start()
+
+    def tearDown(self):
+        """Restore the storage of the models."""
+
+        self.patcher.stop()
+        self.storage.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def reopen(self):
+        """Return a second storage opened on the same database."""
+
+        other = DBStorage(self.db_path)
+        other.reload()
+        self.addCleanup(other.close)
+        return other
+
+    def test_interface(self):
+        """Test that DBStorage offers the FileStorage methods."""
+
+        for name in ("all", "new", "save", "reload", "classes", "get",
+                     "count", "find", "delete", "touch", "batch", "stream",
+                     "page"):
+            with self.subTest(name=name):
+                self.assertTrue(callable(getattr(DBStorage, name)))
+
+    def test_save_and_reload(self):
+        """Test that saved instances are found by another storage."""
+
+        place = Place()
+        place.name = "Loft"
+        place.save()
+
+        other = self.reopen()
+        loaded = other.get(Place, place.id)
+        self.assertEqual(loaded.name, "Loft")
+        self.assertEqual(loaded.created_at, place.created_at)
+        self.assertIs(other.get("Place", place.id), loaded)
+        self.assertIsNone(other.get(Place, "missing"))
+
+    def test_all_and_count(self):
+        """Test that all and count see saved and unsaved instances."""
+
+        place = Place()
+        place.save()
+        review = Review()
+
+        self.assertEqual(self.storage.count(), 2)
+        self.assertEqual(self.storage.count(Place), 1)
+        self.assertEqual(
+            set(self.storage.all()),
+            {f"Place.{place.id}", f"Review.{review.id}"},
+        )
+        self.assertEqual(
+            self.storage.all(Review), {f"Review.{review.id}": review}
+        )
+        self.assertEqual(self.reopen().count(), 1)
+
+    def test_update_writes_one_row(self):
+        """Test that an attribute change is saved."""
+
+        place = Place()
+        place.save()
+        place.name = "Updated"
+        place.save()
+        self.assertEqual(self.reopen().get(Place, place.id).name, "Updated")
+
+    def test_delete(self):
+        """Test that deleted instances disappear once saved."""
+
+        place = Place()
+        place.save()
+        self.storage.delete(place)
+        self.assertIsNone(self.storage.get(Place, place.id))
+        self.assertEqual(self.storage.count(), 0)
+        self.storage.save()
+        self.assertEqual(self.reopen().count(), 0)
+
+    def test_find(self):
+        """Test that find filters by attribute, with or without index."""
+
+        self.storage.add_index(Review, "place_id")
+        first = Review()
+        first.place_id = "place-1"
+        first.save()
+        second = Review()
+        second.place_id = "place-2"
+        second.save()
+        unsaved = Review()
+        unsaved.place_id = "place-1"
+
+        self.assertEqual(
+            set(self.storage.find(Review, place_id="place-1")),
+            {f"Review.{first.id}", f"Review.{unsaved.id}"},
+        )
+        self.assertEqual(
+            set(self.reopen().find("Review", place_id="place-1")),
+            {f"Review.{first.id}"},
+        )
+
+    def test_page(self):
+        """Test that pages follow the keys, saved or not."""
+
+        places = [Place() for _ in range(4)]
+        self.storage.save()
+        keys = sorted(f"Place.{place.id}" for place in places)
+        deleted = self.storage.get(Place, keys[1].split(".", 1)[1])
+        self.storage.delete(deleted)
+        unsaved = Place()
+        review = Review()
+        review.save()
+
+        expected = sorted(
+            [keys[0]] + keys[2:] + [f"Place.{unsaved.id}"]
+        )
+        pages = []
+        cursor = None
+        while True:
+            page = self.storage.page(Place, 2, cursor)
+            pages.append([f"Place.{obj.id}" for obj in page])
+            if len(page) < 2:
+                break
+            cursor = pages[-1][-1]
+        self.assertEqual(sum(pages, []), expected)
+        self.assertTrue(all(len(page) <= 2 for page in pages))
+
+        # saving the review also saved the deletion and the new place
+        self.assertEqual(
+            [f"Place.{obj.id}"
+             for obj in self.reopen().page(limit=1, after="Place.")],
+            expected[:1],
+        )
+        self.assertEqual(
+            [obj.id for obj in self.storage.page(after=expected[-1])],
+            [review.id],
+        )
+
+    def test_page_reads_one_page(self):
+        """Test that a page only builds the rows it returns."""
+
+        for _ in range(10):
+            Place()
+        self.storage.save()
+        other = self.reopen()
+        with patch.object(
+            db_storage.json, "loads", wraps=db_storage.json.loads
+        ) as loads:
+            first = other.page(limit=3)
+            second = other.page(limit=3, after=f"Place.{first[-1].id}")
+        self.assertEqual(len(second), 3)
+        self.assertLess(first[-1].id, second[0].id)
+        self.assertEqual(loads.call_count, 6)
+
+    def test_stream(self):
+        """Test that stream yields saved rows, then unsaved changes."""
+
+        saved = Place()
+        saved.save()
+        deleted = Place()
+        deleted.save()
+        unsaved = Place()
+        self.storage.delete(deleted)
+        Review()
+
+        self.assertEqual(
+            {obj.id for obj in self.reopen().stream(Place)},
+            {saved.id, deleted.id},
+        )
+        self.assertEqual(
+            {obj.id for obj in self.storage.stream("Place")},
+            {saved.id, unsaved.id},
+        )
+
+    def test_batch_rollback(self):
+        """Test that a failing batch discards its new instances."""
+
+        kept = BaseModel()
+        kept.save()
+        with self.assertRaises(RuntimeError):
+            with self.storage.batch():
+                BaseModel().save()
+                raise RuntimeError("failed")
+        self.storage.save()
+        self.assertEqual(list(self.reopen().all()), [f"BaseModel.{kept.id}"])
+
+    def test_export_then_import(self):
+        """Test that exported rows can be imported into another database."""
+
+        places = [Place() for _ in range(3)]
+        path = os.path.join(self.tmp_dir, "places.jsonl")
+        self.assertEqual(self.storage.export_records(Place, path), 3)
+
+        other = DBStorage(os.path.join(self.tmp_dir, "other.db"))
+        other.reload()
+        self.addCleanup(other.close)
+        self.assertEqual(other.import_records(path, batch_size=2), 3)
+        self.assertEqual(
+            other.get(Place, places[0].id).created_at, places[0].created_at
+        )
+
+    def test_refresh(self):
+        """Test that refresh picks up the commits of another storage."""
+
+        place = Place()
+        place.name = "before"
+        place.save()
+        other = self.reopen()
+        self.storage.refresh()
+        self.assertFalse(self.storage.refresh())
+        cached = self.storage.get(Place, place.id)
+
+        loaded = other.get(Place, place.id)
+        loaded.name = "after"
+        # the models report their changes to self.storage, not other
+        other.touch(loaded)
+        other.save()
+
+        # the loaded instance is kept until refresh notices the commit
+        self.assertIs(self.storage.get(Place, place.id), cached)
+        self.assertTrue(self.storage.refresh())
+        self.assertEqual(self.storage.get(Place, place.id).name, "after")
+
+    def test_refresh_keeps_instances(self):
+        """Test that held instances stay stored after a refresh."""
+
+        place = Place()
+        place.name = "before"
+        place.save()
+        gone = Place()
+        gone.save()
+        other = self.reopen()
+        self.storage.refresh()
+
+        loaded = other.get(Place, place.id)
+        loaded.number_rooms = 3
+        other.touch(loaded)
+        other.delete(other.get(Place, gone.id))
+        other.save()
+
+        self.assertTrue(self.storage.refresh())
+        self.assertIs(self.storage.get(Place, place.id), place)
+        self.assertEqual(place.number_rooms, 3)
+        self.assertIsNone(self.storage.get(Place, gone.id))
+
+        # changes to the held instance still reach the database
+        place.name = "changed"
+        self.storage.save()
+        self.assertEqual(self.reopen().get(Place, place.id).name, "changed")
@@ -23,15 +23,48 @@ import pycodestyle
 # import the json module for handling JSON data
 import json
 
+# import the os, shutil and tempfile modules for temporary storage files
+import os
+import shutil
+import tempfile
+
+# import the subprocess and sys modules for running other processes
+import subprocess
+import sys
+
+# import the threading module for using the storage from several threads
+import threading
+
+# import the time module for waiting on write-behind flushes
+import time
+
+# import the tracemalloc module for measuring the memory of a save
+import tracemalloc
+
+# import the patch helper for counting serializations
+from unittest.mock import patch
+
 # import the FileStorage class from the file_storage module
 from models.engine.file_storage import FileStorage
 
 # import the file_storage module from the models.engine package
 from models.engine import file_storage
 
+# import the binary_snapshot module for checking binary snapshots
+from models.engine import binary_snapshot
+
+# import the shared metrics recorded by the storage
+from models.engine.metrics import metrics
+
 # import the BaseModel class from the models.base_model module
 from models.base_model import BaseModel
 
+# import the model classes used to exercise the indexes
+from models.city import City
+from models.place import Place
+from models.review import Review
+from models.user import User
+
 
 class TestDocumentation(unittest.TestCase):
     """
@@ -217,3 +250,1269 @@ class TestFileStorage(unittest.TestCase):
         # in the reloaded storage objects
         key = f"{type(model).__name__}.{model.id}"
         self.assertIn(key, self.storage.objects)
+
+
+class StorageTestCase(unittest.TestCase):
+    """
+    Base class for tests running against an empty, temporary storage.
+    """
+
+    def setUp(self):
+        """Point the storage at a temporary file and empty it."""
+
+        self.storage = FileStorage()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.saved_path = self.storage.file_path
+        self.saved_objects = dict(self.storage.all())
+        self.storage.file_path = os.path.join(self.tmp_dir, "file.json")
+        self.clear()
+        # flush the deletions so tests start without pending changes
+        self.storage.save()
+        os.remove(self.storage.file_path)
+
+    def tearDown(self):
+        """Restore the storage configuration and objects."""
+
+        self.clear()
+        self.storage.file_path = self.saved_path
+        for obj in self.saved_objects.values():
+            self.storage.new(obj)
+        shutil.rmtree(self.tmp_dir)
+
+    def clear(self):
+        """Remove every object from the storage."""
+
+        for obj in list(self.storage.all().values()):
+            self.storage.delete(obj)
+
+
+class TestJournal(StorageTestCase):
+    """
+    Test cases for the journal mode of the FileStorage class.
+    """
+
+    def setUp(self):
+        """Enable journal mode on the temporary storage."""
+
+        super().setUp()
+        self.storage.journal = True
+
+    def tearDown(self):
+        """Disable journal mode."""
+
+        self.storage.journal = False
+        self.storage.journal_limit = 1000
+        super().tearDown()
+
+    def read_journal(self):
+        """Return the journal entries as a list of dictionaries."""
+
+        with open(self.storage.journal_path, "r", encoding="utf-8") as file:
+            return [json.loads(line) for line in file]
+
+    def test_save_appends_only_changes(self):
+        """Test that save only appends the changed objects."""
+
+        first = BaseModel()
+        second = BaseModel()
+        self.storage.save()
+        self.assertEqual(len(self.read_journal()), 2)
+        self.assertFalse(os.path.isfile(self.storage.file_path))
+
+        second.name = "changed"
+        second.save()
+        entries = self.read_journal()
+        self.assertEqual(len(entries), 3)
+        self.assertEqual(entries[-1]["op"], "put")
+        self.assertEqual(entries[-1]["key"], f"BaseModel.{second.id}")
+        self.assertEqual(entries[-1]["value"]["name"], "changed")
+        self.assertIsNotNone(first)
+
+    def test_delete_is_journaled(self):
+        """Test that deletions are appended and replayed."""
+
+        model = BaseModel()
+        self.storage.save()
+        self.storage.delete(model)
+        self.storage.save()
+        self.assertEqual(self.read_journal()[-1]["op"], "delete")
+
+        self.clear()
+        self.storage.reload()
+        self.assertNotIn(f"BaseModel.{model.id}", self.storage.all())
+
+    def test_reload_replays_snapshot_and_journal(self):
+        """Test that reload applies the journal on top of the snapshot."""
+
+        model = BaseModel()
+        self.storage.compact()
+        model.name = "journaled"
+        model.save()
+
+        self.clear()
+        self.storage.reload()
+        reloaded = self.storage.all()[f"BaseModel.{model.id}"]
+        self.assertEqual(reloaded.name, "journaled")
+
+    def test_compaction(self):
+        """Test that a long journal is folded into the snapshot."""
+
+        self.storage.journal_limit = 3
+        models = [BaseModel() for _ in range(3)]
+        self.storage.save()
+        self.assertFalse(os.path.isfile(self.storage.journal_path))
+
+        with open(self.storage.file_path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        for model in models:
+            self.assertIn(f"BaseModel.{model.id}", data)
+
+    def test_torn_journal_line_is_ignored(self):
+        """Test that an interrupted append does not break reload."""
+
+        model = BaseModel()
+        self.storage.save()
+        with open(self.storage.journal_path, "a", encoding="utf-8") as file:
+            file.write('{"op": "put", "key": "BaseMo')
+
+        self.clear()
+        self.storage.reload()
+        self.assertIn(f"BaseModel.{model.id}", self.storage.all())
+
+
+class TestIncrementalSave(StorageTestCase):
+    """
+    Test cases for the incremental serialization of the FileStorage class.
+    """
+
+    def test_only_changed_objects_are_encoded(self):
+        """Test that unchanged objects reuse their cached JSON text."""
+
+        models = [BaseModel() for _ in range(5)]
+        self.storage.save()
+
+        models[2].name = "changed"
+        with patch.object(
+            BaseModel, "to_dict", autospec=True, side_effect=BaseModel.to_dict
+        ) as to_dict:
+            self.storage.save()
+        self.assertEqual(to_dict.call_count, 1)
+
+        with open(self.storage.file_path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        self.assertEqual(len(data), 5)
+        self.assertEqual(data[f"BaseModel.{models[2].id}"]["name"], "changed")
+
+    def test_without_fragment_cache(self):
+        """Test that no JSON text is kept when the cache is disabled."""
+
+        models = [BaseModel() for _ in range(3)]
+        self.storage.fragment_cache = False
+        try:
+            self.storage.save()
+            with patch.object(
+                BaseModel, "to_dict", autospec=True,
+                side_effect=BaseModel.to_dict,
+            ) as to_dict:
+                self.storage.save()
+        finally:
+            self.storage.fragment_cache = True
+        self.assertEqual(to_dict.call_count, len(models))
+
+        with open(self.storage.file_path, "r", encoding="utf-8") as file:
+            self.assertEqual(len(json.load(file)), len(models))
+
+    def test_without_fragment_cache_memory(self):
+        """Test that a save without the cache holds no text of its own."""
+
+        for _ in range(500):
+            BaseModel().text = "x" * 1000
+        self.storage.fragment_cache = False
+        export_path = os.path.join(self.tmp_dir, "export.jsonl")
+        try:
+            for write in (
+                self.storage.save,
+                lambda: self.storage.export_records(BaseModel, export_path),
+            ):
+                with self.subTest(write=write):
+                    tracemalloc.start()
+                    try:
+                        write()
+                        peak = tracemalloc.get_traced_memory()[1]
+                    finally:
+                        tracemalloc.stop()
+                    # the objects alone hold over 500 kB of text
+                    self.assertLess(peak, 250000)
+        finally:
+            self.storage.fragment_cache = True
+
+    def test_saved_file_matches_json_dump(self):
+        """Test that the spliced output is the same as json.dump."""
+
+        for _ in range(3):
+            BaseModel().save()
+
+        expected = json.dumps(
+            {key: obj.to_dict() for key, obj in self.storage.all().items()}
+        )
+        with open(self.storage.file_path, "r", encoding="utf-8") as file:
+            self.assertEqual(file.read(), expected)
+
+    def test_epoch_timestamps(self):
+        """Test that epoch timestamps are written and read back."""
+
+        model = BaseModel()
+        self.storage.timestamp_format = "epoch"
+        try:
+            self.storage.save()
+        finally:
+            self.storage.timestamp_format = "iso"
+
+        with open(self.storage.file_path, "r", encoding="utf-8") as file:
+            record = json.load(file)[f"BaseModel.{model.id}"]
+        self.assertIsInstance(record["created_at"], int)
+
+        self.clear()
+        self.storage.reload()
+        reloaded = self.storage.get(BaseModel, model.id)
+        self.assertEqual(reloaded.created_at, model.created_at)
+        self.assertEqual(reloaded.updated_at, model.updated_at)
+
+    def test_empty_storage(self):
+        """Test that an empty storage is saved as an empty object."""
+
+        self.storage.save()
+        with open(self.storage.file_path, "r", encoding="utf-8") as file:
+            self.assertEqual(json.load(file), {})
+
+
+class TestIndexes(StorageTestCase):
+    """
+    Test cases for the per-class and secondary indexes of FileStorage.
+    """
+
+    def test_all_by_class(self):
+        """Test that all(cls) only returns the instances of cls."""
+
+        place = Place()
+        review = Review()
+        BaseModel()
+
+        self.assertEqual(
+            self.storage.all(Place), {f"Place.{place.id}": place}
+        )
+        self.assertEqual(
+            self.storage.all("Review"), {f"Review.{review.id}": review}
+        )
+        self.assertEqual(self.storage.all(City), {})
+        self.assertEqual(len(self.storage.all()), 3)
+
+    def test_all_by_class_after_delete(self):
+        """Test that deleted instances leave the class index."""
+
+        place = Place()
+        self.storage.delete(place)
+        self.assertEqual(self.storage.all(Place), {})
+
+    def test_find_without_index(self):
+        """Test that find filters the instances of a class."""
+
+        first = Review()
+        first.place_id = "place-1"
+        second = Review()
+        second.place_id = "place-2"
+
+        self.assertEqual(
+            self.storage.find(Review, place_id="place-1"),
+            {f"Review.{first.id}": first},
+        )
+
+    def test_find_with_index(self):
+        """Test that secondary indexes follow attribute assignments."""
+
+        self.storage.add_index(Review, "place_id")
+        first = Review()
+        first.place_id = "place-1"
+        second = Review()
+        second.place_id = "place-1"
+        self.assertEqual(
+            len(self.storage.find(Review, place_id="place-1")), 2
+        )
+
+        second.place_id = "place-2"
+        self.assertEqual(
+            self.storage.find(Review, place_id="place-1"),
+            {f"Review.{first.id}": first},
+        )
+        self.storage.delete(first)
+        self.assertEqual(self.storage.find(Review, place_id="place-1"), {})
+
+    def test_index_built_from_existing_objects(self):
+        """Test that add_index indexes the instances already stored."""
+
+        city = City()
+        city.state_id = "state-1"
+        self.storage.add_index(City, "state_id")
+        self.storage.add_index(City, "name")
+        self.assertEqual(
+            self.storage.find(City, state_id="state-1", name=""),
+            {f"City.{city.id}": city},
+        )
+
+
+class TestLazyReload(StorageTestCase):
+    """
+    Test cases for the lazy reload mode of the FileStorage class.
+    """
+
+    def setUp(self):
+        """Save a few objects, then reload them lazily."""
+
+        super().setUp()
+        self.places = [Place() for _ in range(3)]
+        self.review = Review()
+        self.storage.save()
+        self.clear()
+        self.storage.lazy = True
+        self.storage.reload()
+
+    def tearDown(self):
+        """Disable lazy mode."""
+
+        self.storage.lazy = False
+        super().tearDown()
+
+    def test_reload_builds_nothing(self):
+        """Test that reload keeps the records without building them."""
+
+        self.assertEqual(self.storage.objects, {})
+        self.assertEqual(self.storage.count(), 4)
+        self.assertEqual(self.storage.count(Place), 3)
+
+    def test_get_builds_one_instance(self):
+        """Test that get only builds the requested instance."""
+
+        place = self.storage.get(Place, self.places[0].id)
+        self.assertIsInstance(place, Place)
+        self.assertEqual(place.created_at, self.places[0].created_at)
+        self.assertEqual(len(self.storage.objects), 1)
+        self.assertIs(self.storage.get("Place", place.id), place)
+        self.assertIsNone(self.storage.get(Place, "missing"))
+
+    def test_all_by_class_builds_the_class(self):
+        """Test that all(cls) only builds the instances of cls."""
+
+        self.assertEqual(len(self.storage.all(Review)), 1)
+        self.assertEqual(len(self.storage.objects), 1)
+        self.assertEqual(len(self.storage.all()), 4)
+
+    def test_page_builds_the_page(self):
+        """Test that page only builds the instances it returns."""
+
+        keys = sorted(
+            f"Place.{place.id}" for place in self.places
+        ) + [f"Review.{self.review.id}"]
+
+        page = self.storage.page(limit=2)
+        self.assertEqual(
+            [f"{type(obj).__name__}.{obj.id}" for obj in page], keys[:2]
+        )
+        self.assertEqual(len(self.storage.objects), 2)
+
+        page = self.storage.page(Place, 5, keys[1])
+        self.assertEqual([f"Place.{obj.id}" for obj in page], keys[2:3])
+        self.assertEqual(len(self.storage.objects), 3)
+
+        self.storage.delete(page[0])
+        page = self.storage.page(after=keys[0])
+        self.assertEqual(
+            [f"{type(obj).__name__}.{obj.id}" for obj in page],
+            [keys[1], keys[3]],
+        )
+
+    def test_stream_builds_as_it_goes(self):
+        """Test that stream builds each instance when it is reached."""
+
+        stream = self.storage.stream(Place)
+        first = next(stream)
+        self.assertIsInstance(first, Place)
+        self.assertEqual(len(self.storage.objects), 1)
+        self.assertEqual(len(list(stream)), 2)
+        self.assertEqual(len(self.storage.objects), 3)
+        self.assertEqual(
+            [obj.id for obj in self.storage.stream("Review")],
+            [self.review.id],
+        )
+
+    def test_memory(self):
+        """Test that pending records take less memory than instances."""
+
+        for _ in range(500):
+            Place().name = "Loft"
+        self.storage.save()
+
+        held = {}
+        for lazy in (False, True):
+            self.clear()
+            self.storage.lazy = lazy
+            tracemalloc.start()
+            try:
+                self.storage.reload()
+                held[lazy] = tracemalloc.get_traced_memory()[0]
+            finally:
+                tracemalloc.stop()
+        self.assertEqual(self.storage.count(Place), 503)
+        self.assertLess(held[True], held[False] * 0.75)
+
+    def test_dictionary_records(self):
+        """Test that dictionary records behave like columnar records."""
+
+        self.assertTrue(self.storage.columnar)
+        self.clear()
+        self.storage.columnar = False
+        try:
+            self.storage.reload()
+        finally:
+            self.storage.columnar = True
+
+        self.assertEqual(self.storage.count(Place), 3)
+        place = self.storage.get(Place, self.places[1].id)
+        self.assertEqual(place.to_dict(), self.places[1].to_dict())
+
+        self.storage.save()
+        with open(self.storage.file_path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        self.assertEqual(
+            data[f"Review.{self.review.id}"], self.review.to_dict()
+        )
+
+    def test_save_keeps_pending_records(self):
+        """Test that records never built are written back."""
+
+        place = self.storage.get(Place, self.places[0].id)
+        place.name = "changed"
+        self.storage.save()
+
+        with open(self.storage.file_path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        self.assertEqual(len(data), 4)
+        self.assertEqual(data[f"Place.{place.id}"]["name"], "changed")
+        self.assertIn(f"Review.{self.review.id}", data)
+
+
+class TestDurability(StorageTestCase):
+    """
+    Test cases for the atomic saves and durability levels of FileStorage.
+    """
+
+    def tearDown(self):
+        """Restore the default durability level."""
+
+        self.storage.durability = "none"
+        self.storage.commit_interval = 1.0
+        super().tearDown()
+
+    def test_interrupted_save_keeps_previous_snapshot(self):
+        """Test that a failing save leaves the snapshot untouched."""
+
+        model = BaseModel()
+        self.storage.save()
+        with open(self.storage.file_path, "r", encoding="utf-8") as file:
+            before = file.read()
+
+        def interrupted(file, items):
+            file.write('{"partial": ')
+            raise KeyboardInterrupt
+
+        BaseModel()
+        with patch.object(file_storage.json_stream, "dump_items", interrupted):
+            with self.assertRaises(KeyboardInterrupt):
+                self.storage.save()
+
+        with open(self.storage.file_path, "r", encoding="utf-8") as file:
+            self.assertEqual(file.read(), before)
+        self.assertEqual(os.listdir(self.tmp_dir), ["file.json"])
+        self.assertIn(f"BaseModel.{model.id}", json.loads(before))
+
+    def test_invalid_durability(self):
+        """Test that unknown durability levels are rejected."""
+
+        with self.assertRaises(ValueError):
+            self.storage.durability = "sometimes"
+
+    def test_fsync_on_every_save(self):
+        """Test that the 'fsync' level syncs every save."""
+
+        self.storage.durability = "fsync"
+        with patch.object(file_storage.os, "fsync") as fsync:
+            BaseModel().save()
+            BaseModel().save()
+        # each save syncs the snapshot and its directory
+        self.assertEqual(fsync.call_count, 4)
+
+    def test_no_fsync(self):
+        """Test that the 'none' level never syncs."""
+
+        with patch.object(file_storage.os, "fsync") as fsync:
+            BaseModel().save()
+        fsync.assert_not_called()
+
+    def test_group_commit(self):
+        """Test that the 'group' level shares one fsync per interval."""
+
+        self.storage.durability = "group"
+        self.storage.commit_interval = 3600
+        self.storage.journal = True
+        try:
+            with patch.object(file_storage.os, "fsync") as fsync:
+                for _ in range(3):
+                    BaseModel().save()
+        finally:
+            self.storage.journal = False
+        self.assertLessEqual(fsync.call_count, 1)
+
+    def test_group_commit_syncs_trailing_save(self):
+        """Test that a save skipped by 'group' is synced after the
+        interval, even if no other save follows it."""
+
+        self.storage.durability = "group"
+        self.storage.commit_interval = 0
+        BaseModel().save()
+        self.storage.commit_interval = 0.2
+
+        synced = threading.Event()
+        with patch.object(
+            file_storage.os, "fsync", side_effect=lambda fd: synced.set()
+        ) as fsync:
+            # the previous save synced, so this one is deferred
+            BaseModel().save()
+            self.assertEqual(fsync.call_count, 0)
+            self.assertTrue(synced.wait(5))
+
+
+class TestBatch(StorageTestCase):
+    """
+    Test cases for the batches and write-behind flushes of FileStorage.
+    """
+
+    def tearDown(self):
+        """Disable write-behind flushes."""
+
+        self.storage.write_behind = 0
+        super().tearDown()
+
+    def test_batch_flushes_once(self):
+        """Test that saves inside a batch result in a single flush."""
+
+        with patch.object(FileStorage, "flush") as flush:
+            with self.storage.batch():
+                for _ in range(5):
+                    BaseModel().save()
+                flush.assert_not_called()
+        flush.assert_called_once_with()
+
+    def test_batch_writes_on_exit(self):
+        """Test that the objects of a batch are saved when it exits."""
+
+        with self.storage.batch():
+            models = [BaseModel() for _ in range(3)]
+            for model in models:
+                model.save()
+            self.assertFalse(os.path.isfile(self.storage.file_path))
+
+        with open(self.storage.file_path, "r", encoding="utf-8") as file:
+            self.assertEqual(len(json.load(file)), 3)
+
+    def test_nested_batches(self):
+        """Test that only the outermost batch flushes."""
+
+        with patch.object(FileStorage, "flush") as flush:
+            with self.storage.batch():
+                with self.storage.batch():
+                    BaseModel().save()
+                flush.assert_not_called()
+        flush.assert_called_once_with()
+
+    def test_batch_rollback(self):
+        """Test that a failing batch restores the stored objects."""
+
+        kept = BaseModel()
+        self.storage.save()
+
+        with self.assertRaises(ValueError):
+            with self.storage.batch():
+                BaseModel().save()
+                self.storage.delete(kept)
+                raise ValueError("import failed")
+
+        self.assertEqual(
+            self.storage.all(), {f"BaseModel.{kept.id}": kept}
+        )
+        self.storage.save()
+        with open(self.storage.file_path, "r", encoding="utf-8") as file:
+            self.assertEqual(list(json.load(file)), [f"BaseModel.{kept.id}"])
+
+    def test_batch_of_another_thread(self):
+        """Test that a batch neither defers nor rolls back the saves of
+        other threads."""
+
+        opened = threading.Event()
+        saved = threading.Event()
+        errors = []
+
+        def batch():
+            try:
+                with self.storage.batch():
+                    BaseModel().save()
+                    opened.set()
+                    saved.wait(5)
+                    raise ValueError("batch failed")
+            except ValueError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=batch)
+        thread.start()
+        self.assertTrue(opened.wait(5))
+        other = BaseModel()
+        other.save()
+        with open(self.storage.file_path, "r", encoding="utf-8") as file:
+            self.assertIn(f"BaseModel.{other.id}", json.load(file))
+        saved.set()
+        thread.join()
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(
+            self.storage.all(), {f"BaseModel.{other.id}": other}
+        )
+        self.storage.save()
+        with open(self.storage.file_path, "r", encoding="utf-8") as file:
+            self.assertEqual(list(json.load(file)), [f"BaseModel.{other.id}"])
+
+    def test_write_behind(self):
+        """Test that write-behind saves are coalesced into one flush."""
+
+        self.storage.write_behind = 50
+        with patch.object(FileStorage, "flush") as flush:
+            for _ in range(5):
+                BaseModel().save()
+            flush.assert_not_called()
+            time.sleep(0.5)
+        flush.assert_called_once_with()
+
+    def test_disabling_write_behind_flushes(self):
+        """Test that turning write-behind off flushes pending writes."""
+
+        self.storage.write_behind = 60000
+        model = BaseModel()
+        model.save()
+        self.storage.write_behind = 0
+
+        with open(self.storage.file_path, "r", encoding="utf-8") as file:
+            self.assertIn(f"BaseModel.{model.id}", json.load(file))
+
+
+class TestSharding(StorageTestCase):
+    """
+    Test cases for the sharded layout of the FileStorage class.
+    """
+
+    def setUp(self):
+        """Split the temporary storage into four shards per class."""
+
+        super().setUp()
+        self.storage.shards = 4
+
+    def tearDown(self):
+        """Go back to a single file."""
+
+        self.storage.lazy = False
+        self.storage.shards = 0
+        super().tearDown()
+
+    def read_shards(self):
+        """Return the shard files as {file name: entries}."""
+
+        shards = {}
+        for name in os.listdir(self.storage.shard_dir):
+            path = os.path.join(self.storage.shard_dir, name)
+            with open(path, "r", encoding="utf-8") as file:
+                shards[name] = json.load(file)
+        return shards
+
+    def test_one_file_per_class_and_shard(self):
+        """Test that every object is written to its class's shards."""
+
+        places = [Place() for _ in range(20)]
+        review = Review()
+        self.storage.save()
+
+        self.assertFalse(os.path.isfile(self.storage.file_path))
+        shards = self.read_shards()
+        for name, entries in shards.items():
+            class_name, shard, extension = name.split(".")
+            self.assertIn(class_name, ("Place", "Review"))
+            self.assertIn(int(shard), range(4))
+            for key in entries:
+                self.assertTrue(key.startswith(f"{class_name}."))
+        keys = {key for entries in shards.values() for key in entries}
+        expected = {f"Place.{place.id}" for place in places}
+        expected.add(f"Review.{review.id}")
+        self.assertEqual(keys, expected)
+
+    def test_single_shard(self):
+        """Test that one shard per class writes <Class>.json files."""
+
+        self.storage.shards = 1
+        Place().save()
+        Review().save()
+        self.assertEqual(
+            sorted(self.read_shards()), ["Place.json", "Review.json"]
+        )
+
+    def test_save_rewrites_only_dirty_shards(self):
+        """Test that unchanged shard files are left alone."""
+
+        places = [Place() for _ in range(20)]
+        Review()
+        self.storage.save()
+        before = {
+            name: os.stat(os.path.join(self.storage.shard_dir, name)).st_ino
+            for name in os.listdir(self.storage.shard_dir)
+        }
+
+        places[0].name = "changed"
+        self.storage.save()
+        rewritten = [
+            name
+            for name, inode in before.items()
+            if os.stat(os.path.join(self.storage.shard_dir, name)).st_ino
+            != inode
+        ]
+        self.assertEqual(len(rewritten), 1)
+        self.assertEqual(
+            self.read_shards()[rewritten[0]][f"Place.{places[0].id}"]["name"],
+            "changed",
+        )
+
+    def test_emptied_shard_is_removed(self):
+        """Test that deleting every object of a shard removes its file."""
+
+        review = Review()
+        self.storage.save()
+        self.storage.delete(review)
+        self.storage.save()
+        self.assertEqual(self.read_shards(), {})
+
+    def test_reload(self):
+        """Test that shard files are read back."""
+
+        place = Place()
+        place.name = "sharded"
+        self.storage.save()
+        self.clear()
+        self.storage.reload()
+        self.assertEqual(self.storage.get(Place, place.id).name, "sharded")
+
+    def test_lazy_reload_reads_on_demand(self):
+        """Test that lazy reload reads a shard file on first use."""
+
+        places = [Place() for _ in range(20)]
+        Review()
+        self.storage.save()
+        self.clear()
+        self.storage.lazy = True
+        self.storage.reload()
+
+        iter_items = file_storage.json_stream.iter_items
+        with patch.object(
+            file_storage.json_stream, "iter_items", wraps=iter_items
+        ) as reads:
+            place = self.storage.get(Place, places[0].id)
+            self.assertEqual(place.id, places[0].id)
+            self.assertEqual(reads.call_count, 1)
+            self.assertEqual(self.storage.count(Review), 1)
+            self.assertEqual(self.storage.count(), 21)
+
+    def test_lazy_save_keeps_unread_shards(self):
+        """Test that saving before every shard is read loses nothing."""
+
+        places = [Place() for _ in range(20)]
+        self.storage.save()
+        self.clear()
+        self.storage.lazy = True
+        self.storage.reload()
+
+        deleted = self.storage.get(Place, places[1].id)
+        self.storage.delete(deleted)
+        added = Place()
+        added.save()
+
+        self.storage.lazy = False
+        self.clear()
+        self.storage.reload()
+        keys = set(self.storage.all(Place))
+        expected = {f"Place.{place.id}" for place in places[2:]}
+        expected |= {f"Place.{places[0].id}", f"Place.{added.id}"}
+        self.assertEqual(keys, expected)
+
+    def test_switching_layouts(self):
+        """Test that a single file and shards are converted both ways."""
+
+        self.storage.shards = 0
+        place = Place()
+        self.storage.save()
+
+        self.storage.shards = 4
+        self.clear()
+        self.storage.reload()
+        self.storage.save()
+        self.assertFalse(os.path.isfile(self.storage.file_path))
+        self.assertEqual(len(self.read_shards()), 1)
+
+        self.storage.shards = 0
+        self.clear()
+        self.storage.reload()
+        self.storage.save()
+        self.assertFalse(os.path.isdir(self.storage.shard_dir))
+        with open(self.storage.file_path, "r", encoding="utf-8") as file:
+            self.assertIn(f"Place.{place.id}", json.load(file))
+
+    def test_invalid_shards(self):
+        """Test that a negative shard count is rejected."""
+
+        with self.assertRaises(ValueError):
+            self.storage.shards = -1
+
+
+class TestShared(StorageTestCase):
+    """
+    Test cases for the shared mode of the FileStorage class.
+    """
+
+    # saves one Review from another process sharing the storage
+    script = (
+        "import sys\n"
+        "from models import storage\n"
+        "from models.review import Review\n"
+        "storage.file_path = sys.argv[1]\n"
+        "storage.shared = True\n"
+        "storage.refresh()\n"
+        "review = Review()\n"
+        "review.text = 'other process'\n"
+        "review.save()\n"
+        "print(review.id)\n"
+    )
+
+    def setUp(self):
+        """Enable shared mode on the temporary storage."""
+
+        super().setUp()
+        self.storage.shared = True
+
+    def tearDown(self):
+        """Disable shared mode."""
+
+        self.storage.shared = False
+        super().tearDown()
+
+    def save_elsewhere(self, script=None, *args):
+        """Save a Review from another process, or run script with args,
+        and return its output."""
+
+        root = os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__)
+        )))
+        result = subprocess.run(
+            [sys.executable, "-c", script or self.script,
+             self.storage.file_path, *args],
+            cwd=self.tmp_dir,
+            env=dict(os.environ, PYTHONPATH=root),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return result.stdout.strip()
+
+    def read_snapshot(self):
+        """Return the keys of the snapshot."""
+
+        with open(self.storage.file_path, "r", encoding="utf-8") as file:
+            return set(json.load(file))
+
+    def test_save_keeps_other_processes_saves(self):
+        """Test that a save merges the saves of another process."""
+
+        place = Place()
+        self.storage.save()
+        review_id = self.save_elsewhere()
+
+        city = City()
+        self.storage.save()
+        self.assertEqual(
+            self.read_snapshot(),
+            {f"Place.{place.id}", f"Review.{review_id}", f"City.{city.id}"},
+        )
+        self.assertEqual(
+            self.storage.get(Review, review_id).text, "other process"
+        )
+        self.assertIs(self.storage.get(City, city.id), city)
+
+    def test_save_keeps_unsaved_deletion(self):
+        """Test that deletions survive a merge."""
+
+        place = Place()
+        self.storage.save()
+        self.save_elsewhere()
+
+        self.storage.delete(place)
+        self.storage.save()
+        self.assertNotIn(f"Place.{place.id}", self.read_snapshot())
+
+    def test_merge_keeps_instances(self):
+        """Test that instances held across a merge stay stored and take
+        the changes of the other process."""
+
+        user = User()
+        user.first_name = "orig"
+        place = Place()
+        place.name = "orig"
+        self.storage.save()
+        script = (
+            "import sys\n"
+            "from models import storage\n"
+            "storage.file_path = sys.argv[1]\n"
+            "storage.shared = True\n"
+            "storage.refresh()\n"
+            "place = storage.get('Place', sys.argv[2])\n"
+            "place.name = 'renamed elsewhere'\n"
+            "storage.save()\n"
+        )
+        self.save_elsewhere(script, place.id)
+
+        City()
+        self.storage.save()
+        self.assertIs(self.storage.get(User, user.id), user)
+        self.assertIs(self.storage.get(Place, place.id), place)
+        self.assertEqual(place.name, "renamed elsewhere")
+        self.assertIn("renamed elsewhere", str(place))
+
+        user.first_name = "changed"
+        self.storage.save()
+        with open(self.storage.file_path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        self.assertEqual(data[f"User.{user.id}"]["first_name"], "changed")
+        self.assertEqual(
+            data[f"Place.{place.id}"]["name"], "renamed elsewhere"
+        )
+
+    def test_refresh_only_when_changed(self):
+        """Test that refresh reads the store again only after a save."""
+
+        Place().save()
+        self.assertFalse(self.storage.refresh())
+
+        review_id = self.save_elsewhere()
+        self.assertIsNone(self.storage.get(Review, review_id))
+        self.assertTrue(self.storage.refresh())
+        self.assertIsNotNone(self.storage.get(Review, review_id))
+        self.assertFalse(self.storage.refresh())
+
+    def test_refresh_outside_shared_mode(self):
+        """Test that refresh does nothing unless shared mode is on."""
+
+        self.storage.shared = False
+        self.assertFalse(self.storage.refresh())
+        self.assertFalse(os.path.isfile(self.storage.lock_path))
+
+
+class TestMetrics(StorageTestCase):
+    """
+    Test cases for the metrics recorded by the FileStorage class.
+    """
+
+    def setUp(self):
+        """Enable empty metrics."""
+
+        super().setUp()
+        metrics.reset()
+        metrics.enabled = True
+
+    def tearDown(self):
+        """Disable the metrics."""
+
+        metrics.enabled = False
+        metrics.reset()
+        super().tearDown()
+
+    def test_save_and_reload(self):
+        """Test that saves and reloads are counted and timed."""
+
+        first = BaseModel()
+        BaseModel()
+        self.storage.save()
+        first.name = "changed"
+        self.storage.save()
+        self.storage.reload()
+
+        snapshot = metrics.snapshot()
+        counters = snapshot["counters"]
+        size = os.path.getsize(self.storage.file_path)
+        self.assertEqual(counters["storage.new"], 2)
+        self.assertEqual(counters["storage.save"], 2)
+        self.assertEqual(counters["storage.encoded"], 3)
+        self.assertEqual(counters["storage.bytes_read"], size)
+        self.assertGreater(counters["storage.bytes_written"], size)
+
+        histograms = snapshot["histograms"]
+        self.assertEqual(histograms["storage.flush"]["count"], 2)
+        self.assertEqual(histograms["storage.reload"]["count"], 1)
+        self.assertEqual(histograms["storage.encoded_per_flush"]["max"], 2)
+
+    def test_disabled(self):
+        """Test that nothing is recorded while metrics are disabled."""
+
+        metrics.enabled = False
+        BaseModel().save()
+        self.assertEqual(metrics.snapshot()["counters"], {})
+
+
+class TestThreads(StorageTestCase):
+    """
+    Test cases for using the FileStorage class from several threads.
+    """
+
+    def saved_keys(self):
+        """Return the keys saved in the temporary file."""
+
+        with open(self.storage.file_path, "r", encoding="utf-8") as file:
+            return set(json.load(file))
+
+    def test_concurrent_writers(self):
+        """Test that threads creating, deleting and saving lose nothing."""
+
+        errors = []
+
+        def work():
+            try:
+                for number in range(200):
+                    obj = Place()
+                    obj.number = number
+                    if number % 3 == 0:
+                        self.storage.delete(obj)
+                    if number % 10 == 0:
+                        self.storage.save()
+                    len(self.storage.all())
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.storage.save()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(self.storage.count(Place), 4 * 133)
+        self.assertEqual(self.saved_keys(), set(self.storage.all()))
+
+    def test_changes_during_save(self):
+        """Test that other threads are not blocked while a save encodes,
+        and that what they change meanwhile is written by the next save."""
+
+        changed = BaseModel()
+        changed.name = "before"
+        encoding = threading.Event()
+        release = threading.Event()
+        to_dict = BaseModel.to_dict
+
+        def slow_to_dict(obj):
+            encoding.set()
+            release.wait(5)
+            return to_dict(obj)
+
+        with patch.object(BaseModel, "to_dict", slow_to_dict):
+            saver = threading.Thread(target=self.storage.save)
+            saver.start()
+            self.assertTrue(encoding.wait(5))
+            # the save is encoding, and the store is not locked meanwhile
+            added = BaseModel()
+            changed.name = "after"
+            self.assertEqual(self.storage.count(), 2)
+            release.set()
+            saver.join()
+
+        self.assertEqual(self.saved_keys(), {f"BaseModel.{changed.id}"})
+        self.storage.save()
+        with open(self.storage.file_path, "r", encoding="utf-8") as file:
+            saved = json.load(file)
+        self.assertEqual(
+            set(saved), {f"BaseModel.{changed.id}", f"BaseModel.{added.id}"}
+        )
+        self.assertEqual(saved[f"BaseModel.{changed.id}"]["name"], "after")
+
+
+class TestBinarySnapshot(StorageTestCase):
+    """
+    Test cases for the binary snapshot format of the FileStorage class.
+    """
+
+    def setUp(self):
+        """Write the temporary storage in the binary format."""
+
+        super().setUp()
+        self.storage.snapshot_format = "binary"
+
+    def tearDown(self):
+        """Go back to JSON."""
+
+        self.storage.snapshot_format = "json"
+        self.storage.journal = False
+        self.storage.lazy = False
+        self.storage.shards = 0
+        super().tearDown()
+
+    def is_binary(self, path):
+        """Return whether the file at path is a binary snapshot."""
+
+        with open(path, "rb") as file:
+            return binary_snapshot.is_binary(file)
+
+    def test_save_and_reload(self):
+        """Test that instances survive a binary save and reload."""
+
+        place = Place()
+        place.name = "Loft"
+        place.amenity_ids = ["a", "b"]
+        place.save()
+        self.assertTrue(self.is_binary(self.storage.file_path))
+
+        self.clear()
+        self.storage.reload()
+        loaded = self.storage.get(Place, place.id)
+        self.assertEqual(loaded.to_dict(), place.to_dict())
+
+    def test_switching_formats(self):
+        """Test that either format is read, and the next save rewrites
+        the snapshot in the current one."""
+
+        self.storage.snapshot_format = "json"
+        place = Place()
+        self.storage.save()
+
+        self.storage.snapshot_format = "binary"
+        self.clear()
+        self.storage.reload()
+        self.assertIsNotNone(self.storage.get(Place, place.id))
+        self.storage.save()
+        self.assertTrue(self.is_binary(self.storage.file_path))
+
+        self.storage.snapshot_format = "json"
+        self.storage.save()
+        with open(self.storage.file_path, "r", encoding="utf-8") as file:
+            self.assertEqual(
+                json.load(file), {f"Place.{place.id}": place.to_dict()}
+            )
+
+    def test_lazy_shards_and_journal(self):
+        """Test that pending records and the journal work in binary."""
+
+        places = [Place() for _ in range(5)]
+        self.storage.shards = 2
+        self.storage.save()
+        for name in os.listdir(self.storage.shard_dir):
+            path = os.path.join(self.storage.shard_dir, name)
+            self.assertTrue(self.is_binary(path))
+
+        self.storage.lazy = True
+        self.storage.journal = True
+        self.storage.reload()
+        self.assertEqual(self.storage.count(Place), 5)
+        loaded = self.storage.get(Place, places[0].id)
+        loaded.name = "changed"
+        self.storage.save()
+
+        self.clear()
+        self.storage.reload()
+        self.assertEqual(self.storage.get(Place, places[0].id).name, "changed")
+        self.assertEqual(
+            self.storage.get(Place, places[1].id).created_at,
+            places[1].created_at,
+        )
+
+
+class TestRecordFile(StorageTestCase):
+    """
+    Test cases for the record file format of the FileStorage class.
+    """
+
+    def setUp(self):
+        """Save a few places to a record file, then map it."""
+
+        super().setUp()
+        self.storage.snapshot_format = "records"
+        self.places = [Place() for _ in range(5)]
+        self.storage.save()
+        self.storage.reload()
+
+    def tearDown(self):
+        """Go back to JSON."""
+
+        self.storage.snapshot_format = "json"
+        super().tearDown()
+
+    def sizes(self):
+        """Return the sizes of the data file and of its index."""
+
+        return (
+            os.path.getsize(self.storage.file_path),
+            os.path.getsize(self.storage.index_path),
+        )
+
+    def test_reload_maps_the_records(self):
+        """Test that records are only read once looked up."""
+
+        self.assertEqual(self.storage.objects, {})
+        record_file = file_storage.record_file.RecordFile
+        with patch.object(
+            record_file, "read", autospec=True, side_effect=record_file.read
+        ) as read:
+            self.assertEqual(self.storage.count(Place), 5)
+            place = self.storage.get(Place, self.places[2].id)
+            self.assertEqual(read.call_count, 1)
+        self.assertEqual(place.to_dict(), self.places[2].to_dict())
+
+    def test_update_and_destroy_append(self):
+        """Test that saves append the changed records only."""
+
+        sizes = self.sizes()
+        place = self.storage.get(Place, self.places[0].id)
+        place.name = "changed"
+        place.save()
+        self.storage.delete(self.storage.get(Place, self.places[1].id))
+        self.storage.save()
+
+        data_size, index_size = self.sizes()
+        self.assertEqual(
+            data_size - sizes[0], len(json.dumps(place.to_dict())) + 1
+        )
+        self.assertGreater(index_size, sizes[1])
+
+        self.storage.reload()
+        self.assertEqual(self.storage.count(Place), 4)
+        self.assertIsNone(self.storage.get(Place, self.places[1].id))
+        self.assertEqual(
+            self.storage.get(Place, self.places[0].id).name, "changed"
+        )
+
+    def test_switching_to_json(self):
+        """Test that a JSON save replaces the record file."""
+
+        self.storage.snapshot_format = "json"
+        self.storage.save()
+        self.assertFalse(os.path.isfile(self.storage.index_path))
+        with open(self.storage.file_path, "r", encoding="utf-8") as file:
+            self.assertEqual(len(json.load(file)), 5)
+
+        self.storage.reload()
+        self.assertEqual(self.storage.count(Place), 5)
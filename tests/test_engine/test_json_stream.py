@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+"""
+The JSON Stream Tests
+
+This file contains unittests for the json_stream module.
+
+To run the test, use the following command:
+    python3 -m unittest tests.test_engine.test_json_stream
+
+To run the entire test suite, use the following command:
+    python3 -m unittest discover tests
+"""
+
+# import the unittest module for creating and running test cases
+import unittest
+
+# import the pycodestyle module for checking code style compliance
+import pycodestyle
+
+# import the io and json modules for building documents in memory
+import io
+import json
+
+# import the json_stream module from the models.engine package
+from models.engine import json_stream
+
+
+class TestPycodestyle(unittest.TestCase):
+    """
+    Test Pycodestyle compliance for the project.
+    """
+
+    def test_pycodestyle(self):
+        """Check if the code follows Pycodestyle conventions."""
+
+        style_checker = pycodestyle.StyleGuide()
+        result = style_checker.check_files(
+            [
+                "models/engine/json_stream.py",
+                "tests/test_engine/test_json_stream.py",
+            ]
+        )
+        self.assertEqual(
+            result.total_errors, 0, "Found code style errors (and warning)."
+        )
+
+
+class TestJsonStream(unittest.TestCase):
+    """
+    Test cases for the streaming reader and writer.
+    """
+
+    document = {
+        "BaseModel.1": {"id": "1", "number": 12345, "names": ["a", "b"]},
+        "Place.2": {"id": "2", "latitude": 1.5, "nested": {"x": None}},
+        "User.3": {"id": "3", "text": "with \"quotes\", {braces}: [x]"},
+    }
+
+    def read(self, text, chunk_size):
+        """Return the entries decoded from text as a dictionary."""
+
+        return dict(json_stream.iter_items(io.StringIO(text), chunk_size))
+
+    def test_reads_json_dump_output(self):
+        """Test that every chunk size decodes the same entries."""
+
+        text = json.dumps(self.document)
+        for chunk_size in (1, 2, 7, 64, json_stream.CHUNK_SIZE):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(self.read(text, chunk_size), self.document)
+
+    def test_reads_indented_document(self):
+        """Test that whitespace between tokens is accepted."""
+
+        text = json.dumps(self.document, indent=4)
+        self.assertEqual(self.read(text, 5), self.document)
+
+    def test_reads_empty_object(self):
+        """Test that an empty object yields no entries."""
+
+        self.assertEqual(self.read(" { } \n", 1), {})
+
+    def test_number_split_between_chunks(self):
+        """Test that a value cut by a chunk boundary is read whole."""
+
+        self.assertEqual(self.read('{"a": 123456}', 8), {"a": 123456})
+
+    def test_invalid_documents(self):
+        """Test that malformed documents raise JSONDecodeError."""
+
+        for text in ("", "[]", '{"a": 1', '{"a" 1}', '{"a": 1} x', "{1: 2}"):
+            with self.subTest(text=text):
+                with self.assertRaises(json.JSONDecodeError):
+                    self.read(text, 3)
+
+    def test_dump_items(self):
+        """Test that dump_items writes what json.dumps would."""
+
+        file = io.StringIO()
+        json_stream.dump_items(
+            file,
+            ((key, json.dumps(value)) for key, value in self.document.items()),
+        )
+        self.assertEqual(file.getvalue(), json.dumps(self.document))
+
+        file = io.StringIO()
+        json_stream.dump_items(file, [])
+        self.assertEqual(file.getvalue(), "{}")
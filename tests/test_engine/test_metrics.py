@@ -0,0 +1,136 @@
+#!/usr/bin/python3
+"""
+The Metrics Tests
+
+This file contains unittests for the metrics module.
+
+To run the test, use the following command:
+    python3 -m unittest tests.test_engine.test_metrics
+
+To run the entire test suite, use the following command:
+    python3 -m unittest discover tests
+"""
+
+# import the unittest module for creating and running test cases
+import unittest
+
+# import the pycodestyle module for checking code style compliance
+import pycodestyle
+
+# import the json, os and tempfile modules for dumping the metrics
+import json
+import os
+import tempfile
+
+# import the Histogram and Metrics classes from the metrics module
+from models.engine.metrics import Histogram, Metrics
+
+
+class TestPycodestyle(unittest.TestCase):
+    """
+    Test Pycodestyle compliance for the project.
+    """
+
+    def test_pycodestyle(self):
+        """Check if the code follows Pycodestyle conventions."""
+
+        style_checker = pycodestyle.StyleGuide()
+        result = style_checker.check_files(
+            [
+                "models/engine/metrics.py",
+                "tests/test_engine/test_metrics.py",
+            ]
+        )
+        self.assertEqual(
+            result.total_errors, 0, "Found code style errors (and warning)."
+        )
+
+
+class TestHistogram(unittest.TestCase):
+    """
+    Test cases for the Histogram class.
+    """
+
+    def test_summary(self):
+        """Test that the summary describes the recorded values."""
+
+        histogram = Histogram()
+        for value in range(1, 101):
+            histogram.add(value)
+
+        summary = histogram.summary()
+        self.assertEqual(summary["count"], 100)
+        self.assertEqual(summary["min"], 1)
+        self.assertEqual(summary["max"], 100)
+        self.assertEqual(summary["mean"], 50.5)
+        # quantiles are exact within a factor of two
+        self.assertTrue(50 <= summary["p50"] <= 100)
+        self.assertTrue(90 <= summary["p90"] <= 100)
+        self.assertEqual(summary["p99"], 100)
+
+    def test_empty(self):
+        """Test that an empty histogram has no quantiles."""
+
+        summary = Histogram().summary()
+        self.assertEqual(summary["count"], 0)
+        self.assertIsNone(summary["mean"])
+        self.assertIsNone(summary["p50"])
+
+
+class TestMetrics(unittest.TestCase):
+    """
+    Test cases for the Metrics class.
+    """
+
+    def setUp(self):
+        """Create enabled metrics."""
+
+        self.metrics = Metrics()
+        self.metrics.enabled = True
+
+    def test_disabled_records_nothing(self):
+        """Test that nothing is recorded while disabled."""
+
+        self.metrics.enabled = False
+        self.metrics.increment("calls")
+        self.metrics.observe("seconds", 1.0)
+        with self.metrics.timer("block"):
+            pass
+        self.assertEqual(
+            self.metrics.snapshot(), {"counters": {}, "histograms": {}}
+        )
+
+    def test_counters_and_histograms(self):
+        """Test that events end up in the snapshot."""
+
+        self.metrics.increment("calls")
+        self.metrics.increment("calls", 2)
+        with self.metrics.timer("block"):
+            pass
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(snapshot["counters"], {"calls": 3})
+        self.assertEqual(snapshot["histograms"]["block"]["count"], 1)
+
+        self.metrics.reset()
+        self.assertEqual(self.metrics.snapshot()["counters"], {})
+
+    def test_listeners(self):
+        """Test that listeners see every event."""
+
+        events = []
+        self.metrics.subscribe(lambda *event: events.append(event))
+        self.metrics.increment("calls")
+        self.metrics.observe("size", 5)
+        self.assertEqual(
+            events, [("counter", "calls", 1), ("histogram", "size", 5)]
+        )
+
+    def test_dump(self):
+        """Test that the snapshot is dumped as JSON."""
+
+        self.metrics.increment("calls")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "metrics.json")
+            self.metrics.dump(path)
+            with open(path, "r", encoding="utf-8") as file:
+                self.assertEqual(json.load(file)["counters"], {"calls": 1})
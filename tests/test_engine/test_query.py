@@ -0,0 +1,230 @@
+#!/usr/bin/python3
+"""
+The Query Tests
+
+This file contains unittests for the query module.
+
+To run the test, use the following command:
+    python3 -m unittest tests.test_engine.test_query
+
+To run the entire test suite, use the following command:
+    python3 -m unittest discover tests
+"""
+
+# import the unittest module for creating and running test cases
+import unittest
+
+# import the pycodestyle module for checking code style compliance
+import pycodestyle
+
+# import the patch helper for counting the instances looked at
+from unittest.mock import patch
+
+# import the query module from the models.engine package
+from models.engine import query
+
+# import the model classes queried in the tests
+from models.place import Place
+from models.review import Review
+
+# import the temporary storage setup shared with the FileStorage tests
+from tests.test_engine.test_file_storage import StorageTestCase
+
+
+class TestPycodestyle(unittest.TestCase):
+    """
+    Test Pycodestyle compliance for the project.
+    """
+
+    def test_pycodestyle(self):
+        """Check if the code follows Pycodestyle conventions."""
+
+        style_checker = pycodestyle.StyleGuide()
+        result = style_checker.check_files(
+            ["models/engine/query.py", "tests/test_engine/test_query.py"]
+        )
+        self.assertEqual(
+            result.total_errors, 0, "Found code style errors (and warning)."
+        )
+
+
+class TestParse(unittest.TestCase):
+    """
+    Test cases for parsing queries.
+    """
+
+    classes = {"Place": Place, "Review": Review}
+
+    def test_clauses(self):
+        """Test that every clause is parsed."""
+
+        parsed = query.parse(
+            'Place where name = "Big Loft" AND rooms >= 2 '
+            "order by price DESC offset 5 limit 10 select id,name",
+            self.classes,
+        )
+        self.assertEqual(parsed.class_name, "Place")
+        self.assertEqual(
+            [(c.attribute, c.op, c.value) for c in parsed.conditions],
+            [("name", "=", "Big Loft"), ("rooms", ">=", 2)],
+        )
+        self.assertEqual((parsed.order_by, parsed.descending), ("price", True))
+        self.assertEqual((parsed.offset, parsed.limit), (5, 10))
+        self.assertEqual(parsed.fields, ["id", "name"])
+        self.assertFalse(parsed.count)
+        self.assertTrue(query.parse("Review count", self.classes).count)
+
+    def test_errors(self):
+        """Test that invalid queries are reported."""
+
+        for text, message in (
+            ("", "class name missing"),
+            ("User", "class doesn't exist"),
+            ("Place where name", "expected: where"),
+            ("Place where name ~ x", "unknown operator"),
+            ("Place order name", "expected: order by"),
+            ("Place limit ten", "expected: limit"),
+            ("Place select", "expected: select"),
+            ("Place sorted", "unexpected 'sorted'"),
+            ("Place where name = 'x", "invalid query"),
+        ):
+            with self.subTest(text=text):
+                with self.assertRaisesRegex(ValueError, message):
+                    query.parse(text, self.classes)
+
+
+class TestRun(StorageTestCase):
+    """
+    Test cases for running queries against a storage.
+    """
+
+    def setUp(self):
+        """Store ten places with numbered names and prices."""
+
+        super().setUp()
+        self.places = []
+        for number in range(10):
+            place = Place()
+            place.name = f"place {number}"
+            place.price = number * 10
+            place.city_id = "even" if number % 2 == 0 else "odd"
+            self.places.append(place)
+
+    def run_query(self, text):
+        """Return the instances matching the query text."""
+
+        parsed = query.parse(text, self.storage.classes())
+        return list(parsed.run(self.storage))
+
+    def test_where(self):
+        """Test that conditions compare strings, numbers and dates."""
+
+        self.assertEqual(
+            self.run_query("Place where city_id = odd and price > 50"),
+            [self.places[7], self.places[9]],
+        )
+        self.assertEqual(
+            self.run_query("Place where name contains 3"), [self.places[3]]
+        )
+        self.assertEqual(
+            self.run_query("Place where price != 0 and price <= 10"),
+            [self.places[1]],
+        )
+        self.assertEqual(
+            self.run_query(
+                "Place where created_at >= "
+                f"{self.places[5].created_at.isoformat()} and price < 70"
+            ),
+            self.places[5:7],
+        )
+        self.assertEqual(self.run_query("Place where missing = 1"), [])
+        self.assertEqual(self.run_query("Review"), [])
+
+    def test_order_offset_limit(self):
+        """Test that results are ordered, then sliced."""
+
+        self.assertEqual(
+            self.run_query("Place where city_id = even order by price desc"),
+            [self.places[n] for n in (8, 6, 4, 2, 0)],
+        )
+        self.assertEqual(
+            self.run_query("Place order by price desc offset 1 limit 3"),
+            [self.places[n] for n in (8, 7, 6)],
+        )
+        self.assertEqual(
+            self.run_query("Place order by name limit 2"), self.places[:2]
+        )
+        del self.places[3].price
+        self.assertEqual(
+            self.run_query("Place order by price offset 8"),
+            [self.places[9], self.places[3]],
+        )
+        self.places[4].price = "free"
+        with self.assertRaisesRegex(ValueError, "mixed types"):
+            self.run_query("Place order by price")
+
+    def test_limit_stops_early(self):
+        """Test that an unordered query stops at its limit."""
+
+        with patch.object(
+            query.Condition, "matches", autospec=True, return_value=True
+        ) as matches:
+            self.assertEqual(
+                self.run_query("Place where price >= 0 limit 3"),
+                self.places[:3],
+            )
+        self.assertEqual(matches.call_count, 3)
+
+    def test_count_and_project(self):
+        """Test that counts need no instance and fields are selected."""
+
+        parsed = query.parse("Place offset 8 count", self.storage.classes())
+        with patch.object(self.storage, "all") as all_objects:
+            self.assertEqual(parsed.count_in(self.storage), 2)
+        all_objects.assert_not_called()
+
+        parsed = query.parse(
+            "Place where city_id = odd limit 2 count", self.storage.classes()
+        )
+        self.assertEqual(parsed.count_in(self.storage), 2)
+
+        parsed = query.parse("Place select name,nope", self.storage.classes())
+        self.assertEqual(parsed.project(self.places[0]), {"name": "place 0"})
+
+
+class TestLazyRun(StorageTestCase):
+    """
+    Test cases for running queries against a lazily reloaded storage.
+    """
+
+    def setUp(self):
+        """Save twenty places, then reload them lazily."""
+
+        super().setUp()
+        for number in range(20):
+            place = Place()
+            place.price = number
+        self.storage.save()
+        self.clear()
+        self.storage.lazy = True
+        self.storage.reload()
+
+    def tearDown(self):
+        """Disable lazy mode."""
+
+        self.storage.lazy = False
+        super().tearDown()
+
+    def test_limit_builds_what_it_scans(self):
+        """Test that an unordered query only builds the instances it scans."""
+
+        parsed = query.parse("Place limit 1", self.storage.classes())
+        self.assertEqual(len(list(parsed.run(self.storage))), 1)
+        self.assertEqual(len(self.storage.objects), 1)
+
+        parsed = query.parse("Place order by price limit 1",
+                             self.storage.classes())
+        self.assertEqual(
+            [place.price for place in parsed.run(self.storage)], [0]
+        )
+        self.assertEqual(len(self.storage.objects), 20)
@@ -0,0 +1,153 @@
+#!/usr/bin/python3
+"""
+The Record File Tests
+
+This file contains unittests for the record_file module.
+
+To run the test, use the following command:
+    python3 -m unittest tests.test_engine.test_record_file
+
+To run the entire test suite, use the following command:
+    python3 -m unittest discover tests
+"""
+
+# import the unittest module for creating and running test cases
+import unittest
+
+# import the pycodestyle module for checking code style compliance
+import pycodestyle
+
+# import the json, os, shutil and tempfile modules for temporary files
+import json
+import os
+import shutil
+import tempfile
+
+# import the record_file module from the models.engine package
+from models.engine import record_file
+
+
+class TestPycodestyle(unittest.TestCase):
+    """
+    Test Pycodestyle compliance for the project.
+    """
+
+    def test_pycodestyle(self):
+        """Check if the code follows Pycodestyle conventions."""
+
+        style_checker = pycodestyle.StyleGuide()
+        result = style_checker.check_files(
+            [
+                "models/engine/record_file.py",
+                "tests/test_engine/test_record_file.py",
+            ]
+        )
+        self.assertEqual(
+            result.total_errors, 0, "Found code style errors (and warning)."
+        )
+
+
+class TestRecordFile(unittest.TestCase):
+    """
+    Test cases for the RecordFile and MappedRecords classes.
+    """
+
+    records = {
+        f"{class_name}.{number}": {
+            "id": str(number),
+            "name": f"record {number}",
+            "__class__": class_name,
+        }
+        for number, class_name in enumerate(("Place", "Place", "Review"))
+    }
+
+    def setUp(self):
+        """Write the records to a temporary record file."""
+
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "file.json")
+        self.index_path = self.path + ".idx"
+        self.write(self.records)
+
+    def tearDown(self):
+        """Remove the temporary record file."""
+
+        shutil.rmtree(self.tmp_dir)
+
+    def write(self, records, token=None):
+        """Write records to the record file and its index."""
+
+        token = token or record_file.new_token()
+        offsets = {}
+        items = ((key, json.dumps(record)) for key, record in records.items())
+        with open(self.path, "wb") as file:
+            record_file.dump_data(file, items, token, offsets)
+        with open(self.index_path, "wb") as file:
+            record_file.dump_index(file, offsets.items(), token)
+
+    def open(self):
+        """Return the record file, closed at the end of the test."""
+
+        mapped = record_file.RecordFile(self.path, self.index_path)
+        self.addCleanup(mapped.close)
+        return mapped
+
+    def test_views(self):
+        """Test that records are grouped by class and read on demand."""
+
+        views = self.open().views()
+        self.assertEqual(set(views), {"Place", "Review"})
+        places = views["Place"]
+        self.assertEqual(len(places), 2)
+        self.assertIn("Place.0", places)
+        self.assertEqual(places["Place.1"], self.records["Place.1"])
+        self.assertEqual(dict(places.items()), {
+            key: record
+            for key, record in self.records.items()
+            if key.startswith("Place.")
+        })
+
+        self.assertEqual(places.pop("Place.0"), self.records["Place.0"])
+        self.assertIsNone(places.pop("Place.0"))
+        places["Place.5"] = {"id": "5", "__class__": "Place"}
+        self.assertEqual(list(places.keys()), ["Place.1", "Place.5"])
+
+    def test_append(self):
+        """Test that appended records and deletions are read back."""
+
+        mapped = self.open()
+        size = mapped.size
+        written = mapped.append(
+            [("Place.0", json.dumps({"id": "0", "__class__": "Place"}))],
+            ["Review.2"],
+            lambda file: None,
+        )
+        self.assertEqual(os.path.getsize(self.path) - size, mapped.size - size)
+        self.assertGreater(written, mapped.size - size)
+
+        reopened = self.open()
+        self.assertEqual(set(reopened.offsets), {"Place.0", "Place.1"})
+        self.assertEqual(
+            reopened.read(*reopened.offsets["Place.0"]),
+            {"id": "0", "__class__": "Place"},
+        )
+        self.assertGreater(reopened.size, reopened.live)
+
+    def test_index_of_another_file(self):
+        """Test that the data file is scanned if its index is stale."""
+
+        with open(self.index_path, "r", encoding="utf-8") as file:
+            index = file.read()
+        self.write({"Place.9": {"id": "9", "__class__": "Place"}})
+        with open(self.index_path, "w", encoding="utf-8") as file:
+            file.write(index)
+
+        self.assertEqual(list(self.open().offsets), ["Place.9"])
+
+    def test_not_a_record_file(self):
+        """Test that other files are rejected."""
+
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump(self.records, file)
+        with self.assertRaises(ValueError):
+            self.open()
@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+"""
+The Render Cache Tests
+
+This file contains unittests for the render_cache module.
+
+To run the test, use the following command:
+    python3 -m unittest tests.test_engine.test_render_cache
+
+To run the entire test suite, use the following command:
+    python3 -m unittest discover tests
+"""
+
+# import the unittest module for creating and running test cases
+import unittest
+
+# import the pycodestyle module for checking code style compliance
+import pycodestyle
+
+# import the gc module for collecting cached instances
+import gc
+
+# import the RenderCache class from the render_cache module
+from models.engine.render_cache import RenderCache
+
+
+class TestPycodestyle(unittest.TestCase):
+    """
+    Test Pycodestyle compliance for the project.
+    """
+
+    def test_pycodestyle(self):
+        """Check if the code follows Pycodestyle conventions."""
+
+        style_checker = pycodestyle.StyleGuide()
+        result = style_checker.check_files(
+            [
+                "models/engine/render_cache.py",
+                "tests/test_engine/test_render_cache.py",
+            ]
+        )
+        self.assertEqual(
+            result.total_errors, 0, "Found code style errors (and warning)."
+        )
+
+
+class Item:
+    """An object that can be weakly referenced."""
+
+
+class TestRenderCache(unittest.TestCase):
+    """
+    Test cases for the RenderCache class.
+    """
+
+    def test_get_put_discard(self):
+        """Test that strings are cached per instance until discarded."""
+
+        cache = RenderCache(maxsize=4)
+        first, second = Item(), Item()
+        self.assertIsNone(cache.get(first))
+
+        cache.put(first, "first")
+        cache.put(second, "second")
+        self.assertEqual(cache.get(first), "first")
+        self.assertEqual(cache.get(second), "second")
+
+        cache.discard(first)
+        self.assertIsNone(cache.get(first))
+        self.assertEqual(len(cache), 1)
+
+    def test_least_recently_used_is_evicted(self):
+        """Test that the cache keeps at most maxsize entries."""
+
+        cache = RenderCache(maxsize=2)
+        items = [Item() for _ in range(3)]
+        cache.put(items[0], "0")
+        cache.put(items[1], "1")
+        cache.get(items[0])
+        cache.put(items[2], "2")
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get(items[0]), "0")
+        self.assertIsNone(cache.get(items[1]))
+        self.assertEqual(cache.get(items[2]), "2")
+
+    def test_collected_instances_are_dropped(self):
+        """Test that a collected instance never lends its string."""
+
+        cache = RenderCache()
+        item = Item()
+        cache.put(item, "collected")
+        del item
+        gc.collect()
+
+        other = Item()
+        cache.put(other, "new")
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get(other), "new")
+
+    def test_disabled(self):
+        """Test that a maxsize of 0 caches nothing."""
+
+        cache = RenderCache(maxsize=0)
+        item = Item()
+        cache.put(item, "text")
+        self.assertIsNone(cache.get(item))
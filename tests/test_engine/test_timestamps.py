@@ -0,0 +1,84 @@
+#!/usr/bin/python3
+"""
+The Timestamps Tests
+
+This file contains unittests for the timestamps module.
+
+To run the test, use the following command:
+    python3 -m unittest tests.test_engine.test_timestamps
+
+To run the entire test suite, use the following command:
+    python3 -m unittest discover tests
+"""
+
+# import the unittest module for creating and running test cases
+import unittest
+
+# import the pycodestyle module for checking code style compliance
+import pycodestyle
+
+# import the datetime class for building expected timestamps
+from datetime import datetime
+
+# import the timestamps module from the models.engine package
+from models.engine import timestamps
+
+
+class TestPycodestyle(unittest.TestCase):
+    """
+    Test Pycodestyle compliance for the project.
+    """
+
+    def test_pycodestyle(self):
+        """Check if the code follows Pycodestyle conventions."""
+
+        style_checker = pycodestyle.StyleGuide()
+        result = style_checker.check_files(
+            [
+                "models/engine/timestamps.py",
+                "tests/test_engine/test_timestamps.py",
+            ]
+        )
+        self.assertEqual(
+            result.total_errors, 0, "Found code style errors (and warning)."
+        )
+
+
+class TestTimestamps(unittest.TestCase):
+    """
+    Test cases for the timestamps module.
+    """
+
+    def test_parse_iso(self):
+        """Test that isoformat output is parsed back."""
+
+        value = datetime(2024, 2, 13, 18, 31, 49, 339989)
+        self.assertEqual(timestamps.parse(value.isoformat()), value)
+
+    def test_parse_iso_without_microseconds(self):
+        """Test that isoformat output without microseconds is parsed."""
+
+        value = datetime(2024, 2, 13, 18, 31, 49)
+        self.assertEqual(value.isoformat(), "2024-02-13T18:31:49")
+        self.assertEqual(timestamps.parse(value.isoformat()), value)
+
+    def test_epoch_round_trip(self):
+        """Test that epoch integers convert both ways without loss."""
+
+        value = datetime(2024, 2, 13, 18, 31, 49, 339989)
+        epoch = timestamps.to_epoch(value)
+        self.assertIsInstance(epoch, int)
+        self.assertEqual(timestamps.parse(epoch), value)
+        self.assertEqual(timestamps.to_epoch(timestamps.EPOCH), 0)
+
+    def test_repeated_values_are_shared(self):
+        """Test that repeated timestamps share one datetime."""
+
+        text = "2024-02-13T18:31:49.000001"
+        self.assertIs(timestamps.parse(text), timestamps.parse(text))
+
+    def test_to_iso(self):
+        """Test that to_iso matches isoformat."""
+
+        value = datetime(2024, 2, 13, 18, 31, 49, 1)
+        self.assertEqual(timestamps.to_iso(value), value.isoformat())
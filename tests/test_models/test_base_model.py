@@ -23,6 +23,12 @@ import pycodestyle
 # import the datetime class from the datetime mod for working with timestamps
 from datetime import datetime
 
+# import the patch helper for observing calls to the storage
+from unittest.mock import patch
+
+# import the storage instance from the models package
+from models import storage
+
 # import the BaseModel class from the base_model module
 from models.base_model import BaseModel
 
@@ -48,6 +54,7 @@ class TestDocumentation(unittest.TestCase):
         """Test if BaseModel methods have docstrings."""
         methods_to_test = [
             BaseModel.__init__,
+            BaseModel.__setattr__,
             BaseModel.__str__,
             BaseModel.save,
             BaseModel.to_dict
@@ -161,6 +168,18 @@ class TestBaseModel(unittest.TestCase):
         self.assertIn(f"({self.model.id})", string_repr)
         self.assertIn(str(self.model.__dict__), string_repr)
 
+    def test_string_is_cached_until_assignment(self):
+        """Test that the rendered string is reused until a change."""
+
+        model = BaseModel()
+        first = str(model)
+        self.assertIs(str(model), first)
+
+        model.name = "changed"
+        second = str(model)
+        self.assertIn("'name': 'changed'", second)
+        self.assertIsNot(second, first)
+
     def test_save_method(self):
         """Test the save method of the BaseModel."""
 
@@ -173,6 +192,36 @@ class TestBaseModel(unittest.TestCase):
         # assert that updated_at has been updated
         self.assertNotEqual(original_updated_at, self.model.updated_at)
 
+    def test_assignment_marks_instance_changed(self):
+        """Test that assigning an attribute touches the storage."""
+
+        model = BaseModel()
+        with patch.object(storage, "touch") as touch:
+            model.name = "changed"
+        touch.assert_called_once_with(model)
+
+    def test_kwargs_timestamps(self):
+        """Test that timestamps are parsed with or without microseconds."""
+
+        model = BaseModel(
+            id="1",
+            created_at="2024-02-13T18:31:49",
+            updated_at="2024-02-13T18:31:49.000001",
+        )
+        self.assertEqual(model.created_at, datetime(2024, 2, 13, 18, 31, 49))
+        self.assertEqual(
+            model.updated_at, datetime(2024, 2, 13, 18, 31, 49, 1)
+        )
+
+    def test_kwargs_defaults(self):
+        """Test that missing kwargs fall back to fresh values."""
+
+        model = BaseModel(name="partial")
+        self.assertIsInstance(model.id, str)
+        self.assertIsInstance(model.created_at, datetime)
+        self.assertEqual(model.updated_at, model.created_at)
+        self.assertEqual(model.name, "partial")
+
     def test_to_dict_method(self):
         """Test the to_dict method of the BaseModel."""
 
@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+"""
+The City Tests
+
+This file contains unittests for the City class of the models package.
+
+To run the test, use the following command:
+    python3 -m unittest tests.test_models.test_city
+
+To run the entire test suite, use the following command:
+    python3 -m unittest discover tests
+"""
+
+# import the unittest module for writing and running unit tests
+import unittest
+
+# import the pycodestyle module for checking code style compliance
+import pycodestyle
+
+# import the storage instance from the models package
+from models import storage
+
+# import the BaseModel class from the base_model module
+from models.base_model import BaseModel
+
+# import the City class from the city module
+from models.city import City
+
+
+class TestPycodestyle(unittest.TestCase):
+    """Test Pycodestyle compliance for the project."""
+
+    def test_pycodestyle(self):
+        """Check if the code follows Pycodestyle conventions."""
+
+        style_checker = pycodestyle.StyleGuide()
+        result = style_checker.check_files(
+            ["models/city.py", "tests/test_models/test_city.py"]
+        )
+        self.assertEqual(
+            result.total_errors, 0, "Found code style errors (and warning)."
+        )
+
+
+class TestCity(unittest.TestCase):
+    """Test cases for the City class."""
+
+    def test_docstrings(self):
+        """Test if the module and the class have docstrings."""
+
+        self.assertIsNotNone(City.__doc__)
+
+    def test_is_base_model(self):
+        """Test that City inherits from BaseModel."""
+
+        self.assertTrue(issubclass(City, BaseModel))
+        self.assertIn("City", storage.classes())
+
+    def test_class_attributes(self):
+        """Test the default values of the class attributes."""
+
+        expected = {
+            "state_id": "",
+            "name": "",
+        }
+        for name, value in expected.items():
+            with self.subTest(name=name):
+                self.assertEqual(getattr(City, name), value)
+
+    def test_to_dict_and_back(self):
+        """Test that an instance survives a round trip through to_dict."""
+
+        model = City()
+        model_dict = model.to_dict()
+        self.assertEqual(model_dict["__class__"], "City")
+
+        copy = City(**model_dict)
+        self.assertEqual(copy.id, model.id)
+        self.assertEqual(copy.created_at, model.created_at)
+        self.assertIsNot(copy, model)
@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+"""
+The Place Tests
+
+This file contains unittests for the Place class of the models package.
+
+To run the test, use the following command:
+    python3 -m unittest tests.test_models.test_place
+
+To run the entire test suite, use the following command:
+    python3 -m unittest discover tests
+"""
+
+# import the unittest module for writing and running unit tests
+import unittest
+
+# import the pycodestyle module for checking code style compliance
+import pycodestyle
+
+# import the storage instance from the models package
+from models import storage
+
+# import the BaseModel class from the base_model module
+from models.base_model import BaseModel
+
+# import the Place class from the place module
+from models.place import Place
+
+
+class TestPycodestyle(unittest.TestCase):
+    """Test Pycodestyle compliance for the project."""
+
+    def test_pycodestyle(self):
+        """Check if the code follows Pycodestyle conventions."""
+
+        style_checker = pycodestyle.StyleGuide()
+        result = style_checker.check_files(
+            ["models/place.py", "tests/test_models/test_place.py"]
+        )
+        self.assertEqual(
+            result.total_errors, 0, "Found code style errors (and warning)."
+        )
+
+
+class TestPlace(unittest.TestCase):
+    """Test cases for the Place class."""
+
+    def test_docstrings(self):
+        """Test if the module and the class have docstrings."""
+
+        self.assertIsNotNone(Place.__doc__)
+
+    def test_is_base_model(self):
+        """Test that Place inherits from BaseModel."""
+
+        self.assertTrue(issubclass(Place, BaseModel))
+        self.assertIn("Place", storage.classes())
+
+    def test_class_attributes(self):
+        """Test the default values of the class attributes."""
+
+        expected = {
+            "city_id": "",
+            "user_id": "",
+            "name": "",
+            "description": "",
+            "number_rooms": 0,
+            "number_bathrooms": 0,
+            "max_guest": 0,
+            "price_by_night": 0,
+            "latitude": 0.0,
+            "longitude": 0.0,
+            "amenity_ids": [],
+        }
+        for name, value in expected.items():
+            with self.subTest(name=name):
+                self.assertEqual(getattr(Place, name), value)
+
+    def test_to_dict_and_back(self):
+        """Test that an instance survives a round trip through to_dict."""
+
+        model = Place()
+        model_dict = model.to_dict()
+        self.assertEqual(model_dict["__class__"], "Place")
+
+        copy = Place(**model_dict)
+        self.assertEqual(copy.id, model.id)
+        self.assertEqual(copy.created_at, model.created_at)
+        self.assertIsNot(copy, model)
@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+"""
+The Review Tests
+
+This file contains unittests for the Review class of the models package.
+
+To run the test, use the following command:
+    python3 -m unittest tests.test_models.test_review
+
+To run the entire test suite, use the following command:
+    python3 -m unittest discover tests
+"""
+
+# import the unittest module for writing and running unit tests
+import unittest
+
+# import the pycodestyle module for checking code style compliance
+import pycodestyle
+
+# import the storage instance from the models package
+from models import storage
+
+# import the BaseModel class from the base_model module
+from models.base_model import BaseModel
+
+# import the Review class from the review module
+from models.review import Review
+
+
+class TestPycodestyle(unittest.TestCase):
+    """Test Pycodestyle compliance for the project."""
+
+    def test_pycodestyle(self):
+        """Check if the code follows Pycodestyle conventions."""
+
+        style_checker = pycodestyle.StyleGuide()
+        result = style_checker.check_files(
+            ["models/review.py", "tests/test_models/test_review.py"]
+        )
+        self.assertEqual(
+            result.total_errors, 0, "Found code style errors (and warning)."
+        )
+
+
+class TestReview(unittest.TestCase):
+    """Test cases for the Review class."""
+
+    def test_docstrings(self):
+        """Test if the module and the class have docstrings."""
+
+        self.assertIsNotNone(Review.__doc__)
+
+    def test_is_base_model(self):
+        """Test that Review inherits from BaseModel."""
+
+        self.assertTrue(issubclass(Review, BaseModel))
+        self.assertIn("Review", storage.classes())
+
+    def test_class_attributes(self):
+        """Test the default values of the class attributes."""
+
+        expected = {
+            "place_id": "",
+            "user_id": "",
+            "text": "",
+        }
+        for name, value in expected.items():
+            with self.subTest(name=name):
+                self.assertEqual(getattr(Review, name), value)
+
+    def test_to_dict_and_back(self):
+        """Test that an instance survives a round trip through to_dict."""
+
+        model = Review()
+        model_dict = model.to_dict()
+        self.assertEqual(model_dict["__class__"], "Review")
+
+        copy = Review(**model_dict)
+        self.assertEqual(copy.id, model.id)
+        self.assertEqual(copy.created_at, model.created_at)
+        self.assertIsNot(copy, model)